@@ -1,5 +1,9 @@
+import collections
+import concurrent.futures
 import copy
+import heapq
 import math
+import random
 import time
 import datastructures
 
@@ -26,6 +30,54 @@ Randomized version of the algorithm, every node has a probability of
 being choosed at every step of the algorithm.
 
 History:
+    * 1.6
+        - Now the C family of algorithms (c, sdir_c and sdfr_c) makes a
+            single copy of the graph and restores it to a snapshot after
+            every call to B, instead of making a deep copy every time.
+        - Now the D family of algorithms (d and sdr_d) builds every 
+            color class on a snapshot of the uncolored graph, instead
+            of making a deep copy of it for every color.
+        - Now the colors are assigned through the GRAPH 'set_color'
+            method, so they can be restored with the rest of the GRAPH.
+        - Added the 'workers' argument to the 'c' and 'e' algorithms,
+            and the 'search_k' method, to look for k using a pool of
+            processes.
+        - Added the 'portfolio' method, to execute many seeded runs of
+            a SDR algorithm in a pool of processes, and the 'sdr_run'
+            method to repeat any of those runs.
+        - Added the 'cached_d' method, used by 'sdr_widgerson' to 
+            avoid executing the deterministic algorithm D again on the
+            same graph.
+        - Added the 'dsatur' algorithm, which colors the vertices by 
+            decreasing saturation degree.
+        - Added the 'first_fit' algorithm, which colors the vertices in
+            natural, largest-first or smallest-last order.
+        - Now 'delta_coloring' marks the colors of the neighbors of
+            every vertex in a bitmask, instead of calling the GRAPH 
+            'is_valid' method for every color tried.
+        - Now the 'c' algorithm skips the calls to B with a k greater
+            than the degeneracy of the graph, which never fail.
+        - Now the 'd' algorithm, and 'sdr_d' for the Proposals 0 and 29
+            - 32, build the color classes on a ResidualGraph instead of
+            destroying and restoring a copy of the graph.
+        - Added the 'bounds' method, which computes cheap bounds of the
+            chromatic number, and the 'lower' argument of 'b' and 
+            'sdr_b', which rejects the values of k below a lower bound.
+            The C family of algorithms uses them to reject k = 2 on 
+            graphs with an odd cycle without calling B.
+        - Now the 'c' algorithm keeps the coloring of its last 
+            successful call to B, instead of calling B again at the end,
+            and accepts known 'lower' and 'upper' values of k.
+        - Now algorithm B, and 'sdr_b' for the Proposal 0, recurse on
+            InducedGraph views instead of moving the vertices of every
+            subgraph into a new GRAPH, so the graph given is not 
+            destroyed and only its colors are restored by the C family
+            of algorithms.
+        - Added the 'compact' argument to 'c', 'search_k' and 
+            'portfolio', so the worker processes can map the binary copy
+            of a graph loaded by 'load_graph' instead of receiving its
+            arrays.
+
     * 1.5
         - Now SDR methods use their own dictionary of colors, instead of
             the global COLORS and GREEDY_COLORS dictionaries. This was
@@ -73,6 +125,11 @@ History:
 Attributes
     COLORS (dict): the dictionary that contains the vertices of a graph
       and the color assigned to it by the Widgerson algorithm.
+    GREEDY_CACHE (OrderedDict): the results of the algorithm D for the
+      most recently used graphs, indexed by the fingerprint of the 
+      graph, from the least to the most recently used.
+    GREEDY_CACHE_SIZE (int): the maximum number of graphs kept in the
+      GREEDY_CACHE.
     GREEDY_COLORS (dict): the dictionary that contains the vertices of
       a graph and the color assigned to it by the Greedy Independent
       Set algorithm.
@@ -82,21 +139,29 @@ Attributes
     WINNER_PROPOSAL_D (int): the number of proposal to pick random
       vertices in the SDR-D algorithm which was choosed as the default
       option.
+    WORKER_GRAPH (GRAPH): the copy of the graph used by a worker
+      process of 'search_k' or 'portfolio'.
+    WORKER_STATE (tuple): the snapshot of WORKER_GRAPH that is restored
+      after every call to B.
 """
 
 COLORS = None
+GREEDY_CACHE = collections.OrderedDict()
+GREEDY_CACHE_SIZE = 16
 GREEDY_COLORS = None
 SDR_GREEDY_COLORS = None
 MAX_ITER = 100
-SCRIPT_VERSION = 1.5
+SCRIPT_VERSION = 1.6
 WINNER_PROPOSAL_C = 8
 WINNER_PROPOSAL_D = 30
+WORKER_GRAPH = None
+WORKER_STATE = None
 
 METHOD_RECURSIVE = 0
 METHOD_GREEDY = 1
 METHOD_SDR_GREEDY = 2
 
-def b(k, graph, i, original=False):
+def b(k, graph, i, original=False, lower=0):
     """Implements the B algorithm described by Widgerson in his paper.
     
     Algorithm B is used to color k-colorable graphs. Its input is an
@@ -109,12 +174,26 @@ def b(k, graph, i, original=False):
     2k * ceil(fk(n)) colors, and it is implemented to run in time 
     O(k(|V| + |E|)). For more information, please check the paper.
     
+    If a lower bound of the chromatic number is known (for example, 
+    one computed by 'bounds'), the values of k below it are rejected
+    before any subgraph is built.
+    
+    The algorithm works on an InducedGraph view of the GRAPH, and the
+    recursive calls on the views of the subgraphs, so only the colors
+    of the vertices of the GRAPH are modified.
+    
     Args:
       k (int): an integer k such that the graph is guaranteed to have
         a k-coloring.
-      graph (GRAPH): a graph g coded in a GRAPH data structure.
+      graph (GRAPH): a graph g coded in a GRAPH data structure, or an
+        InducedGraph view of it.
       i (int): an integer which the algorithm will use to color the 
         graph with successive colors i, i + 1, etc.
+      original (boolean): True if and only if this is the original 
+        call, in which case the global COLORS dictionary is prepared.
+        Defaults to False.
+      lower (int): a lower bound of the chromatic number of the graph.
+        Defaults to 0.
         
     Complexity: O(k(|V| + |E|))
         
@@ -125,17 +204,24 @@ def b(k, graph, i, original=False):
     Raises:
         RuntimeError: If the GRAPH given is not k-colorable.
     """
+    if k < lower:
+        raise RuntimeError("Graph isn't {0}-colorable: at least {1} colors"
+                           " are needed".format(k, lower))
+        
+    if not isinstance(graph, datastructures.InducedGraph):
+        graph = datastructures.InducedGraph(graph)
+        
     # Step 0: Prepare the global COLORS array (if and only if this is
     # the original call
     if original:
         global COLORS
         COLORS = dict()
     
-        for vertex in graph.vertices:
+        for vertex in graph.nodes():
             COLORS[vertex.nid] = vertex.color
     
     # Step 1: Get the number of vertices
-    n = len(graph.vertices)
+    n = graph.m
     
     # Step 2: Base cases
     if k == 2:
@@ -159,7 +245,7 @@ def b(k, graph, i, original=False):
         j = b(k - 1, h, i)
         
         # Assign the chosen vertex its color
-        vertex.color = i + j
+        graph.set_color(vertex, i + j)
         COLORS[vertex.nid] = vertex.color
         
         # Increase the amount of colors used
@@ -183,7 +269,7 @@ def bfs(graph, color_dict=None, color=0, root=None):
     If the graph is not bipartite, then the coloring fails.
     
     Args:
-      graph (GRAPH): the graph to color.
+      graph (GRAPH): the graph to color, or an InducedGraph view.
       color_dict (dictionary): a Python dictionary in which the colors
         assigned by the algorithm will be stored. If not given, the
         default global COLORS dictionary will be used to store the 
@@ -202,11 +288,15 @@ def bfs(graph, color_dict=None, color=0, root=None):
         False if the graph is not bipartite (and therefore, the 
         coloring failed).
     """
+    if isinstance(graph, datastructures.InducedGraph):
+        return _induced_bfs(
+          graph, COLORS if color_dict is None else color_dict, color)
+          
     # For efficiency reasons, isolated vertices are colored first
     for vertex in graph.vertices:
         if len(vertex) == 0:
             # Marks the vertex and colors it
-            vertex.color = color
+            graph.set_color(vertex, color)
             vertex.flag = True
             
             if color_dict is not None:
@@ -224,7 +314,7 @@ def bfs(graph, color_dict=None, color=0, root=None):
         if not vertex.flag:
             # Marks and colors the root
             vertex.flag = True
-            vertex.color = color
+            graph.set_color(vertex, color)
                         
             # Saves the color into the global dictionary
             if color_dict is not None:
@@ -244,9 +334,9 @@ def bfs(graph, color_dict=None, color=0, root=None):
                 current = graph.vertices[queue.remove_first().nid]
                 
                 # Checks the adjacency list of the current node
-                for neighbor_nid in current.data:
+                for neighbor_nid in current.data.nids():
                     # Get the reference to the neighbor
-                    neighbor = graph.vertices[neighbor_nid.nid]
+                    neighbor = graph.vertices[neighbor_nid]
                 
                     # Checks if node is already marked
                     if not neighbor.flag:
@@ -255,9 +345,9 @@ def bfs(graph, color_dict=None, color=0, root=None):
                         
                         # Alterns color to use
                         if current.color == color:                            
-                            neighbor.color = color + 1
+                            graph.set_color(neighbor, color + 1)
                         else:
-                            neighbor.color = color
+                            graph.set_color(neighbor, color)
                             
                         # Saves the color into the global dictionary
                         if color_dict is not None:
@@ -278,13 +368,119 @@ def bfs(graph, color_dict=None, color=0, root=None):
     return True
 
 
-def c(graph):
+def _is_bipartite(graph):
+    """Determine if a graph has no odd cycle.
+    
+    Every connected component is 2-colored with a depth first search,
+    without modifying the colors of the GRAPH. This is the part of 
+    'bounds' used by the C family of algorithms, which do not need the
+    other bounds.
+    
+    Args:
+      graph (GRAPH): the graph. It is not modified.
+      
+    Complexity: O(|V| + |E|)
+    
+    Returns:
+      boolean: True if and only if the graph has no odd cycle.
+    """
+    elements = graph.vertices.elements
+    side = dict()
+    
+    for root in elements:
+        if root in side:
+            continue
+            
+        side[root] = 0
+        stack = [root]
+        
+        while stack:
+            p = stack.pop()
+            
+            for q in elements[p].data.nids():
+                if q not in elements:
+                    continue
+                elif q not in side:
+                    side[q] = 1 - side[p]
+                    stack.append(q)
+                elif side[q] == side[p]:
+                    return False
+                    
+    return True
+
+
+def bounds(graph):
+    """Compute cheap bounds of the chromatic number of a graph.
+    
+    Three bounds are computed:
+    
+      * clique : the size of a clique found greedily. Every vertex 
+          starts a clique, which is grown with the neighbors that 
+          precede it in smallest-last order, from the last one to the 
+          first one, as long as they are adjacent to every vertex 
+          already in the clique. The chromatic number is at least the
+          size of the clique.
+      * bipartite : whether the graph has no odd cycle, checked by 
+          2-coloring it with a depth first search (see 
+          '_is_bipartite'). If it has one, the chromatic number is at
+          least 3, and algorithm B fails for k = 2.
+      * degeneracy : the degeneracy of the graph (see the GRAPH 
+          'smallest_last' method). The chromatic number is at most
+          degeneracy + 1.
+          
+    Note that algorithm B can succeed with a k below the chromatic 
+    number, so only the odd cycles tell exactly when B fails.
+    
+    Args:
+      graph (GRAPH): the graph. It is not modified.
+      
+    Complexity: O(|V| + |E| * d), where d is the degeneracy of the 
+      graph.
+      
+    Returns:
+      tuple: the size of the clique found, True if and only if the 
+        graph is bipartite, and the degeneracy of the graph.
+    """
+    order, degeneracy = graph.smallest_last()
+    index = {vertex.nid: p for p, vertex in enumerate(order)}
+    neighbors = [set(index[neighbor.nid] for neighbor in vertex.data
+                     if neighbor.nid in index) for vertex in order]
+    
+    # Every vertex has at most 'degeneracy' neighbors before it
+    clique = 1 if order else 0
+    
+    for p in range(len(order)):
+        members = [p]
+        
+        for q in sorted((q for q in neighbors[p] if q < p), reverse=True):
+            if all(q in neighbors[r] for r in members):
+                members.append(q)
+                
+        if len(members) > clique:
+            clique = len(members)
+            
+    return clique, _is_bipartite(graph), degeneracy
+
+
+def c(graph, workers=None, lower=None, upper=None, compact=None):
     """Implements the C algorithm described by Widgerson in his paper.
     
     Algorithm C is used to color any graph where the chromatic number
     is not known. It calls algorithm B with increasingly higher values
     of k until it is able to find a proper coloring.
     
+    If a number of workers is given, the calls to B used to look for
+    k are made in parallel by a pool of processes (see 'search_k'). 
+    Since B is deterministic, the value of k found, and therefore the
+    coloring, is the same as in the sequential version.
+    
+    The coloring of the last successful call to B made by the search 
+    is kept, so B is only called again at the end if the value of k 
+    found was skipped by the search. If a value of k for which B 
+    succeeds is already known, it can be given as 'upper' to skip the
+    doubling stage, and a value for which B fails can be given as 
+    'lower' to start the search above it.
+    
     Algorithm C colors any graph on n vertices with at most
     2 * chi(G) * ceil(n ^ 1 - 1 / (chi(G) - 1)) colors, 
     and it is implemented to run in time 
@@ -293,6 +489,15 @@ def c(graph):
     
     Args:
       graph (GRAPH): the graph to color.
+      workers (int): the number of processes used to look for k. If
+        None, k is looked for sequentially. Defaults to None.
+      lower (int): a value of k for which B is known to fail. Defaults
+        to None.
+      upper (int): a value of k for which B is known to succeed. If 
+        given, k is looked for sequentially between 'lower' and 
+        'upper'. Defaults to None.
+      compact (CompactGraph): the graph sent to the processes that look
+        for k (see 'search_k'). Defaults to None.
         
     Complexity: O(chi(G) * log2(chi(G)) * (|V| + |E|))
         
@@ -300,49 +505,118 @@ def c(graph):
       int: the number of colors the algorithm used to color the
       'graph'.
     """
-    colored = False
-    exponent = 1
+    global COLORS
     
-    while not colored:
-        # Creates a copy of the graph
-        copy_graph = copy.deepcopy(graph)
+    # Creates a single copy of the graph. Every call to B colors it, 
+    # so it is restored to this snapshot after each call.
+    copy_graph = copy.deepcopy(graph)
+    state = copy_graph.snapshot()
+    
+    # The graph is (degeneracy + 1)-colorable, and B never fails for a
+    # k greater than or equal to the chromatic number, so those calls 
+    # are known to succeed and can be skipped. B fails for k = 2 if and
+    # only if the graph has an odd cycle, so that call is rejected
+    # without building the coloring.
+    bipartite = _is_bipartite(graph)
+    degeneracy = graph.smallest_last()[1]
+    bound = degeneracy + 1
+    minimum = 2 if bipartite else 3
+    
+    # The value of k, the maximum color and the COLORS of the last 
+    # successful call to B
+    best = None
+    
+    if workers is not None and upper is None:
+        lower, upper, _ = search_k(
+          graph, workers, lower, minimum, bound, compact)
+    else:
+        if lower is None:
+            lower = minimum - 1
+            
+        # Use doubling to look for an upper bound of k0
+        exponent = max(lower.bit_length(), 1)
         
-        try:
-            result = b(2 ** exponent, copy_graph, 1, True)            
-            colored = True
-        except RuntimeError:        
-            exponent += 1
-            colored = False
+        while upper is None:
+            k = 2 ** exponent
             
-    # Use binary search to look for k0
-    lower = 2 ** (exponent - 1)
-    upper = 2 ** exponent
-    
-    while abs(upper - lower) > 1:
-        copy_graph = copy.deepcopy(graph)
-        middle = (lower + upper) // 2
+            if k >= bound:
+                upper = k
+                continue
+                
+            try:
+                best = (k,) + _run_b(k, copy_graph, minimum)
+                upper = k
+            except RuntimeError:
+                lower = k
+                exponent += 1
+                
+            copy_graph.restore(state)
+            
+        # Use binary search to look for k0
+        while upper - lower > 1:
+            middle = (lower + upper) // 2
+            
+            if middle >= bound:
+                upper = middle
+                continue
+                
+            try:
+                best = (middle,) + _run_b(middle, copy_graph, minimum)
+                upper = middle
+            except RuntimeError:
+                lower = middle
+                
+            copy_graph.restore(state)
+            
+    # Colors the graph using k0, unless the search already did it. B is
+    # never called with 'lower', since it either failed or was rejected.
+    if best is None or best[0] != upper:
+        best = (upper,) + _run_b(upper, copy_graph, minimum)
         
-        try:
-            result = b(middle, copy_graph, 1, True)
-            upper = middle
-        except RuntimeError:
-            lower = middle
+    COLORS = best[2]
+    
+    return best[1]
 
-    # Colors the graph using k0
-    try:
-        copy_graph = copy.deepcopy(graph)
-        result = b(lower, copy_graph, 1, True)
-    except RuntimeError:
-        copy_graph = copy.deepcopy(graph)    
-        result = b(upper, copy_graph, 1, True)
+
+def cached_d(graph, color_dict):
+    """Execute the Greedy Independent Set algorithm D, reusing the
+    result of previous executions on the same graph.
     
-    max_color = 0
+    Algorithm D is deterministic, so its result only depends on the
+    structure of the graph. The results are kept in GREEDY_CACHE, 
+    indexed by the fingerprint of the graph, so repeated calls on the
+    same graph (such as the ones made by the PSO on every evaluation)
+    only cost the computation of the fingerprint. When the cache is 
+    full, the least recently used graph is discarded.
     
-    for v in copy_graph.vertices:
-        if v.color > max_color:
-            max_color = v.color
+    Args:
+      graph (GRAPH): the graph to color.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned by the algorithm will be stored.
+        
+    Complexity: O(|V| + |E|) if the graph is in the cache, O(|V| ^ 2)
+      otherwise.
+      
+    Returns:
+      int: the number of colors used by the algorithm.
+    """
+    key = graph.fingerprint()
     
-    return max_color
+    if key not in GREEDY_CACHE:
+        result_dict = dict()
+        result = d(graph, result_dict)
+        GREEDY_CACHE[key] = (result, result_dict)
+        
+        # Only the most recently used graphs are kept
+        if len(GREEDY_CACHE) > GREEDY_CACHE_SIZE:
+            GREEDY_CACHE.popitem(last=False)
+    else:
+        GREEDY_CACHE.move_to_end(key)
+        
+    result, result_dict = GREEDY_CACHE[key]
+    color_dict.update(result_dict)
+    
+    return result
 
 
 def color(graph, colors_dict):
@@ -397,70 +671,11 @@ def d(graph, color_dict=None):
     if color_dict is None:
         global GREEDY_COLORS
         GREEDY_COLORS = dict()
-    
-    # The color to use
-    i = 1
-    
-    copy_graph = copy.deepcopy(graph)
-    copy_graph.build_DEGREE()
-    
-    while not copy_graph.vertices.is_empty():
-        uncolored = copy.deepcopy(copy_graph)
-        uncolored.build_DEGREE()
+        color_dict = GREEDY_COLORS
         
-        while not uncolored.vertices.is_empty():
-            # Color a minimum degree vertex with current color
-            vertex = uncolored.get_min_degree_vertex()
-            if color_dict is not None:
-                color_dict[vertex.nid] = i
-            else:
-                GREEDY_COLORS[vertex.nid] = i
-            
-            # Delete the vertex and its neighborhood
-            for neighbor in vertex.data:
-                # Delete the edges with the neighborhood
-                for other_neighbor in uncolored.vertices[neighbor.nid].data:
-                    uncolored.degrees.decrease(
-                        uncolored.vertices[neighbor.nid])
-                    uncolored.degrees.decrease(
-                        uncolored.vertices[other_neighbor.nid])
-                    uncolored.delete_edge(neighbor.nid, other_neighbor.nid)
-                            
-                # Also delete the edge with the neighbor in the copy graph
-                copy_graph.degrees.decrease(copy_graph.vertices[vertex.nid])
-                copy_graph.degrees.decrease(copy_graph.vertices[neighbor.nid])
-                copy_graph.delete_edge(vertex.nid, neighbor.nid)
-            
-                # Now delete the neighbor
-                neighbor_bucket = len(uncolored.vertices[neighbor.nid])
-                uncolored.degrees.buckets[neighbor_bucket].data.remove(
-                    neighbor.nid)
-                uncolored.delete_vertex(neighbor.nid)
-                        
-            # Delete the colored vertex from its bucket
-            uncolored.degrees.buckets[len(vertex)].data.remove(vertex.nid)
-            
-            # Finally, delete the min degree vertex from both graphs
-            uncolored.delete_vertex(vertex.nid)
-            
-            original_vertex = copy_graph.vertices[vertex.nid]
-            
-            # Delete remaining edges
-            for neighbor in original_vertex.data:
-                copy_graph.degrees.decrease(
-                    copy_graph.vertices[neighbor.nid])
-                copy_graph.degrees.decrease(
-                    copy_graph.vertices[original_vertex.nid])
-                copy_graph.delete_edge(original_vertex.nid, neighbor.nid)
-            
-            copy_graph.degrees.buckets[len(original_vertex)].data.remove(
-                vertex.nid)
-            copy_graph.delete_vertex(original_vertex.nid)
-            
-        # Create a new color
-        i += 1
-        
-    return (i - 1)
+    return _independent_sets(
+      graph, color_dict, 
+      datastructures.ResidualGraph.get_min_degree_vertex)
 
 
 def delta_coloring(graph, color_dict=None, color=0):
@@ -470,12 +685,18 @@ def delta_coloring(graph, color_dict=None, color=0):
     a vertex of maximum degree, where delta(GRAPH) is the maximum
     degree of GRAPH.
     
+    The vertices are colored in the order they have inside the GRAPH,
+    each one with the lowest color (starting from 'color') not used by
+    its neighbors (see 'first_fit'). Since a vertex of degree deg(v) 
+    always finds a free color among the first deg(v) + 1 colors, no 
+    more than delta(GRAPH) + 1 colors are used.
+    
     Since all nodes on the graph are colored, and the adjacency list
     of every one of them is also checked, the complexity of the delta
     coloring is O(|V| + |E|).
     
     Args:
-      graph (GRAPH): the graph to be colored
+      graph (GRAPH): the graph to be colored, or an InducedGraph view.
       color_dict (dictionary): a Python dictionary in which the colors
         assigned by the algorithm will be saved. If not given, the
         default global COLORS dictionary will be used. Defaults to
@@ -487,38 +708,104 @@ def delta_coloring(graph, color_dict=None, color=0):
     Returns:
       int: The amount of colors used to color GRAPH (that is,
         delta(GRAPH) + 1).
+    """
+    if color_dict is None:
+        color_dict = COLORS
         
-    Raises:
-        RuntimeError: If more than delta(GRAPH) + 1 colors are used in
-            the coloring (where delta(GRAPH) is the maximum degree 
-            occurring in the GRAPH).
+    if isinstance(graph, datastructures.InducedGraph):
+        highest = _first_fit(graph, graph.nodes(), graph.neighborhood, 
+                             color_dict, color)
+    else:
+        vertices = [vertex for vertex in graph.vertices]
+        highest = _first_fit(graph, vertices, _graph_neighbors(graph),
+                             color_dict, color)
+    
+    return max(highest, 0)
+
+
+def dsatur(graph, color_dict=None, color=0):
+    """Implement the DSATUR algorithm for graph coloring, proposed by
+    Brelaz (1979).
+    
+    At every step, DSATUR colors the uncolored vertex with the highest
+    saturation degree (the number of different colors found in its
+    neighborhood) with the lowest color not used by its neighbors. Ties
+    are broken by the number of uncolored neighbors, and then by the
+    order of the vertices inside the GRAPH.
+    
+    The colors forbidden for every vertex are kept in a bitset (stored
+    in a Python integer) that is updated every time a neighbor gets a
+    color, and the uncolored vertices are kept in a heap ordered by 
+    saturation and degree. Outdated heap entries are skipped when they
+    are popped, so every edge pushes at most two entries.
+    
+    The number of colors found is an upper bound of the chromatic 
+    number, so it is a valid k for algorithm B.
+    
+    Args:
+      graph (GRAPH): the graph to be colored.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned by the algorithm will be stored. If not given, the
+        colors are only assigned to the GRAPH. Defaults to None.
+      color (int): the initial color to use. Defaults to zero.
+      
+    Complexity: O((|V| + |E|) * log(|V|))
+    
+    Returns:
+      int: the number of colors used to color the graph.
     """
+    vertices = [vertex for vertex in graph.vertices]
+    index = {vertex.nid: p for p, vertex in enumerate(vertices)}
+    neighbors = [[index[neighbor.nid] for neighbor in vertex.data 
+                  if neighbor.nid in index] for vertex in vertices]
+    
+    forbidden = [0] * len(vertices)
+    saturation = [0] * len(vertices)
+    degree = [len(adjacency) for adjacency in neighbors]
+    colored = [False] * len(vertices)
+    
+    heap = [(0, -degree[p], p) for p in range(len(vertices))]
+    heapq.heapify(heap)
     colors_used = 0
     
-    for vertex in graph.vertices:
-        current_color = color
+    while heap:
+        sat, deg, p = heapq.heappop(heap)
         
-        while not graph.is_valid(vertex.nid, current_color):
-            current_color += 1
-            
-        if current_color - color > colors_used:
-            colors_used = current_color - color
+        # Skip the entries pushed before the last update of the vertex
+        if colored[p] or -sat != saturation[p] or -deg != degree[p]:
+            continue
             
-        if colors_used > graph.get_max_degree() + 1:
-            raise RuntimeError(
-                "Too many colors used in Brute Force coloring stage!")
-            
-        vertex.color = current_color
+        # The lowest bit not set in the forbidden colors
+        bits = forbidden[p]
+        current = (~bits & (bits + 1)).bit_length() - 1
+        
+        colored[p] = True
+        graph.set_color(vertices[p], color + current)
         
         if color_dict is not None:
-            color_dict[vertex.nid] = vertex.color
-        else:
-            COLORS[vertex.nid] = vertex.color
+            color_dict[vertices[p].nid] = color + current
+            
+        if current + 1 > colors_used:
+            colors_used = current + 1
+            
+        mask = 1 << current
         
+        for q in neighbors[p]:
+            if colored[q]:
+                continue
+                
+            degree[q] -= 1
+            
+            if not forbidden[q] & mask:
+                forbidden[q] |= mask
+                saturation[q] += 1
+                
+            heapq.heappush(heap, (-saturation[q], -degree[q], q))
+            
     return colors_used
 
 
-def e(graph):
+def e(graph, workers=None):
     """Implement the Widgerson algorithm.
     
     This method calls the Recursive coloring algorithm C and the
@@ -534,10 +821,12 @@ def e(graph):
     
     Args:
       graph (GRAPH) the graph to color.
+      workers (int): the number of processes used by algorithm C. If
+        None, algorithm C runs sequentially. Defaults to None.
       
     Complexity: O(chi(G) * log2(chi(G)) * O(|V| + |E|))
     """
-    recursive_colors = c(graph)
+    recursive_colors = c(graph, workers)
     greedy_colors = d(graph)
     
     #if recursive_colors <= greedy_colors:
@@ -556,6 +845,129 @@ def e(graph):
     return min(recursive_colors, greedy_colors)
 
 
+def _first_fit(graph, vertices, neighbors, color_dict, color):
+    """Color the given vertices, in order, with the lowest color not 
+    used by their neighbors.
+    
+    The colors of the neighbors of every vertex are marked in a bitmask
+    (stored in a Python integer), and the lowest bit not set gives the
+    color of the vertex. Only the neighbors colored earlier in the same
+    call are considered, so the colors left in the graph by a previous
+    coloring do not matter. Those neighbors use colors between 'color'
+    and 'color + delta(GRAPH)', so the mask stays small.
+    
+    Args:
+      graph (GRAPH): the graph to be colored, or an InducedGraph view.
+      vertices (list): the vertices of the graph to color, in order.
+      neighbors (function): a function that receives a vertex and 
+        returns its neighbors, as stored in the graph.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned will be stored.
+      color (int): the lowest color to use.
+      
+    Complexity: O(|V| + |E|)
+    
+    Returns:
+      int: the highest color used, minus 'color', or -1 if no vertex
+        was colored.
+    """
+    highest = -1
+    colored = set()
+    
+    for vertex in vertices:
+        bits = 0
+        
+        for neighbor in neighbors(vertex):
+            # Colors left by a previous run are not a constraint
+            if neighbor.nid in colored:
+                bits |= 1 << (neighbor.color - color)
+                
+        # The lowest bit not set in the mask
+        current = (~bits & (bits + 1)).bit_length() - 1
+        
+        if current > highest:
+            highest = current
+            
+        graph.set_color(vertex, color + current)
+        color_dict[vertex.nid] = vertex.color
+        colored.add(vertex.nid)
+        
+    return highest
+
+
+def _graph_neighbors(graph):
+    """Get the function used by '_first_fit' to read the neighbors of
+    the vertices of a GRAPH.
+    
+    Args:
+      graph (GRAPH): the graph.
+      
+    Complexity: O(1)
+    
+    Returns:
+      function: a function that receives a vertex of the GRAPH and
+        iterates over its neighbors, as stored in the GRAPH.
+    """
+    elements = graph.vertices
+    
+    def neighbors(vertex):
+        for nid in vertex.data.nids():
+            yield elements[nid]
+            
+    return neighbors
+
+
+def first_fit(graph, color_dict=None, color=0, order="natural"):
+    """Color the graph with the first-fit (greedy) algorithm.
+    
+    The vertices are visited in the given order, and each one of them
+    is colored with the lowest color not used by its neighbors. The
+    order can be:
+    
+      * natural : the order of the vertices inside the GRAPH.
+      * largest_first : by decreasing degree (Welsh & Powell, 1967).
+      * smallest_last : the reverse of the order in which the vertices
+            are removed when a vertex of minimum degree is removed at
+            every step (Matula & Beck, 1983). Every vertex has at most
+            degeneracy(GRAPH) neighbors colored before it, so at most
+            degeneracy(GRAPH) + 1 colors are used.
+            
+    Ties are broken by the order of the vertices inside the GRAPH.
+    
+    Args:
+      graph (GRAPH): the graph to be colored.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned by the algorithm will be stored. If not given, the
+        colors are only assigned to the GRAPH. Defaults to None.
+      color (int): the initial color to use. Defaults to zero.
+      order (string): the order in which the vertices are colored:
+        'natural', 'largest_first' or 'smallest_last'. Defaults to
+        'natural'.
+        
+    Complexity: O(|V| * log(|V|) + |E|)
+    
+    Returns:
+      int: the number of colors used to color the graph.
+      
+    Raises:
+      ValueError: if the order is unknown.
+    """
+    vertices = [vertex for vertex in graph.vertices]
+    
+    if order == "largest_first":
+        vertices.sort(key=lambda vertex: -len(vertex.data))
+    elif order == "smallest_last":
+        vertices = graph.smallest_last()[0]
+    elif order != "natural":
+        raise ValueError("Unknown order: {0}".format(order))
+        
+    if color_dict is None:
+        color_dict = dict()
+        
+    return _first_fit(graph, vertices, _graph_neighbors(graph),
+                      color_dict, color) + 1
+
+
 def f_k(k, x):
     """Implements the special function f_k defined by Widgerson.
     
@@ -575,7 +987,303 @@ def f_k(k, x):
     return x ** (1 - 1 / (k - 1))
 
 
-def sdr_b(k, graph, i, color_dict, proposal=0, exp=1):
+def _induced_bfs(graph, color_dict, color):
+    """Use the Breadth First Search algorithm to 2-color an 
+    InducedGraph, as 'bfs' does with a GRAPH.
+    
+    Args:
+      graph (InducedGraph): the view to color.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned will be stored.
+      color (int): the view will be colored with colors 'color' and 
+        'color + 1'.
+        
+    Complexity: O(|V| + |E|)
+    
+    Returns:
+      boolean: True if and only if the view is 2-colored successfully.
+    """
+    vertices = graph.nodes()
+    
+    # For efficiency reasons, isolated vertices are colored first
+    for vertex in vertices:
+        if graph.get_degree(vertex) == 0:
+            graph.set_color(vertex, color)
+            vertex.flag = True
+            color_dict[vertex.nid] = color
+        else:
+            vertex.flag = False
+            
+    for vertex in vertices:
+        # Only non-marked vertices start new trees
+        if not vertex.flag:
+            vertex.flag = True
+            graph.set_color(vertex, color)
+            color_dict[vertex.nid] = vertex.color
+            
+            queue = collections.deque([vertex])
+            
+            while queue:
+                current = queue.popleft()
+                
+                for neighbor in graph.neighborhood(current):
+                    if not neighbor.flag:
+                        neighbor.flag = True
+                        
+                        if current.color == color:
+                            graph.set_color(neighbor, color + 1)
+                        else:
+                            graph.set_color(neighbor, color)
+                            
+                        color_dict[neighbor.nid] = neighbor.color
+                        queue.append(neighbor)
+                    elif current.color == neighbor.color:
+                        return False
+                        
+    return True
+    
+    
+def _independent_sets(graph, color_dict, select):
+    """Color a graph with the Greedy Independent Set algorithm, using
+    the given policy to choose the vertices.
+    
+    Every color class is built on a ResidualGraph: a vertex is choosed
+    by the policy, colored, and removed along with its neighborhood,
+    until no vertex is left; then the uncolored vertices are restored
+    for the next class. The GRAPH given is not modified.
+    
+    Args:
+      graph (GRAPH): the graph to color.
+      color_dict (dictionary): a Python dictionary in which the colors
+        assigned by the algorithm will be stored.
+      select (function): the policy that receives the ResidualGraph and
+        returns the position of the next vertex to color.
+        
+    Complexity: O(chi(G) * (|V| + |E|)) plus the cost of the policy.
+    
+    Returns:
+      int: The number of colors that the algorithm used to color the
+        graph.
+    """
+    residual = datastructures.ResidualGraph(graph)
+    i = 1
+    
+    while residual.uncolored > 0:
+        residual.start()
+        
+        while not residual.is_empty():
+            p = select(residual)
+            color_dict[residual.vertices[p].nid] = i
+            residual.remove(p)
+            
+        # Create a new color
+        i += 1
+        
+    return (i - 1)
+
+
+def _portfolio_run(method, proposal, seed, expc, expd):
+    """Execute one run of a 'portfolio' in a worker process.
+    
+    Args:
+      method (string): the name of the SDR algorithm to execute.
+      proposal (int): the proposal used to choose random vertices.
+      seed (int): the seed for the pseudo-random number generator.
+      expc (float): the exponent used by the SDR-C algorithm.
+      expd (float): the exponent used by the SDR-D algorithm.
+      
+    Returns:
+      dict: the record of the run (see 'sdr_run').
+    """
+    return sdr_run(WORKER_GRAPH, method, proposal, seed, expc, expd)
+
+
+def portfolio(
+  graph,
+  runs=10,
+  workers=None,
+  time_budget=None,
+  target=None,
+  method="sdr_d",
+  proposals=None,
+  expc=1,
+  expd=1,
+  seed=None,
+  callback=None,
+  compact=None):
+    """Execute many independent runs of a SDR algorithm and keep the
+    best coloring found.
+    
+    Every run uses its own seed (seed, seed + 1, seed + 2, ...) and a
+    proposal taken in turns from 'proposals', so any run can be 
+    repeated later with 'sdr_run'. The runs are executed by a pool of
+    processes, each one receiving the graph only once, or one after
+    another in this process if no workers are given. The results are
+    received as soon as every run finishes, and no more runs are 
+    started once the target number of colors is reached or the time
+    budget is over (runs that have already started are not 
+    interrupted, but their results are ignored).
+    
+    At the end, the GRAPH is colored with the best coloring found.
+    
+    Args:
+      graph (GRAPH): the graph to color.
+      runs (int): the maximum number of runs. Defaults to 10.
+      workers (int): the number of processes to use. If None, the runs
+        are executed sequentially. Defaults to None.
+      time_budget (float): the number of seconds after which no more 
+        results are waited for. If None, there's no time limit. 
+        Defaults to None.
+      target (int): a number of colors that is good enough to stop. If
+        None, all the runs are executed. Defaults to None.
+      method (string): the SDR algorithm to execute: 'sdr_c' (in the
+        Iterated mode), 'sdr_d' or 'sdr_widgerson'. Defaults to 
+        'sdr_d'.
+      proposals (list): the proposals to use in the runs. If not given,
+        the winner proposal of the algorithm is used. Ignored by
+        'sdr_widgerson', which always uses the winner proposals.
+      expc (float): the exponent used by the SDR-C algorithm. Defaults
+        to 1.
+      expd (float): the exponent used by the SDR-D algorithm. Defaults
+        to 1.
+      seed (int): the seed of the first run. If not given, current
+        system time will be used. Defaults to None.
+      callback (function): a function that is called with the record
+        of every run as soon as it finishes. Defaults to None.
+      compact (CompactGraph): the graph sent to the workers, such as
+        the one returned by the 'load_graph' method of the 
+        datastructures module, which the workers map instead of 
+        receiving a copy of its arrays. It must have the same 
+        structure as 'graph'. If None, it is built from 'graph'. 
+        Defaults to None.
+        
+    Returns:
+      dict: the record of the best run (see 'sdr_run'), with the 
+        number of runs that finished in the 'runs' key, or None if no
+        run finished.
+        
+    Raises:
+      ValueError: if the method is not a known SDR algorithm.
+    """
+    if method not in ("sdr_c", "sdr_d", "sdr_widgerson"):
+        raise ValueError("Unknown SDR algorithm: {0}".format(method))
+        
+    if seed is None:
+        seed = int(time.time())
+        
+    if proposals is None:
+        if method == "sdr_c":
+            proposals = [WINNER_PROPOSAL_C]
+        else:
+            proposals = [WINNER_PROPOSAL_D]
+            
+    if method == "sdr_widgerson":
+        proposals = [None]
+        
+    start = time.time()
+    best = None
+    finished = 0
+    tasks = [(method, proposals[run % len(proposals)], seed + run, expc, expd)
+             for run in range(runs)]
+    
+    def keep(record):
+        """Keep the record if it is the best one found so far."""
+        if callback is not None:
+            callback(record)
+            
+        if best is None or (record["colors"], record["seed"]) < (
+              best["colors"], best["seed"]):
+            return record
+            
+        return best
+        
+    def done():
+        """Check if no more results must be waited for."""
+        if target is not None and best is not None and (
+              best["colors"] <= target):
+            return True
+            
+        return time_budget is not None and time.time() - start > time_budget
+        
+    if workers is None:
+        copy_graph = copy.deepcopy(graph)
+        
+        for task in tasks:
+            best = keep(sdr_run(copy_graph, *task))
+            finished += 1
+            
+            if done():
+                break
+    else:
+        if compact is None:
+            compact = datastructures.CompactGraph(graph)
+            
+        pool = concurrent.futures.ProcessPoolExecutor(
+          max_workers=workers, initializer=_init_worker, 
+          initargs=(compact,))
+        pending = set(pool.submit(_portfolio_run, *task) for task in tasks)
+        
+        try:
+            while pending and not done():
+                timeout = None
+                
+                if time_budget is not None:
+                    timeout = max(0, time_budget - (time.time() - start))
+                    
+                completed, pending = concurrent.futures.wait(
+                  pending, timeout, concurrent.futures.FIRST_COMPLETED)
+                
+                for future in completed:
+                    best = keep(future.result())
+                    finished += 1
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+            
+    if best is None:
+        return None
+        
+    color(graph, best["coloring"])
+    
+    best = dict(best)
+    best["runs"] = finished
+    
+    return best
+
+
+def _run_b(k, graph, lower=0):
+    """Color a graph with algorithm B, keeping the coloring found.
+    
+    The global COLORS dictionary is replaced at every original call to
+    B, so the dictionary returned is not modified by later calls.
+    
+    Args:
+      k (int): the value of k used to call B.
+      graph (GRAPH): the graph to color. Only the colors of its 
+        vertices are modified by B.
+      lower (int): a lower bound of the chromatic number of the graph,
+        as in algorithm B. Defaults to 0.
+        
+    Complexity: O(k(|V| + |E|))
+    
+    Returns:
+      tuple: the maximum color of the vertices left in the view of the
+        graph, and the dictionary of COLORS assigned by B.
+      
+    Raises:
+      RuntimeError: If B failed to color the graph.
+    """
+    view = datastructures.InducedGraph(graph)
+    b(k, view, 1, True, lower)
+    max_color = 0
+    
+    for v in view.nodes():
+        if v.color > max_color:
+            max_color = v.color
+            
+    return max_color, COLORS
+
+
+def sdr_b(k, graph, i, color_dict, proposal=0, exp=1, lower=0):
     """Implements the Structure-Driven Randomized version of the B 
     algorithm described by Widgerson in his paper.
     
@@ -594,10 +1302,15 @@ def sdr_b(k, graph, i, color_dict, proposal=0, exp=1):
     There's currently no performance guarantee demonstrated for the
     SDR_B algorithm, however its running time is still O(k(|V| + |E|)).
     
+    The proposals that can be reproduced by the InducedGraph are run on
+    views of the GRAPH, as algorithm B; the rest of them destroy the
+    GRAPH given.
+    
     Args:
       k (int): an integer k such that the graph is guaranteed to have
         a k-coloring.
-      graph (GRAPH): a graph g coded in a GRAPH data structure.
+      graph (GRAPH): a graph g coded in a GRAPH data structure, or an
+        InducedGraph view of it.
       i (int): an integer which the algorithm will use to color the 
         graph with successive colors i, i + 1, etc.
       color_dict (dictionary) a Python dictionary in which the colors
@@ -606,6 +1319,9 @@ def sdr_b(k, graph, i, color_dict, proposal=0, exp=1):
         random vertices to use. Defaults to 0.
       exp (float): the exponent to which the formula for choosing
         random vertices will be raised. Defaults to 1.
+      lower (int): a lower bound of the chromatic number of the graph,
+        as in algorithm B. The values of k below it are rejected 
+        before any vertex is choosed. Defaults to 0.
         
     Complexity: O(k(|V| + |E|))
         
@@ -616,6 +1332,14 @@ def sdr_b(k, graph, i, color_dict, proposal=0, exp=1):
     Raises:
       RuntimeError: If the given GRAPH is not k-colorable.
     """
+    if k < lower:
+        raise RuntimeError("Graph isn't {0}-colorable: at least {1} colors"
+                           " are needed".format(k, lower))
+        
+    if (proposal in datastructures.InducedGraph.PROPOSALS 
+          and not isinstance(graph, datastructures.InducedGraph)):
+        graph = datastructures.InducedGraph(graph)
+        
     # Step 1: Get the number of vertices
     n = graph.m
     
@@ -643,7 +1367,7 @@ def sdr_b(k, graph, i, color_dict, proposal=0, exp=1):
         j = sdr_b(k - 1, h, i, color_dict, proposal, exp)
         
         # Assign the chosen vertex its color
-        vertex.color = i + j
+        graph.set_color(vertex, i + j)
         color_dict[vertex.nid] = vertex.color
         
         # Increase the amount of colors used
@@ -735,6 +1459,10 @@ def sdr_d(graph, color_dict, proposal=WINNER_PROPOSAL_D, expd=1):
     
     The complexity of the Greedy Independent Set is O(|V| ^ 2).
     
+    The proposals that can be reproduced by the ResidualGraph are 
+    executed by the same engine as algorithm D; the rest of them 
+    destroy and restore a copy of the GRAPH for every color class.
+    
     Args:
       graph (GRAPH) the graph to color.
       color_dict (dictionary): a Python dictionary in which the colors
@@ -750,21 +1478,31 @@ def sdr_d(graph, color_dict, proposal=WINNER_PROPOSAL_D, expd=1):
       int: The number of colors that the algorithm used to color the
         graph.
     """
+    if proposal in datastructures.ResidualGraph.PROPOSALS:
+        return _independent_sets(
+          graph, color_dict, 
+          lambda residual: residual.get_random_vertex(proposal, expd))
+          
     # The color to use
     i = 1
     
     copy_graph = copy.deepcopy(graph)
-    copy_graph.build_DEGREE()
     
     while not copy_graph.vertices.is_empty():
-        uncolored = copy.deepcopy(copy_graph)
+        # The vertices still uncolored are the ones in the copy graph.
+        # They are destroyed while the current color class is built,
+        # and then restored to this snapshot.
+        state = copy_graph.snapshot()
+        uncolored = copy_graph
         uncolored.build_DEGREE()
+        colored = list()
         
         while not uncolored.vertices.is_empty():
             # Color a minimum degree vertex with current color
             vertex = uncolored.get_random_vertex(proposal, expd)
 
             color_dict[vertex.nid] = i
+            colored.append(vertex.nid)
             
             # Delete the vertex and its neighborhood
             for neighbor in vertex.data:
@@ -775,37 +1513,26 @@ def sdr_d(graph, color_dict, proposal=WINNER_PROPOSAL_D, expd=1):
                     uncolored.degrees.decrease(
                         uncolored.vertices[other_neighbor.nid])
                     uncolored.delete_edge(neighbor.nid, other_neighbor.nid)
-                            
-                # Also delete the edge with the neighbor in the copy graph
-                copy_graph.degrees.decrease(copy_graph.vertices[vertex.nid])
-                copy_graph.degrees.decrease(copy_graph.vertices[neighbor.nid])
-                copy_graph.delete_edge(vertex.nid, neighbor.nid)
             
                 # Now delete the neighbor
-                neighbor_bucket = len(uncolored.vertices[neighbor.nid])
-                uncolored.degrees.buckets[neighbor_bucket].data.remove(
-                    neighbor.nid)
+                uncolored.degrees.remove(uncolored.vertices[neighbor.nid])
                 uncolored.delete_vertex(neighbor.nid)
                         
             # Delete the colored vertex from its bucket
-            uncolored.degrees.buckets[len(vertex)].data.remove(vertex.nid)
+            uncolored.degrees.remove(vertex)
             
-            # Finally, delete the min degree vertex from both graphs
+            # Finally, delete the min degree vertex
             uncolored.delete_vertex(vertex.nid)
             
-            original_vertex = copy_graph.vertices[vertex.nid]
-            
-            # Delete remaining edges
-            for neighbor in original_vertex.data:
-                copy_graph.degrees.decrease(
-                    copy_graph.vertices[neighbor.nid])
-                copy_graph.degrees.decrease(
-                    copy_graph.vertices[original_vertex.nid])
-                copy_graph.delete_edge(original_vertex.nid, neighbor.nid)
-            
-            copy_graph.degrees.buckets[len(original_vertex)].data.remove(
-                vertex.nid)
-            copy_graph.delete_vertex(original_vertex.nid)
+        copy_graph.restore(state)
+        copy_graph.release()
+        
+        # Delete the vertices of the color class from the copy graph
+        for vid in colored:
+            for neighbor in copy_graph.vertices[vid].data:
+                copy_graph.delete_edge(vid, neighbor.nid)
+                
+            copy_graph.delete_vertex(vid)
             
         # Create a new color
         i += 1
@@ -874,6 +1601,60 @@ def sdr_e(graph,
     return winner
 
 
+def sdr_run(graph, method, proposal, seed, expc=1, expd=1):
+    """Execute a single, reproducible run of a SDR algorithm.
+    
+    The pseudo-random number generator is seeded before the run, so
+    the same arguments always produce the same coloring. The GRAPH
+    given is not modified.
+    
+    Args:
+      graph (GRAPH): the graph to color.
+      method (string): the SDR algorithm to execute: 'sdr_c' (in the
+        Iterated mode), 'sdr_d' or 'sdr_widgerson'.
+      proposal (int): the proposal used to choose random vertices.
+        Ignored by 'sdr_widgerson'.
+      seed (int): the seed for the pseudo-random number generator.
+      expc (float): the exponent used by the SDR-C algorithm. Defaults
+        to 1.
+      expd (float): the exponent used by the SDR-D algorithm. Defaults
+        to 1.
+        
+    Returns:
+      dict: the record of the run, with the number of colors used 
+        ('colors'), the coloring found ('coloring') and the arguments
+        of the run ('method', 'proposal', 'seed', 'expc' and 'expd').
+        If the algorithm fails, the number of colors is SENTINEL and
+        the coloring is empty.
+    """
+    random.seed(seed)
+    color_dict = dict()
+    
+    try:
+        if method == "sdr_c":
+            colors = sdir_c(graph, color_dict, proposal, expc)
+        elif method == "sdr_d":
+            colors = sdr_d(graph, color_dict, proposal, expd)
+        else:
+            copy_graph = copy.deepcopy(graph)
+            colors = sdr_widgerson(copy_graph, expc, expd)
+            color_dict = {
+              vertex.nid: vertex.color for vertex in copy_graph.vertices}
+    except RuntimeError:
+        colors = datastructures.SENTINEL
+        color_dict = dict()
+        
+    return {
+      "colors": colors,
+      "coloring": color_dict,
+      "method": method,
+      "proposal": proposal,
+      "seed": seed,
+      "expc": expc,
+      "expd": expd,
+    }
+
+
 def sdr_widgerson(graph, expc=1, expd=1):
     """Implement the final version of the SDR-Widgerson algorithm.
     
@@ -896,8 +1677,9 @@ def sdr_widgerson(graph, expc=1, expd=1):
     sdr_greedy_dict = dict()
     sdr_recursive_dict = dict()
     
-    # Executes the algorithms
-    greedy_colors = d(graph, greedy_dict)
+    # Executes the algorithms. Since D is deterministic, its result is
+    # taken from the cache when the graph has already been colored.
+    greedy_colors = cached_d(graph, greedy_dict)
     sdr_greedy_colors = sdr_d(
       graph, sdr_greedy_dict, WINNER_PROPOSAL_D, expd
     )
@@ -964,30 +1746,40 @@ def sdir_c(graph, color_dict, proposal=WINNER_PROPOSAL_C, expc=1):
     count = 0
     exponent = 1
     
+    # Creates a single copy of the graph, which is restored to this
+    # snapshot after every call to SDR-B.
+    copy_graph = copy.deepcopy(graph)
+    state = copy_graph.snapshot()
+    
+    # SDR-B fails for k = 2 if and only if the graph has an odd cycle
+    minimum = 2 if _is_bipartite(graph) else 3
+    
     while not colored:
-        # Creates a copy of the graph
-        copy_graph = copy.deepcopy(graph)
-        
         try:
-            result = sdr_b(2 ** exponent, copy_graph, 1, color_dict, proposal, expc)
+            result = sdr_b(2 ** exponent, copy_graph, 1, color_dict,
+                           proposal, expc, minimum)
             colored = True
         except RuntimeError:        
             exponent += 1
             colored = False
             
+        copy_graph.restore(state)
+            
     # Use binary search to look for k0
     lower = 2 ** (exponent - 1)
     upper = 2 ** exponent
     
     while abs(upper - lower) > 1:
-        copy_graph = copy.deepcopy(graph)
         middle = (lower + upper) // 2
         
         try:
-            result = sdr_b(middle, copy_graph, 1, color_dict, proposal, expc)
+            result = sdr_b(middle, copy_graph, 1, color_dict,
+                           proposal, expc, minimum)
             upper = middle
         except RuntimeError:
             lower = middle
+            
+        copy_graph.restore(state)
     
     colored = False
     
@@ -996,16 +1788,19 @@ def sdir_c(graph, color_dict, proposal=WINNER_PROPOSAL_C, expc=1):
     while not colored and count < MAX_ITER:
         try:
             try:
-                copy_graph = copy.deepcopy(graph)
-                result = sdr_b(lower, copy_graph, 1, color_dict, proposal, expc)
+                result = sdr_b(lower, copy_graph, 1, color_dict,
+                               proposal, expc, minimum)
                 colored = True
             except RuntimeError:
-                copy_graph = copy.deepcopy(graph)
-                result = sdr_b(upper, copy_graph, 1, color_dict, proposal, expc)
+                copy_graph.restore(state)
+                result = sdr_b(upper, copy_graph, 1, color_dict,
+                               proposal, expc, minimum)
                 colored = True
         except RuntimeError:
             colored = False
             count += 1
+            
+        copy_graph.restore(state)
     
     if not colored:
         raise RuntimeError(
@@ -1069,42 +1864,53 @@ def sdfr_c(graph, color_dict, proposal=WINNER_PROPOSAL_C, seed=0, expc=1):
     count = 0
     exponent = 1
     
+    # Creates a single copy of the graph, which is restored to this
+    # snapshot after every call to SDR-B.
+    copy_graph = copy.deepcopy(graph)
+    state = copy_graph.snapshot()
+    
+    # SDR-B fails for k = 2 if and only if the graph has an odd cycle
+    minimum = 2 if _is_bipartite(graph) else 3
+    
     while not colored:
-        # Creates a copy of the graph
-        copy_graph = copy.deepcopy(graph)
-        
         try:
             copy_graph.set_seed(seed)
-            result = sdr_b(2 ** exponent, copy_graph, 1, color_dict, proposal, expc)
+            result = sdr_b(2 ** exponent, copy_graph, 1, color_dict,
+                           proposal, expc, minimum)
             colored = True
         except RuntimeError:        
             exponent += 1
             colored = False
             
+        copy_graph.restore(state)
+            
     # Use binary search to look for k0
     lower = 2 ** (exponent - 1)
     upper = 2 ** exponent
     
     while abs(upper - lower) > 1:
-        copy_graph = copy.deepcopy(graph)
         copy_graph.set_seed(seed)
         middle = (lower + upper) // 2
         
         try:
-            result = sdr_b(middle, copy_graph, 1, color_dict, proposal, expc)
+            result = sdr_b(middle, copy_graph, 1, color_dict,
+                           proposal, expc, minimum)
             upper = middle
         except RuntimeError:
             lower = middle
+            
+        copy_graph.restore(state)
     
     # Colors the graph using k0.
     try:
-        copy_graph = copy.deepcopy(graph)
         copy_graph.set_seed(seed)
-        result = sdr_b(lower, copy_graph, 1, color_dict, proposal, expc)
+        result = sdr_b(lower, copy_graph, 1, color_dict,
+                       proposal, expc, minimum)
     except RuntimeError:
-        copy_graph = copy.deepcopy(graph)
+        copy_graph.restore(state)
         copy_graph.set_seed(seed)
-        result = sdr_b(upper, copy_graph, 1, color_dict, proposal, expc)
+        result = sdr_b(upper, copy_graph, 1, color_dict,
+                       proposal, expc, minimum)
     
     color(graph)
     max_color = 0
@@ -1116,6 +1922,173 @@ def sdfr_c(graph, color_dict, proposal=WINNER_PROPOSAL_C, seed=0, expc=1):
     return max_color
 
 
+def _init_worker(compact):
+    """Prepare a worker process of 'search_k' or 'portfolio'.
+    
+    The graph is received only once per worker, and it is copied the
+    same way algorithm C does, so the calls to B made by the worker
+    see exactly the same GRAPH.
+    
+    Args:
+      compact (CompactGraph): the graph to color.
+    """
+    global WORKER_GRAPH, WORKER_STATE
+    
+    WORKER_GRAPH = copy.deepcopy(compact.to_graph())
+    WORKER_STATE = WORKER_GRAPH.snapshot()
+    
+    
+def _probe_k(k, lower=0):
+    """Check if algorithm B is able to color the worker's graph.
+    
+    Args:
+      k (int): the value of k used to call B.
+      lower (int): a lower bound of the chromatic number of the graph,
+        as in algorithm B. Defaults to 0.
+      
+    Returns:
+      boolean: True if and only if B succeeded with the given k.
+    """
+    try:
+        b(k, WORKER_GRAPH, 1, True, lower)
+        return True
+    except RuntimeError:
+        return False
+    finally:
+        WORKER_GRAPH.restore(WORKER_STATE)
+
+
+def search_k(graph, workers, lower=None, minimum=2, bound=None, 
+             compact=None):
+    """Look for the value k0 used by algorithm C with a pool of 
+    processes.
+    
+    Algorithm C calls B with k = 2, 4, 8, ... until B succeeds, and 
+    then uses binary search between the last two values. Here, the
+    first stage calls B with 'workers' powers of 2 at once, and the
+    second stage calls B with all the values of k that the binary
+    search could check in the next log2(workers + 1) steps, so the
+    values found are the same as in the sequential version.
+    
+    As in algorithm C, the values of k greater than or equal to 'bound'
+    are taken as successful without calling B, the doubling starts 
+    above 'lower', and B rejects the values of k below 'minimum'. The
+    pool only receives the values of k that are actually checked.
+    
+    Args:
+      graph (GRAPH): the graph to color.
+      workers (int): the number of processes to use.
+      lower (int): a value of k for which B is known to fail. If None,
+        'minimum' - 1 is used. Defaults to None.
+      minimum (int): a lower bound of the chromatic number of the 
+        graph (see 'bounds'). Defaults to 2.
+      bound (int): a value of k for which B is known to succeed, such
+        as the degeneracy of the graph plus 1 (see 'bounds'). If None,
+        every value of k is checked. Defaults to None.
+      compact (CompactGraph): the graph sent to the workers, such as
+        the one returned by the 'load_graph' method of the 
+        datastructures module, which the workers map instead of 
+        receiving a copy of its arrays. It must have the same 
+        structure as 'graph'. If None, it is built from 'graph'. 
+        Defaults to None.
+      
+    Complexity: O(chi(G) * log2(chi(G)) * (|V| + |E|)) total work, 
+      divided between the workers.
+      
+    Returns:
+      tuple: the values 'lower' and 'upper' of the binary search, and
+        the set of values of k for which B failed.
+    """
+    if lower is None:
+        lower = minimum - 1
+        
+    if compact is None:
+        compact = datastructures.CompactGraph(graph)
+        
+    results = dict()
+    depth = max(1, (workers + 1).bit_length() - 1)
+    
+    def probe(candidates):
+        # Only the values of k below the bound are sent to the pool
+        pending = [k for k in candidates if bound is None or k < bound]
+        
+        for k in candidates:
+            if k not in pending:
+                results[k] = True
+                
+        if pending:
+            checked = pool.map(_probe_k, pending, [minimum] * len(pending))
+            
+            for k, success in zip(pending, checked):
+                results[k] = success
+    
+    with concurrent.futures.ProcessPoolExecutor(
+          max_workers=workers, initializer=_init_worker, 
+          initargs=(compact,)) as pool:
+        exponent = None
+        start = max(lower.bit_length(), 1)
+        first = start
+        
+        # Calls B with 'workers' powers of 2 at once
+        while exponent is None:
+            candidates = list()
+            
+            for x in range(first, first + workers):
+                candidates.append(2 ** x)
+                
+                if bound is not None and 2 ** x >= bound:
+                    break
+                    
+            probe(candidates)
+            
+            for k in candidates:
+                if results[k]:
+                    exponent = k.bit_length() - 1
+                    break
+                    
+            first += workers
+            
+        if exponent > start:
+            lower = 2 ** (exponent - 1)
+            
+        upper = 2 ** exponent
+        
+        # Calls B with the values of the next steps of the binary search
+        while upper - lower > 1:
+            pending = [(lower, upper)]
+            candidates = list()
+            
+            for _ in range(depth):
+                following = list()
+                
+                for low, high in pending:
+                    if high - low > 1:
+                        middle = (low + high) // 2
+                        
+                        if middle not in results:
+                            candidates.append(middle)
+                            
+                        following.append((low, middle))
+                        following.append((middle, high))
+                        
+                pending = following
+                
+            probe(candidates)
+                
+            # Follows the binary search as far as the results allow
+            while upper - lower > 1 and (lower + upper) // 2 in results:
+                middle = (lower + upper) // 2
+                
+                if results[middle]:
+                    upper = middle
+                else:
+                    lower = middle
+                    
+    failed = set(k for k in results if not results[k])
+    
+    return (lower, upper, failed)
+
+
 def sequential_coloring(graph, color_dict=None, color=0):
     """Color the graph sequentially, assigning each node with a unique
     color.
@@ -1128,7 +2101,7 @@ def sequential_coloring(graph, color_dict=None, color=0):
     always O(|V|).
     
     Args:
-      graph (GRAPH): the graph to be colored.
+      graph (GRAPH): the graph to be colored, or an InducedGraph view.
       color_dict (dictionary): a Python dictionary in which the colors
         assigned by the algorithm will be stored. If not given, the
         default global COLORS array will be used. Defaults to None.
@@ -1144,8 +2117,13 @@ def sequential_coloring(graph, color_dict=None, color=0):
     """
     colors_used = 0
     
-    for vertex in graph.vertices:
-        vertex.color = color + colors_used
+    if isinstance(graph, datastructures.InducedGraph):
+        vertices = graph.nodes()
+    else:
+        vertices = graph.vertices
+    
+    for vertex in vertices:
+        graph.set_color(vertex, color + colors_used)
         
         if color_dict is not None:
             color_dict[vertex.nid] = vertex.color
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+
+"""Measure the coloring algorithms on the DIMACS benchmarks.
+
+This module executes the coloring algorithms implemented in the
+'algorithms' module over the DIMACS instances stored in the benchmarks
+directory, and records for every run the time it took, the memory it
+used, the number of colors of the coloring found, and whether that
+coloring is valid. The results are saved in CSV and JSON format, and
+can be compared against the JSON results of a previous execution (the
+'baseline') to find the runs that became slower, that use more memory
+or that produce worse colorings.
+
+The module can be executed from the command line, for example:
+
+    python3 benchmark.py -i myciel3 queen5_5 -a c d -s 0 1 2 \\
+        --json new.json --baseline old.json
+
+With the --footprint option, the algorithms are not executed; instead,
+the memory used by copies of every instance and the time it takes to
+copy and scan them are measured (see 'footprint'), which is what PSO 
+pays for every particle.
+
+Every run colors a fresh copy of the graph, and the pseudo-random
+number generator is seeded before the run, so the SDR algorithms give
+the same coloring for the same seed. The memory is measured in a
+second execution of the run, since tracing the allocations slows down
+the algorithms. The 'peak_memory' of a record belongs to its run; the
+'process_peak_rss' is the highest resident set size the benchmark 
+process has reached so far, so it never decreases from one record to
+the next and only tells how much memory the whole benchmark needed.
+
+Attributes:
+  ALGORITHMS (dict): the algorithms that can be measured, indexed by
+    name. Every function receives a copy of the graph and the k used
+    by algorithm B, and returns the coloring found as a dictionary.
+  BENCHMARKS_DIR (string): the directory that contains the DIMACS
+    instances.
+  FIELDS (list): the fields of every record, in the order they are
+    written to the CSV file.
+  TOLERANCE (float): the relative increase of time or memory over the
+    baseline that is reported as a regression.
+"""
+
+import argparse
+import copy
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import algorithms
+import datastructures
+
+BENCHMARKS_DIR = os.path.join(
+  os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks")
+FIELDS = [
+  "instance", "algorithm", "seed", "vertices", "edges", "colors",
+  "valid", "time", "peak_memory", "process_peak_rss"
+]
+TOLERANCE = 0.25
+
+def _run_b(graph, k):
+    """Run algorithm B with the given k; the coloring is read from the
+    global COLORS of the algorithms module.
+    """
+    algorithms.b(k, graph, 1, True)
+
+    return dict(algorithms.COLORS)
+
+
+def _run_c(graph, k):
+    """Run algorithm C; the coloring is read from the global COLORS of
+    the algorithms module.
+    """
+    algorithms.c(graph)
+
+    return dict(algorithms.COLORS)
+
+
+def _run_d(graph, k):
+    """Run algorithm D; the coloring is read from a fresh dictionary."""
+    colors = dict()
+    algorithms.d(graph, colors)
+
+    return colors
+
+
+def _run_delta_coloring(graph, k):
+    """Run the delta coloring; the coloring is read from a fresh
+    dictionary.
+    """
+    colors = dict()
+    algorithms.delta_coloring(graph, colors, 1)
+
+    return colors
+
+
+def _run_dsatur(graph, k):
+    """Run DSATUR; the coloring is read from a fresh dictionary."""
+    colors = dict()
+    algorithms.dsatur(graph, colors, 1)
+
+    return colors
+
+
+def _run_e(graph, k):
+    """Run algorithm E, which only returns the number of colors; the
+    coloring is the one with fewer colors between the global COLORS
+    left by C and the global GREEDY_COLORS left by D.
+    """
+    algorithms.e(graph)
+
+    return min(dict(algorithms.COLORS), dict(algorithms.GREEDY_COLORS),
+               key=lambda colors: len(set(colors.values())))
+
+
+def _run_first_fit(graph, k):
+    """Run 'first_fit' in smallest-last order; the coloring is read
+    from a fresh dictionary.
+    """
+    colors = dict()
+    algorithms.first_fit(graph, colors, 1, "smallest_last")
+
+    return colors
+
+
+def _run_sdr_c(graph, k):
+    """Run SDR-C; the coloring is read from a fresh dictionary."""
+    colors = dict()
+    algorithms.sdir_c(graph, colors)
+
+    return colors
+
+
+def _run_sdr_d(graph, k):
+    """Run SDR-D; the coloring is read from a fresh dictionary."""
+    colors = dict()
+    algorithms.sdr_d(graph, colors)
+
+    return colors
+
+
+def _run_sdr_widgerson(graph, k):
+    """Run SDR-Widgerson, which colors the graph given; the coloring
+    is read from the colors of its vertices.
+    """
+    algorithms.sdr_widgerson(graph)
+
+    return {vertex.nid: vertex.color for vertex in graph.vertices}
+
+
+def _run_sequential_coloring(graph, k):
+    """Run the sequential coloring; the coloring is read from a fresh
+    dictionary.
+    """
+    colors = dict()
+    algorithms.sequential_coloring(graph, colors, 1)
+
+    return colors
+
+
+ALGORITHMS = {
+  "b": _run_b,
+  "c": _run_c,
+  "d": _run_d,
+  "delta_coloring": _run_delta_coloring,
+  "dsatur": _run_dsatur,
+  "e": _run_e,
+  "first_fit": _run_first_fit,
+  "sdr_c": _run_sdr_c,
+  "sdr_d": _run_sdr_d,
+  "sdr_widgerson": _run_sdr_widgerson,
+  "sequential_coloring": _run_sequential_coloring,
+}
+
+def compare(records, baseline, tolerance=TOLERANCE):
+    """Compare the records of a benchmark against a baseline.
+
+    The records are matched by instance, algorithm and seed. A record
+    is reported as a regression if its coloring is no longer valid, if
+    it uses more colors than in the baseline, or if its time or its
+    peak memory grew more than 'tolerance' times the baseline value.
+
+    Args:
+      records (list): the records of the current benchmark.
+      baseline (list): the records of a previous benchmark.
+      tolerance (float): the relative increase of time and memory
+        that is allowed. Defaults to TOLERANCE.
+
+    Complexity: O(len(records) + len(baseline))
+
+    Returns:
+      list: a dictionary for every record found in the baseline, with
+        the 'instance', 'algorithm' and 'seed' of the record, the
+        ratios 'time' and 'peak_memory' of the current values to the
+        baseline values, the difference of 'colors', and the list of
+        'regressions' found.
+    """
+    previous = {
+      (record["instance"], record["algorithm"], record["seed"]): record
+      for record in baseline
+    }
+    comparison = list()
+
+    for record in records:
+        key = (record["instance"], record["algorithm"], record["seed"])
+        old = previous.get(key)
+
+        if old is None:
+            continue
+
+        regressions = list()
+        ratios = dict()
+
+        for field in ("time", "peak_memory"):
+            if record[field] is None or not old.get(field):
+                ratios[field] = None
+                continue
+
+            ratios[field] = record[field] / old[field]
+
+            if ratios[field] > 1 + tolerance:
+                regressions.append(field)
+
+        if old["valid"] and not record["valid"]:
+            regressions.append("valid")
+
+        if record["colors"] > old["colors"]:
+            regressions.append("colors")
+
+        comparison.append({
+          "instance": record["instance"],
+          "algorithm": record["algorithm"],
+          "seed": record["seed"],
+          "colors": record["colors"] - old["colors"],
+          "time": ratios["time"],
+          "peak_memory": ratios["peak_memory"],
+          "regressions": regressions,
+        })
+
+    return comparison
+
+
+def footprint(graph, copies=1):
+    """Measure the memory used by copies of a graph, and the time it
+    takes to make and scan them.
+    
+    The copies are made the same way the algorithms and the particles
+    of PSO make them, with 'copy.deepcopy'. The memory is the one 
+    still allocated after the copies are made, so it does not include
+    temporary objects. The scan reads the ID of every vertex in every
+    adjacency list of a copy.
+    
+    Args:
+      graph (GRAPH): the graph. It is not modified.
+      copies (int): the number of copies to make. Defaults to 1.
+      
+    Complexity: O(copies * (|V| + |E|))
+    
+    Returns:
+      dict: the 'memory' used by a copy (in bytes), the memory used per
+        'element' (every vertex and both ends of every edge, in bytes),
+        the time to make a copy ('copy_time') and the time to scan it
+        ('scan_time'), in seconds.
+    """
+    start = time.perf_counter()
+    kept = [copy.deepcopy(graph) for _ in range(copies)]
+    copy_time = (time.perf_counter() - start) / copies
+    
+    start = time.perf_counter()
+    
+    for vertex in kept[0].vertices:
+        for neighbor in vertex.data:
+            neighbor.nid
+            
+    scan_time = time.perf_counter() - start
+    del kept
+    
+    tracemalloc.start()
+    
+    try:
+        kept = [copy.deepcopy(graph) for _ in range(copies)]
+        memory = tracemalloc.get_traced_memory()[0] / copies
+    finally:
+        tracemalloc.stop()
+        
+    elements = len(graph.vertices) + 2 * graph.n
+    
+    return {
+      "memory": memory,
+      "element": memory / elements if elements else 0.0,
+      "copy_time": copy_time,
+      "scan_time": scan_time,
+    }
+    
+    
+def is_valid(graph, coloring):
+    """Determine if a coloring is a valid coloring of a graph.
+
+    Unlike the 'check_coloring' method of the GRAPH, this method does
+    not print anything, and also checks that every vertex is colored.
+
+    Args:
+      graph (CompactGraph): the graph.
+      coloring (dict): the colors of the vertices, indexed by ID.
+
+    Complexity: O(|V| + |E|)
+
+    Returns:
+      bool: True if every vertex has a color different from the colors
+        of its neighbors, False otherwise.
+    """
+    colors = list()
+
+    for nid in graph.vertices:
+        if coloring.get(nid, datastructures.SENTINEL) == \
+           datastructures.SENTINEL:
+            return False
+
+        colors.append(coloring[nid])
+
+    offsets = graph.offsets
+    neighbors = graph.neighbors
+
+    for p in range(graph.m):
+        for q in neighbors[offsets[p]:offsets[p + 1]]:
+            if colors[p] == colors[q]:
+                return False
+
+    return True
+
+
+def load_instance(name, compact=False):
+    """Load a DIMACS instance from the benchmarks directory.
+
+    The instance is loaded with 'load_graph', so its binary copy is
+    mapped instead of parsing the file again in later executions.
+
+    Args:
+      name (string): the name of the instance, with or without the
+        '.col' extension, or the path to any DIMACS file.
+      compact (boolean): if True, the mapped CompactGraph is returned
+        instead of a GRAPH. Defaults to False.
+
+    Complexity: O(|V| + |E|)
+
+    Returns:
+      GRAPH: the graph stored in the instance, or a CompactGraph if
+        'compact' is True.
+    """
+    filename = name if os.path.exists(name) else \
+               os.path.join(BENCHMARKS_DIR, name)
+
+    if not os.path.exists(filename):
+        filename += ".col"
+
+    return datastructures.load_graph(filename, compact)
+
+
+def measure(graph, algorithm, seed, k=None, memory=True):
+    """Measure a single run of an algorithm.
+
+    Args:
+      graph (GRAPH): the graph to color. It is not modified.
+      algorithm (string): the name of the algorithm, as in ALGORITHMS.
+      seed (int): the seed for the pseudo-random number generator.
+      k (int): the k given to algorithm B. Defaults to None.
+      memory (boolean): if True, the run is executed again while
+        tracing the memory allocations, to find its peak memory.
+        Defaults to True.
+
+    Complexity: the complexity of the algorithm.
+
+    Returns:
+      dict: the 'colors' used, the 'coloring' found, the 'time' of the
+        run (in seconds), its 'peak_memory' (in bytes, or None if it
+        was not measured) and the 'process_peak_rss', the highest
+        resident set size reached by the process since it started, not
+        only by this run (in kilobytes, or None if it is not 
+        available).
+    """
+    run = ALGORITHMS[algorithm]
+
+    work = copy.deepcopy(graph)
+    random.seed(seed)
+    start = time.perf_counter()
+    coloring = run(work, k)
+    elapsed = time.perf_counter() - start
+
+    peak_memory = None
+
+    if memory:
+        work = copy.deepcopy(graph)
+        random.seed(seed)
+        tracemalloc.start()
+
+        try:
+            run(work, k)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    process_peak_rss = None
+
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        process_peak_rss = usage.ru_maxrss
+
+    return {
+      "colors": len(set(coloring.values())),
+      "coloring": coloring,
+      "time": elapsed,
+      "peak_memory": peak_memory,
+      "process_peak_rss": process_peak_rss,
+    }
+
+
+def run(instances, algorithms_used=None, seeds=(0,), memory=True,
+        callback=None):
+    """Measure a set of algorithms over a set of instances.
+
+    Every algorithm is executed once for every seed on every instance.
+    Algorithm B requires a k such that the graph is k-colorable; the
+    smallest k for which B succeeds is looked for before measuring it,
+    and that time is not included in the record.
+
+    Args:
+      instances (list): the names of the instances (see
+        'load_instance').
+      algorithms_used (list): the names of the algorithms, as in
+        ALGORITHMS. If None, all of them are measured. Defaults to
+        None.
+      seeds (list): the seeds of the runs. Defaults to (0,).
+      memory (boolean): if True, the peak memory of every run is
+        measured. Defaults to True.
+      callback (function): a function called with every record as
+        soon as it is measured. Defaults to None.
+
+    Returns:
+      list: a record for every run, with the fields in FIELDS.
+
+    Raises:
+      ValueError: if an unknown algorithm is given.
+    """
+    if algorithms_used is None:
+        algorithms_used = list(ALGORITHMS)
+
+    for algorithm in algorithms_used:
+        if algorithm not in ALGORITHMS:
+            raise ValueError("Unknown algorithm: {0}".format(algorithm))
+
+    records = list()
+
+    for instance in instances:
+        compact = load_instance(instance, True)
+        graph = compact.to_graph()
+        k = smallest_k(graph) if "b" in algorithms_used else None
+
+        for algorithm in algorithms_used:
+            for seed in seeds:
+                try:
+                    result = measure(graph, algorithm, seed, k, memory)
+                except RuntimeError:
+                    result = {
+                      "colors": datastructures.SENTINEL,
+                      "coloring": dict(),
+                      "time": None,
+                      "peak_memory": None,
+                      "process_peak_rss": None,
+                    }
+
+                record = {
+                  "instance": os.path.basename(instance),
+                  "algorithm": algorithm,
+                  "seed": seed,
+                  "vertices": compact.m,
+                  "edges": compact.n,
+                  "colors": result["colors"],
+                  "valid": is_valid(compact, result["coloring"]),
+                  "time": result["time"],
+                  "peak_memory": result["peak_memory"],
+                  "process_peak_rss": result["process_peak_rss"],
+                }
+                records.append(record)
+
+                if callback is not None:
+                    callback(record)
+
+    return records
+
+
+def save_csv(records, filename):
+    """Save the records of a benchmark in a CSV file.
+
+    Args:
+      records (list): the records to save.
+      filename (string): the name of the CSV file.
+    """
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def save_json(records, filename):
+    """Save the records of a benchmark in a JSON file.
+
+    The JSON file can be used as the baseline of later benchmarks.
+
+    Args:
+      records (list): the records to save.
+      filename (string): the name of the JSON file.
+    """
+    with open(filename, "w") as f:
+        json.dump(records, f, indent=2)
+
+
+def smallest_k(graph):
+    """Find the smallest k for which algorithm B colors the graph.
+
+    Algorithm B only colors k-colorable graphs, so this is the hardest
+    k that can be given to it.
+
+    Args:
+      graph (GRAPH): the graph. It is not modified.
+
+    Complexity: O(chi(G) * |V| * (|V| + |E|))
+
+    Returns:
+      int: the smallest k for which B does not fail.
+    """
+    copy_graph = copy.deepcopy(graph)
+    state = copy_graph.snapshot()
+    k = 2
+
+    while True:
+        try:
+            algorithms.b(k, copy_graph, 1, True)
+            return k
+        except RuntimeError:
+            k += 1
+        finally:
+            copy_graph.restore(state)
+
+
+def main(args=None):
+    """Execute the benchmark from the command line.
+
+    Args:
+      args (list): the command line arguments. If None, the arguments
+        given to the script are used. Defaults to None.
+
+    Returns:
+      int: 1 if a regression was found against the baseline, 0
+        otherwise.
+    """
+    parser = argparse.ArgumentParser(
+      description="Measure the coloring algorithms on DIMACS instances.")
+    parser.add_argument(
+      "-i", "--instances", nargs="+",
+      help="the instances to use (defaults to all of the benchmarks)")
+    parser.add_argument(
+      "-a", "--algorithms", nargs="+", choices=sorted(ALGORITHMS),
+      help="the algorithms to measure (defaults to all of them)")
+    parser.add_argument(
+      "-s", "--seeds", nargs="+", type=int, default=[0],
+      help="the seeds of the runs (defaults to 0)")
+    parser.add_argument("--csv", help="save the records in a CSV file")
+    parser.add_argument("--json", help="save the records in a JSON file")
+    parser.add_argument(
+      "--baseline", help="compare the records against this JSON file")
+    parser.add_argument(
+      "--tolerance", type=float, default=TOLERANCE,
+      help="the relative increase reported as a regression")
+    parser.add_argument(
+      "--no-memory", action="store_true",
+      help="do not trace the peak memory of the runs")
+    parser.add_argument(
+      "--footprint", type=int, metavar="COPIES",
+      help="measure the memory and copy time of this many copies of "
+           "every instance, instead of running the algorithms")
+    options = parser.parse_args(args)
+
+    instances = options.instances
+
+    if instances is None:
+        instances = sorted(
+          name[:-4] for name in os.listdir(BENCHMARKS_DIR)
+          if name.endswith(".col"))
+          
+    if options.footprint is not None:
+        for instance in instances:
+            result = footprint(load_instance(instance), options.footprint)
+            print("{0:<12} {1:>10.0f} B {2:>7.1f} B/element {3:.4f}s copy "
+                  "{4:.4f}s scan".format(
+                    os.path.basename(instance), result["memory"],
+                    result["element"], result["copy_time"],
+                    result["scan_time"]))
+                    
+        return 0
+
+    def report(record):
+        print("{0:<12} {1:<20} {2:>4} {3:>6} {4:<5} {5}".format(
+          record["instance"], record["algorithm"], record["seed"],
+          record["colors"], str(record["valid"]),
+          "FAILED" if record["time"] is None
+          else "{0:.4f}s".format(record["time"])))
+
+    records = run(instances, options.algorithms, options.seeds,
+                  not options.no_memory, report)
+
+    if options.csv is not None:
+        save_csv(records, options.csv)
+
+    if options.json is not None:
+        save_json(records, options.json)
+
+    if options.baseline is None:
+        return 0
+
+    with open(options.baseline, "r") as f:
+        baseline = json.load(f)
+
+    found = False
+
+    for entry in compare(records, baseline, options.tolerance):
+        if entry["regressions"]:
+            found = True
+            print("REGRESSION {0} {1} {2}: {3} (time x{4}, memory x{5}, "
+                  "colors {6:+d})".format(
+                    entry["instance"], entry["algorithm"], entry["seed"],
+                    ", ".join(entry["regressions"]),
+                    "?" if entry["time"] is None
+                    else "{0:.2f}".format(entry["time"]),
+                    "?" if entry["peak_memory"] is None
+                    else "{0:.2f}".format(entry["peak_memory"]),
+                    entry["colors"]))
+
+    if not found:
+        print("No regressions found against {0}".format(options.baseline))
+
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,11 +17,90 @@ DEGREE is used to maintain the degree of each vertex, so that it
 can be updated in constant time with each removal of an edge, and
 have a constant time access to a vertex of maximum degree.
 
+Journal records the changes made to a GRAPH so they can be undone,
+which allows algorithms to restore a GRAPH instead of copying it.
+
+Sampler keeps the weights of the buckets of a DEGREE in a FenwickTree,
+so that random vertices can be choosed without walking the buckets.
+
+CompactGraph is a fixed-structure, array based representation of a GRAPH in
+the Compressed Sparse Row format, intended for fast scans over large
+graphs where the linked structure of GRAPH is not needed.
+
+InducedGraph is a view of the subgraph induced by some vertices of a
+GRAPH, which algorithm B uses to recurse on the neighborhood of a 
+vertex without modifying the GRAPH.
+
 Attributes:
+  BINARY_HEADER (Struct): the layout of the header of the binary files
+    written by 'to_binary': the magic string, the number of vertices,
+    the number of edges, the flags, and the size, modification time
+    and SHA-1 hash of the file the graph was read from.
+  BINARY_MAGIC (bytes): the string that starts every binary file.
+  BINARY_SUFFIX (string): the suffix added to the name of a graph file
+    to get the name of its binary cache.
+  DIMACS_EDGE (Pattern): the expression matching the edge lines of a
+    DIMACS file.
+  DIMACS_PROBLEM (Pattern): the expression matching the problem line of
+    a DIMACS file.
   SCRIPT_VERSION (float): the current version of the script.
   SENTINEL (int) : a sentinel value, used to denote illegal values.
   
 History:
+    * 1.6
+        - Added the CompactGraph class, a Compressed Sparse Row version
+            of the GRAPH that answers the same queries (degrees,
+            neighbors, coloring checks) using flat arrays.
+        - Added the Journal class and the GRAPH 'snapshot', 'restore'
+            and 'release' methods, to undo the changes made by
+            destructive algorithms instead of working on deep copies.
+        - Added the GRAPH 'set_color' method, so that colors can be
+            restored along with the rest of the GRAPH.
+        - Added the Sampler and FenwickTree classes, used by the GRAPH
+            'get_random_vertex' method to choose vertices in O(log |V|)
+            time for the proposals whose distribution can be 
+            reproduced (Proposals 7, 8, 11, 12, 15, 16, 19, 20, 26 and
+            28 - 32, with any exponent).
+        - Added the DEGREE 'remove' method, so that the sampler is
+            updated when a vertex leaves the DEGREE.
+        - Added the GRAPH 'fingerprint' method, to identify GRAPHS with
+            the same structure.
+        - Added the DEGREE 'slots' attribute, an array with the buckets
+            indexed by degree, and the DEGREE 'increase' method.
+        - Modified the DEGREE to keep the 'max_degree' and 'min_degree'
+            attributes updated with every change, so the GRAPH 
+            'get_max_degree', 'get_min_degree' and 'subgraph' methods
+            no longer scan the buckets.
+        - Modified the 'from_dimacs' method to parse the whole file in
+            a single pass, skip repeated edges and build the adjacency
+            lists in bulk. It can also return a CompactGraph.
+        - Added the DoublyLinkedList 'extend' method.
+        - Added the GRAPH 'smallest_last' method, which computes the
+            smallest-last order and the degeneracy of the GRAPH.
+        - Added the ResidualGraph class, used by the Greedy Independent
+            Set algorithm to build the color classes without destroying
+            and restoring a GRAPH.
+        - Added the 'to_binary', 'from_binary' and 'load_graph' methods,
+            that keep a binary copy of the CompactGraph of a file next
+            to it and map it in memory instead of parsing the file.
+        - Now Node and DoublyLinkedList declare their attributes in 
+            '__slots__', to reduce the memory used by every GRAPH.
+        - Now every iteration over a DoublyLinkedList uses its own 
+            iterator, instead of a pointer stored in the list, so the
+            iterations can be nested. Added the DoublyLinkedList 'nids',
+            'nodes' and 'choice' methods; the proposals use 'choice' to
+            pick a random vertex of a bucket without copying it.
+        - Added the DEGREE 'keys' attribute, a sorted array with the 
+            degrees of the buckets, so a new bucket is linked in place
+            in O(log d) time instead of scanning the 'slots' array.
+        - Added the DEGREE 'extend' method, which places the vertices
+            in their buckets with a counting sort. It is used by the
+            GRAPH 'build_DEGREE' method.
+        - Added the InducedGraph class, a view of an induced subgraph 
+            of a GRAPH that keeps a mask of its vertices and their 
+            degrees inside the view, used by algorithm B instead of the
+            GRAPH 'subgraph' method.
+
     * 1.5
         - Added the 'from_json' method, that allows to fully recreate
             GRAPHS stored in JSON format.
@@ -105,12 +184,29 @@ History:
             DEGREES.
 """
 
+import bisect
+import collections
+import hashlib
 import json
+import math
+import mmap
+import os
 import random
+import re
+import struct
+
+from array import array
 
-SCRIPT_VERSION = 1.5
+BINARY_HEADER = struct.Struct("=8sqqqqq20s4x")
+BINARY_MAGIC = b"CSRGRAPH"
+BINARY_SUFFIX = ".bin"
+SCRIPT_VERSION = 1.6
 SENTINEL = 2 ** 63 - 1
 
+DIMACS_EDGE = re.compile(rb"^e[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+DIMACS_PROBLEM = re.compile(
+  rb"^p[ \t]+\S+[ \t]+(\d+)[ \t]+(\d+)", re.MULTILINE)
+
 
 class Node(object):
     """Represent the basic unit of a doubly linked list.
@@ -132,6 +228,12 @@ class Node(object):
     'color' attribute that can be used to store the color of the node
     assigned to it by a coloring algorithm.
     
+    A GRAPH holds a Node for every vertex, for both ends of every edge
+    and for every vertex inside the DEGREE, so Nodes declare their 
+    attributes in '__slots__' and have no '__dict__'. This reduces the
+    memory used by every Node by about a third, but other attributes
+    cannot be added to them.
+    
     Attributes:
       bucket (Node): a reference to the bucket the Node occupies within
         the DEGREE data structure (see DEGREE for more details).
@@ -148,6 +250,8 @@ class Node(object):
         on a linked list.
     """
     
+    __slots__ = ("bucket", "color", "data", "flag", "head", "nid", "tail")
+    
     def __init__(
             self, nid, bucket=None, color=SENTINEL, data=None, 
             flag=False, head=None, tail=None):
@@ -333,9 +437,14 @@ class DoublyLinkedList(object):
     indexing or checking existence. This does not modify the normal 
     behavior of a normal doubly linked list.
     
+    As Nodes, DoublyLinkedLists declare their attributes in 
+    '__slots__', since a GRAPH holds one for every vertex.
+    
+    Every iteration over a DoublyLinkedList uses its own iterator, so
+    a list can be iterated by nested loops, or by several readers at 
+    the same time, without the iterations interfering with each other.
+    
     Attributes:
-      current (Node): a pointer to the Node that is being used right
-        now. It is used to iterate over the list.
       elements (dict): the dictionary containing the nodes inside the
         list. It is used to increase efficiency in tasks such as
         indexing and checking existence.
@@ -347,12 +456,13 @@ class DoublyLinkedList(object):
         the None value.
     """
     
+    __slots__ = ("elements", "first", "last")
+    
     def __init__(self):
         """Create a new, empty doubly linked list.
         
         Complexity: O(1)
         """
-        self.current = None
         self.elements = dict()
         self.first = None
         self.last = None
@@ -408,20 +518,17 @@ class DoublyLinkedList(object):
             return None
     
     def __iter__(self):
-        """Prepare the list to be iterated.
+        """Create a new iterator over the Nodes of the list.
         
-        This methods changes the pointer for the current node to the
-        first node in the list. Since a pointer to the first element
-        is always kept, this method takes O(1) time.
+        The list itself is not modified, so every call creates an 
+        iterator independent of the others (see 'nodes').
         
         Complexity: O(1)
         
         Returns:
-          DoublyLinkedList: the list itself.
+          generator: the Nodes of the list, from the first to the last.
         """
-        self.current = self.first
-        
-        return self
+        return self.nodes()
     
     def __len__(self):
         """Determine the size of the DoublyLinkedList.
@@ -438,31 +545,6 @@ class DoublyLinkedList(object):
         """
         return len(self.elements)
     
-    def __next__(self):
-        """Move the pointer to the next element on the list.
-        
-        If the current pointer is None, then the end of the list was
-        reached, and thus the iteration is stopped. Following the
-        "head" and "tail" pointers is done in O(1), so this method
-        takes O(1) time.
-        
-        Complexity: O(1)
-        
-        Returns:
-          Node: the next element to use during an iteration of 
-            the list.
-        """
-        if self.current is None:
-            raise StopIteration
-        elif self.current.tail is not None:
-            self.current = self.current.tail
-            
-            return self.current.head
-        else:
-            self.current = self.current.tail
-            
-            return self.last
-    
     def __str__(self):
         """Constructs a readable version of the doubly linked list
         
@@ -530,6 +612,60 @@ class DoublyLinkedList(object):
         else:
             return False
     
+    def choice(self):
+        """Choose a node of the list with uniform probability.
+        
+        A random position is choosed and the list is walked up to it,
+        so no list of the Node IDs is built. The pseudo-random number
+        generator is used exactly as 'random.choice' does with a list
+        of the same length.
+        
+        Complexity: O(n), where n is the size of the list.
+        
+        Returns:
+          Node: the node choosed, or None if the list is empty.
+        """
+        if self.is_empty():
+            return None
+            
+        index = random.randrange(len(self.elements))
+        
+        for node in self.nodes():
+            if index == 0:
+                return node
+                
+            index -= 1
+    
+    def extend(self, nodes):
+        """Append several nodes at the end of the list.
+        
+        The nodes are linked in the given order in a single pass, which
+        is faster than appending them one by one. The nodes must not be
+        in the list already, since this is not checked.
+        
+        Args:
+          nodes (iterable): the nodes to be appended.
+          
+        Complexity: O(len(nodes))
+        """
+        elements = self.elements
+        previous = self.last
+        
+        for node in nodes:
+            node.head = previous
+            
+            if previous is None:
+                self.first = node
+            else:
+                previous.tail = node
+                
+            elements[node.nid] = node
+            previous = node
+            
+        if previous is not None:
+            previous.tail = None
+            self.last = previous
+            
     def insert(self, value):
         """Inserts the given value as a new Node in the list.
         
@@ -567,18 +703,18 @@ class DoublyLinkedList(object):
         if value < self.last.nid:
             return self.append(Node(value))
         
-        self.current = self.first
+        current = self.first
         
         # Iterates over the list
-        while self.current is not None:
+        while current is not None:
             # Checks the values
-            if value > self.current.nid:
+            if value > current.nid:
                 # New node is inserted at the beginning
-                if self.current is self.first:
+                if current is self.first:
                     new_vertex = Node(value)
-                    self.current.head = new_vertex
+                    current.head = new_vertex
                     
-                    new_vertex.tail = self.current
+                    new_vertex.tail = current
                     new_vertex.head = None
                     self.first = new_vertex
                     
@@ -589,17 +725,17 @@ class DoublyLinkedList(object):
                 else:
                     new_vertex = Node(value)
                     
-                    new_vertex.head = self.current.head
-                    new_vertex.tail = self.current
+                    new_vertex.head = current.head
+                    new_vertex.tail = current
                     
-                    self.current.head.tail = new_vertex
-                    self.current.head = new_vertex
+                    current.head.tail = new_vertex
+                    current.head = new_vertex
                     
                     self.elements[value] = new_vertex
                     
                     return True
             
-            self.current = self.current.tail
+            current = current.tail
             
         # We shouldn't exit the cycle
         return False
@@ -621,6 +757,47 @@ class DoublyLinkedList(object):
         """
         return self.first is None and self.last is None
     
+    def nids(self):
+        """Iterate over the Node IDs of the list, in the order of the 
+        list.
+        
+        This is the same as iterating over the Nodes (see 'nodes') and
+        reading their IDs, without making the Nodes visible.
+        
+        Complexity: O(1) per Node ID.
+        
+        Returns:
+          generator: the Node IDs of the list, from the first to the
+            last.
+        """
+        node = self.first
+        
+        while node is not None:
+            following = node.tail
+            yield node.nid
+            node = following
+    
+    def nodes(self):
+        """Iterate over the Nodes of the list, in the order of the list.
+        
+        The iterator keeps its own pointer to the following Node, 
+        which it reads before returning the current Node, so the Node
+        just returned can be removed from the list (or moved to another
+        list) without stopping the iteration. Nodes are not copied, and
+        the list can be iterated by any number of iterators at a time.
+        
+        Complexity: O(1) per Node.
+        
+        Returns:
+          generator: the Nodes of the list, from the first to the last.
+        """
+        node = self.first
+        
+        while node is not None:
+            following = node.tail
+            yield node
+            node = following
+    
     def remove(self, nid):
         """Removes the Node with the Node ID given from the list.
         
@@ -718,6 +895,9 @@ class GRAPH(object):
     Attributes:
       degrees (DEGREE): the data structure that contains the degrees of
         all vertices in the GRAPH.
+      journal (Journal): the record of the changes made to the GRAPH
+        since its first snapshot was taken, or None if no snapshot is
+        active (see 'snapshot' for more details).
       m (int): the number of vertices inside the GRAPH.
       n (int): the number of edges inside the GRAPH.
       vertices (DoublyLinkedList): the doubly linked list that contains
@@ -730,6 +910,7 @@ class GRAPH(object):
         Complexity: O(1)
         """
         self.degrees = None
+        self.journal = None
         self.m = 0
         self.n = 0
         self.vertices = DoublyLinkedList()
@@ -832,6 +1013,46 @@ class GRAPH(object):
           "\n".join(adjacencies)
         )
     
+    def _append(self, linked_list, node):
+        """Append a node to one of the lists of the GRAPH.
+        
+        If a snapshot is active, the operation is recorded in the
+        GRAPH's journal so it can be undone later.
+        
+        Args:
+          linked_list (DoublyLinkedList): the list to modify.
+          node (Node): the node to append.
+          
+        Complexity: O(1)
+        
+        Returns:
+          boolean: True if and only if the node was appended.
+        """
+        if self.journal is None:
+            return linked_list.append(node)
+        
+        return self.journal.append(linked_list, node)
+    
+    def _remove(self, linked_list, nid):
+        """Remove a node from one of the lists of the GRAPH.
+        
+        If a snapshot is active, the operation is recorded in the
+        GRAPH's journal so it can be undone later.
+        
+        Args:
+          linked_list (DoublyLinkedList): the list to modify.
+          nid (int): the Node ID of the node to remove.
+          
+        Complexity: O(1)
+        
+        Returns:
+          Node: the removed node, or None if it was not in the list.
+        """
+        if self.journal is None:
+            return linked_list.remove(nid)
+        
+        return self.journal.remove(linked_list, nid)
+    
     def add_edge(self, endA, endB):
         """Add a new edge to the GRAPH.
         
@@ -866,8 +1087,9 @@ class GRAPH(object):
             neighborB.data = neighborA
             
             # Updates the adjacency list for both neighbors
-            result = self.vertices[endA].data.append(neighborB)
-            result = result and self.vertices[endB].data.append(neighborA)
+            result = self._append(self.vertices[endA].data, neighborB)
+            result = result and self._append(
+              self.vertices[endB].data, neighborA)
             
             if result:
                 self.n += 1
@@ -898,7 +1120,7 @@ class GRAPH(object):
             new_vertex = Node(vid)
             new_vertex.data = DoublyLinkedList()            
 
-            self.vertices.append(new_vertex)
+            self._append(self.vertices, new_vertex)
             
             self.m += 1
             
@@ -910,18 +1132,15 @@ class GRAPH(object):
         """Builds the DEGREE data structure of the GRAPH.
         
         Building a DEGREE data structure involves iterating over
-        all the vertices. Determine the bucket of a vertex can be
-        done in O(1) time (since DEGREE uses DoublyLinkedList to
-        store the buckets), but adding the vertex to a bucket takes
-        O(|E|), so the overall complexity of building the DEGREE data
-        structure is O(|V| + |E|).
+        all the vertices. The degree of a vertex is known in O(1) 
+        time, and the vertices are sorted into their buckets with a 
+        counting sort (see the DEGREE 'extend' method), so building the
+        DEGREE data structure takes O(|V| + max degree) time.
         
-        Complexity: O(|V| + |E|)
+        Complexity: O(|V| + max degree)
         """
-        self.degrees = DEGREE()
-        
-        for vertex in self.vertices:
-            self.degrees.add(vertex)
+        self.degrees = DEGREE(self.journal)
+        self.degrees.extend(self.vertices)
             
     def check_coloring(self):
         """Check that the GRAPH has a valid coloring.
@@ -941,12 +1160,12 @@ class GRAPH(object):
           RuntimeError: If two adjacent vertices share the same color.
         """
         for v in self.vertices:
-            for neighbor in v.data:
-                if v.color == self.vertices[neighbor.nid].color:
+            for nid in v.data.nids():
+                if v.color == self.vertices[nid].color:
                     raise RuntimeError(
                       "INVALID COLORING: vertex {0} and vertex {1} share the color {2}".format(
                         v.nid, 
-                        neighbor.nid,
+                        nid,
                         v.color
                       )
                     )
@@ -985,8 +1204,8 @@ class GRAPH(object):
             nodeB = nodeA.data
                         
             # Deletes the edge
-            result = (listA.remove(nodeA.nid) is not None)
-            result = result and (listB.remove(nodeB.nid) is not None)
+            result = (self._remove(listA, nodeA.nid) is not None)
+            result = result and (self._remove(listB, nodeB.nid) is not None)
             
             if result:
                 self.n -= 1
@@ -1022,8 +1241,32 @@ class GRAPH(object):
         else:
             self.m -= 1
             
-            return self.vertices.remove(vid)
+            return self._remove(self.vertices, vid)
+            
+    def fingerprint(self):
+        """Compute a value that identifies the structure of the GRAPH.
+        
+        Two GRAPHS have the same fingerprint if and only if (barring
+        hash collisions) they have the same vertices and adjacency 
+        lists, in the same order. Since deterministic algorithms only
+        depend on that, their results can be reused for every GRAPH 
+        with the same fingerprint. The colors are not included.
+        
+        Complexity: O(|V| + |E|)
+        
+        Returns:
+          string: the hexadecimal SHA-1 digest of the vertices and 
+            their adjacency lists.
+        """
+        digest = hashlib.sha1()
+        
+        for vertex in self.vertices:
+            neighbors = [vertex.nid, len(vertex.data)]
+            neighbors.extend(neighbor.nid for neighbor in vertex.data)
+            digest.update(array('q', neighbors).tobytes())
             
+        return digest.hexdigest()
+        
     def get_colors_used(self):
         """Get the amount of different colors used in the graph.
         
@@ -1048,10 +1291,10 @@ class GRAPH(object):
         
         If the DEGREE data structure has not been created, this method
         takes O(|V| + |E|) to complete; if it has been created, it only
-        takes O(|E|) time.
+        takes O(1) time.
         
         Complexity: O(|V| + |E|) if DEGREE hasn't been created, 
-          O(|E|) otherwise.
+          O(1) otherwise.
         
         Returns:
           int: the maximum degree found in the GRAPH.
@@ -1059,13 +1302,6 @@ class GRAPH(object):
         if self.degrees is None:
             self.build_DEGREE()
             
-        current_degree = self.degrees.buckets.first
-        
-        while current_degree.data.is_empty():
-            current_degree = current_degree.tail
-            
-        self.degrees.max_degree = current_degree.nid
-            
         return self.degrees.max_degree
         
     def get_max_degree_vertex(self):
@@ -1078,10 +1314,10 @@ class GRAPH(object):
         
         If the DEGREE data structure has not been created, this method
         takes O(|V| + |E|) to complete; if it has been created, it only
-        takes O(|E|) time.
+        takes O(1) time.
         
         Complexity: O(|V| + |E|) if DEGREE hasn't been created,
-          O(|E|) otherwise.
+          O(1) otherwise.
         
         Returns:
           Node: A node with maximum degree inside the GRAPH.
@@ -1090,14 +1326,7 @@ class GRAPH(object):
             self.build_DEGREE()
         
         # Gets the copy of a vertex with maximum degree
-        vertex = None
-        current_bucket = self.degrees.buckets.first
-        
-        # Checks if the vertex is not None
-        while vertex is None:
-            vertex = current_bucket.data.first
-            self.degrees.max_degree = current_bucket.nid
-            current_bucket = current_bucket.tail            
+        vertex = self.degrees.slots[self.degrees.max_degree].data.first
         
         # Return the original vertex from the graph
         return vertex.data
@@ -1111,10 +1340,10 @@ class GRAPH(object):
         
         If the DEGREE data structure has not been created, this method
         takes O(|V| + |E|) to complete; if it has been created, it only
-        takes O(|E|) time.
+        takes O(1) time.
         
         Complexity: O(|V| + |E|) if DEGREE hasn't been created, 
-          O(|E|) otherwise.
+          O(1) otherwise.
         
         Returns:
           int: the minimum degree found in the GRAPH.
@@ -1122,13 +1351,6 @@ class GRAPH(object):
         if self.degrees is None:
             self.build_DEGREE()
             
-        current_degree = self.degrees.buckets.last
-        
-        while current_degree.data.is_empty():
-            current_degree = current_degree.head
-            
-        self.degrees.min_degree = current_degree.nid
-            
         return self.degrees.min_degree
         
     def get_min_degree_vertex(self):
@@ -1141,10 +1363,10 @@ class GRAPH(object):
         
         If the DEGREE data structure has not been created, this method
         takes O(|V| + |E|) to complete; if it has been created, it only
-        takes O(|E|) time.
+        takes O(1) time.
         
         Complexity: O(|V| + |E|) if DEGREE hasn't been created,
-          O(|E|) otherwise.
+          O(1) otherwise.
         
         Returns:
           Node: A node with minimum degree inside the GRAPH.
@@ -1153,14 +1375,7 @@ class GRAPH(object):
             self.build_DEGREE()
         
         # Gets the copy of a vertex with minimum degree
-        vertex = None
-        current_bucket = self.degrees.buckets.last
-        
-        # Checks that the vertex is not None
-        while vertex is None:
-            vertex = current_bucket.data.first
-            self.degrees.min_degree = current_bucket.nid
-            current_bucket = current_bucket.head
+        vertex = self.degrees.slots[self.degrees.min_degree].data.first
         
         # Return the original vertex from the graph
         return vertex.data
@@ -1176,6 +1391,11 @@ class GRAPH(object):
         information about the metodology used to choose the vertices
         inside every proposal. 
         
+        The proposals supported by the Sampler are not run directly:
+        a Sampler is kept in the DEGREE and reused by the following
+        calls, so each vertex is choosed in O(log |V|) time with the
+        same distribution as the proposal.
+        
         Args:
           proposal (int): tells the method which of the proposals
             to use to select a vertex 'randomly'. If not given, a
@@ -1193,81 +1413,27 @@ class GRAPH(object):
         if self.degrees is None:
             self.build_DEGREE()
             
-        if proposal == 1:
-            return self.proposal_1()
-        elif proposal == 2:
-            return self.proposal_2()
-        elif proposal == 3:
-            return self.proposal_3()
-        elif proposal == 4:
-            return self.proposal_4()
-        elif proposal == 5:
-            return self.proposal_5()
-        elif proposal == 6:
-            return self.proposal_6()
-        elif proposal == 7:
-            return self.proposal_7()
-        elif proposal == 8:
-            return self.proposal_8(exp)
-        elif proposal == 9:
-            return self.proposal_9()
-        elif proposal == 10:
-            return self.proposal_10()
-        elif proposal == 11:
-            return self.proposal_11()
-        elif proposal == 12:
-            return self.proposal_12()
-        elif proposal == 13:
-            return self.proposal_13()
-        elif proposal == 14:
-            return self.proposal_14()
-        elif proposal == 15:
-            return self.proposal_15()
-        elif proposal == 16:
-            return self.proposal_16()
-        elif proposal == 17:
-            return self.proposal_17()
-        elif proposal == 18:
-            return self.proposal_18()
-        elif proposal == 19:
-            return self.proposal_19()
-        elif proposal == 20:
-            return self.proposal_20()
-        elif proposal == 21:
-            return self.proposal_21()
-        elif proposal == 22:
-            return self.proposal_22()
-        elif proposal == 23:
-            return self.proposal_23()
-        elif proposal == 24:
-            return self.proposal_24()
-        elif proposal == 25:
-            return self.proposal_25()
-        elif proposal == 26:
-            return self.proposal_26()
-        elif proposal == 27:
-            return self.proposal_27()
-        elif proposal == 28:
-            return self.proposal_28()
-        elif proposal == 29:
-            return self.proposal_29()
-        elif proposal == 30:
-            return self.proposal_30(exp)
-        elif proposal == 31:
-            return self.proposal_31()
-        elif proposal == 32:
-            return self.proposal_32()
-        elif proposal == 33:
-            return self.proposal_33()
-        elif proposal == 34:
-            return self.proposal_34()
-        elif proposal == 35:
-            return self.proposal_35()
-        elif proposal == 36:
-            return self.proposal_36()
+        # Uses the sampler when it can reproduce the proposal
+        if proposal in Sampler.PROPOSALS:
+            rate = exp if proposal in (8, 30) else 1
+            sampler = self.degrees.sampler
+            
+            if (sampler is None or sampler.proposal != proposal 
+                  or sampler.exp != rate):
+                sampler = Sampler(self.degrees, proposal, rate)
+                self.degrees.sampler = sampler
+                
+            vertex = sampler.sample(self)
+            
+            if vertex is not None:
+                return vertex
+            
+        if proposal in (8, 30):
+            return getattr(self, "proposal_{0}".format(proposal))(exp)
+        elif proposal in range(1, 37):
+            return getattr(self, "proposal_{0}".format(proposal))()
         else:
-            candidates = list(self.vertices.elements.keys())
-            return self.vertices[random.choice(candidates)]
+            return self.vertices.choice()
         
     def is_valid(self, nid, color):
         """Check if the Node can be assigned with the given color.
@@ -1289,8 +1455,8 @@ class GRAPH(object):
         """
         vertex = self.vertices[nid]
         
-        for neighbor in vertex.data:
-            if color == self.vertices[neighbor.nid].color:
+        for neighbor_nid in vertex.data.nids():
+            if color == self.vertices[neighbor_nid].color:
                 return False
                 
         return True
@@ -1381,8 +1547,7 @@ class GRAPH(object):
             p = (bucket.nid * len(bucket)) / (2 * self.n)
           
             if random.uniform(0, 1) < p:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
                 
@@ -1468,8 +1633,7 @@ class GRAPH(object):
             
             if t < p:
             #if random.uniform(0, 1) < p:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
                 
@@ -1558,8 +1722,7 @@ class GRAPH(object):
             summa += (bucket.nid * len(bucket)) / (2 * self.n)
             
             if not bucket.data.is_empty() and random.uniform(0, 1) < summa:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
         
@@ -1649,8 +1812,7 @@ class GRAPH(object):
             summa += ( (bucket.nid * len(bucket)) / (2 * self.n) ) ** exp
             
             if throw < summa:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
                 
@@ -1739,8 +1901,7 @@ class GRAPH(object):
             summa += (bucket.nid * len(bucket)) / (2 * self.n)
             
             if random.uniform(0, 1) < summa and not bucket.data.is_empty():
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
         
@@ -1828,8 +1989,7 @@ class GRAPH(object):
             summa += (bucket.nid * len(bucket)) / (2 * self.n)
             
             if throw < summa:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
                 
@@ -1917,8 +2077,7 @@ class GRAPH(object):
             summa += ((bucket.nid + 1) * len(bucket)) / (self.m + 2 * self.n)
             
             if random.uniform(0, 1) < summa and not bucket.data.is_empty():
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
                 
@@ -2008,8 +2167,7 @@ class GRAPH(object):
             summa += ((bucket.nid + 1) * len(bucket)) / (self.m + 2 * self.n)
             
             if throw < summa:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
                 
@@ -2097,8 +2255,7 @@ class GRAPH(object):
             summa += ((bucket.nid + 1) * len(bucket)) / (self.m + 2 * self.n)
             
             if random.uniform(0, 1) < summa and not bucket.data.is_empty():
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
                 
@@ -2188,8 +2345,7 @@ class GRAPH(object):
             summa += ((bucket.nid + 1) * len(bucket)) / (self.m + 2 * self.n)
             
             if throw < summa:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
                 
@@ -2366,7 +2522,7 @@ class GRAPH(object):
         """
         choosed = None
         summa = 0
-        verts = list(self.vertices.elements.keys())
+        verts = [node.nid for node in self.vertices]
         random.shuffle(verts)
         
         for index in verts:
@@ -2404,7 +2560,7 @@ class GRAPH(object):
         """
         choosed = None
         summa = 0
-        verts = list(self.vertices.elements.keys())
+        verts = [node.nid for node in self.vertices]
         random.shuffle(verts)
         throw = random.uniform(0, 1)
         
@@ -2443,7 +2599,7 @@ class GRAPH(object):
         """
         choosed = None
         summa = 0
-        verts = list(self.vertices.elements.keys())
+        verts = [node.nid for node in self.vertices]
         random.shuffle(verts)
         
         for index in verts:
@@ -2481,7 +2637,7 @@ class GRAPH(object):
         """
         choosed = None
         summa = 0
-        verts = list(self.vertices.elements.keys())
+        verts = [node.nid for node in self.vertices]
         random.shuffle(verts)
         throw = random.uniform(0, 1)
         
@@ -2561,8 +2717,7 @@ class GRAPH(object):
             p = ( 1.0 / (bucket.nid + 1) ) ** exp
             
             if not bucket.data.is_empty() and random.uniform(0, 1) < p:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.tail
                 
@@ -2634,8 +2789,7 @@ class GRAPH(object):
             p = 1.0 / (bucket.nid + 1)
             
             if not bucket.data.is_empty() and random.uniform(0, 1) < p:
-                candidates = list(bucket.data.elements.keys())
-                choosed = bucket.data.elements[random.choice(candidates)]
+                choosed = bucket.data.choice()
             else:
                 bucket = bucket.head
                 
@@ -2727,7 +2881,7 @@ class GRAPH(object):
             GRAPH.
         """
         choosed = None
-        indexes = list(self.vertices.elements.keys())
+        indexes = [node.nid for node in self.vertices]
         random.shuffle(indexes)
         
         while choosed is None:
@@ -2760,7 +2914,7 @@ class GRAPH(object):
             GRAPH.
         """
         choosed = None
-        indexes = list(self.vertices.elements.keys())
+        indexes = [node.nid for node in self.vertices]
         random.shuffle(indexes)
         
         while choosed is None:
@@ -2774,6 +2928,69 @@ class GRAPH(object):
                     
         return choosed
     
+    def release(self):
+        """Stop recording the changes made to the GRAPH.
+        
+        All the snapshots taken so far are forgotten and can no longer
+        be restored.
+        
+        Complexity: O(1)
+        """
+        self.journal = None
+        
+        if self.degrees is not None:
+            self.degrees.journal = None
+    
+    def restore(self, snapshot):
+        """Restore the GRAPH to the state it had when the given
+        snapshot was taken.
+        
+        The changes recorded in the journal after the snapshot are
+        undone in reverse order, so the vertices, the adjacency lists,
+        the DEGREE buckets and the colors are left exactly as they 
+        were, including the order of every list. The snapshot remains
+        valid and can be restored again after further changes.
+        
+        Args:
+          snapshot (tuple): a value returned by 'snapshot'.
+          
+        Complexity: O(c), where c is the number of changes made to the
+          GRAPH since the snapshot was taken.
+        """
+        mark, m, n, degrees, max_degree, min_degree = snapshot
+        
+        self.journal.rollback(mark)
+        
+        self.m = m
+        self.n = n
+        self.degrees = degrees
+        
+        if degrees is not None:
+            degrees.journal = self.journal
+            degrees.max_degree = max_degree
+            degrees.min_degree = min_degree
+            
+            # The rollback does not update the sampler
+            degrees.sampler = None
+    
+    def set_color(self, vertex, color):
+        """Assign a color to a vertex of the GRAPH.
+        
+        Coloring algorithms should use this method instead of setting
+        the 'color' attribute directly, so that the change can be
+        undone when a snapshot is restored.
+        
+        Args:
+          vertex (Node): the vertex to color.
+          color (int): the color to assign.
+          
+        Complexity: O(1)
+        """
+        if self.journal is None:
+            vertex.color = color
+        else:
+            self.journal.assign(vertex, "color", color)
+    
     def set_seed(self, seed):
         """Set the value of the seed for the pseudo-random number 
         generator.
@@ -2785,6 +3002,113 @@ class GRAPH(object):
         """
         random.seed(seed)
     
+    def smallest_last(self):
+        """Compute the smallest-last order of the vertices of the GRAPH.
+        
+        The smallest-last order (Matula & Beck, 1983) is the reverse of
+        the order in which the vertices are removed when a vertex of 
+        minimum degree is removed at every step. The highest degree 
+        that a vertex has when it is removed is the degeneracy of the 
+        GRAPH: every vertex has at most that many neighbors before it 
+        in the order, so coloring the vertices greedily in this order 
+        uses at most degeneracy + 1 colors, and the chromatic number of
+        the GRAPH is at most degeneracy + 1.
+        
+        The vertices are kept in buckets indexed by degree, as in the
+        'slots' of the DEGREE, but the GRAPH is not modified: instead
+        of moving a vertex when its degree decreases, it is pushed 
+        again into its new bucket, and the outdated entries are skipped
+        when they are found. Since removing a vertex lowers the minimum
+        degree by at most one, the search for the next non-empty bucket
+        starts one bucket below the last one. Ties are broken by the 
+        order of the vertices inside the GRAPH.
+        
+        Complexity: O(|V| + |E|)
+        
+        Returns:
+          tuple: the list of vertices in smallest-last order, and the
+            degeneracy of the GRAPH.
+        """
+        vertices = [vertex for vertex in self.vertices]
+        index = {vertex.nid: p for p, vertex in enumerate(vertices)}
+        neighbors = [[index[neighbor.nid] for neighbor in vertex.data
+                      if neighbor.nid in index] for vertex in vertices]
+        degree = [len(adjacency) for adjacency in neighbors]
+        slots = [list() for _ in range(max(degree, default=0) + 1)]
+        
+        # Every bucket is a stack, so pushing the vertices in reverse
+        # order removes the first vertices of the GRAPH first.
+        for p in range(len(vertices) - 1, -1, -1):
+            slots[degree[p]].append(p)
+            
+        removed = [False] * len(vertices)
+        order = list()
+        current = 0
+        degeneracy = 0
+        
+        while len(order) < len(vertices):
+            current = max(current - 1, 0)
+            
+            while True:
+                while not slots[current]:
+                    current += 1
+                    
+                p = slots[current].pop()
+                
+                if not removed[p] and degree[p] == current:
+                    break
+                    
+            if current > degeneracy:
+                degeneracy = current
+                
+            removed[p] = True
+            order.append(vertices[p])
+            
+            for q in neighbors[p]:
+                if not removed[q]:
+                    degree[q] -= 1
+                    slots[degree[q]].append(q)
+                    
+        order.reverse()
+        
+        return order, degeneracy
+        
+    def snapshot(self):
+        """Take a snapshot of the current state of the GRAPH.
+        
+        Deep copies are expensive, since every vertex and edge must be
+        created again. Instead, a GRAPH can take a snapshot, be 
+        modified destructively by an algorithm (for example, B or D),
+        and then be restored to the snapshot in time proportional to
+        the number of changes that were made.
+        
+        While a snapshot is active, every change made to the lists of
+        the GRAPH, its DEGREE, or the subgraphs induced from it is
+        recorded in the GRAPH's journal. Colors are only recorded when
+        they are assigned through 'set_color'. The 'flag' attribute of
+        the vertices is not recorded, since it is only meaningful
+        during a search.
+        
+        Snapshots can be nested: restoring a snapshot undoes only the
+        changes made after it was taken. Call 'release' to stop
+        recording changes.
+        
+        Complexity: O(1)
+        
+        Returns:
+          tuple: an opaque value that can be given to 'restore'.
+        """
+        if self.journal is None:
+            self.journal = Journal()
+            
+        if self.degrees is not None:
+            self.degrees.journal = self.journal
+            
+            return (len(self.journal.entries), self.m, self.n, self.degrees,
+                    self.degrees.max_degree, self.degrees.min_degree)
+        
+        return (len(self.journal.entries), self.m, self.n, None, 0, SENTINEL)
+    
     def subgraph(self, vertex):
         """Creates an induced subgraph from the neighborhood of the
         given vertex.
@@ -2815,9 +3139,13 @@ class GRAPH(object):
         """
         subgraph = GRAPH()
         
+        # The subgraph shares the vertices of the GRAPH, so its changes
+        # must be recorded in the same journal.
+        subgraph.journal = self.journal
+        
         # Adds the neighborhood to the subgraph
-        for neighbor in vertex.data:
-            subgraph.vertices.append(self.vertices.remove(neighbor.nid))
+        for nid in vertex.data.nids():
+            subgraph.vertices.append(self._remove(self.vertices, nid))
             self.m -= 1
             subgraph.m += 1
             
@@ -2826,19 +3154,19 @@ class GRAPH(object):
             bucket = len(sub_vertex)
         
             # Check all the neighbors imported from original graph
-            for neighbor in sub_vertex.data:
+            for nid in sub_vertex.data.nids():
             
                 # Delete edges not included on the subgraph
-                if neighbor.nid not in subgraph.vertices:
-                    self.degrees.decrease(self.vertices[neighbor.nid])
+                if nid not in subgraph.vertices:
+                    self.degrees.decrease(self.vertices[nid])
                     self.n -= 1
                     
                     # Updates the adjacency list of the graph
-                    self.vertices[neighbor.nid].data.remove(sub_vertex.nid)
-                    subgraph.vertices[sub_vertex.nid].data.remove(
-                      neighbor.nid)
+                    self._remove(self.vertices[nid].data, sub_vertex.nid)
+                    self._remove(
+                      subgraph.vertices[sub_vertex.nid].data, nid)
                 else:
-                    if sub_vertex.nid < neighbor.nid:
+                    if sub_vertex.nid < nid:
                         self.n -= 1
                     
             # Updates the number of edges in the subgraph
@@ -2846,35 +3174,7 @@ class GRAPH(object):
                     
             # Finally, we delete the vertices from the original
             # graph's DEGREE
-            self.degrees.buckets[bucket].data.remove(sub_vertex.nid)
-            
-            # Also, check if the max degree bucket has become empty
-            if (bucket == self.degrees.max_degree 
-                  and self.degrees.buckets[bucket].data.is_empty()):
-                current_degree = self.degrees.buckets.first
-                
-                while (current_degree is not None 
-                      and current_degree.data.is_empty()):
-                    current_degree = current_degree.tail
-                    
-                if current_degree is not None:
-                    self.degrees.max_degree = current_degree.nid
-                else:
-                    self.degrees.max_degree = 0
-                    
-            # Or if the min degree bucket has become empty
-            if(bucket == self.degrees.min_degree
-                  and self.degrees.buckets[bucket].data.is_empty()):
-                current_degree = self.degrees.buckets.last
-                
-                while (current_degree is not None
-                      and current_degree.data.is_empty()):
-                    current_degree = current_degree.head
-                    
-                if current_degree is not None:
-                    self.degrees.min_degree = current_degree.nid
-                else:
-                    self.degrees.min_degree = SENTINEL
+            self.degrees.remove(sub_vertex, bucket)
         
         # Since every edge is counted twice (once for each adjacent
         # vertex), the number of edges needs to be halved.
@@ -2898,23 +3198,47 @@ class DEGREE(object):
     tell when it gets empty. Each vertex in GRAPH will point to its 
     place in the appropriate bucket in DEGREE.
     
+    The buckets are also kept in an array indexed by degree, so any
+    bucket can be reached in O(1) time, and the max degree and the min
+    degree are updated with every change instead of being looked for.
+    
     Attributes:
       buckets (DoublyLinkedList): the linked list that contains the
         degrees occurring in the GRAPH.
+      journal (Journal): the journal of the GRAPH that owns the DEGREE,
+        used to record changes while a snapshot is active. None if no
+        snapshot is active.
+      keys (list): the degrees of the buckets, in increasing order, 
+        used to find the place of a new bucket by binary search. It may
+        also hold the degrees of buckets discarded when a snapshot was
+        restored, which are removed as they are found.
       max_degree (int): the value for the maximum degree currently 
         occurring in the graph.
       min_degree (int): the value for the minimum degree currently
         occurring in the graph.
+      sampler (Sampler): the sampler used to choose random vertices
+        from the buckets, which is kept updated with every change of
+        bucket. None if no sampler has been created.
+      slots (list): the buckets indexed by degree, None for the 
+        degrees that have no bucket.
     """
     
-    def __init__(self):
+    def __init__(self, journal=None):
         """Creates a new DEGREE data structure.
         
+        Args:
+          journal (Journal): the journal in which the changes to the
+            DEGREE will be recorded. Defaults to None.
+        
         Complexity: O(1)
         """
         self.buckets = DoublyLinkedList()
+        self.journal = journal
+        self.keys = list()
         self.max_degree = 0
         self.min_degree = SENTINEL
+        self.sampler = None
+        self.slots = list()
         
     def __getitem__(self, deg):
         """Recovers the first vertex with the degree given.
@@ -2961,136 +3285,2211 @@ class DEGREE(object):
             
         return "\n".join(bucks)
     
-    def add(self, vertex):
-        """Add a vertex to the right bucket in the data structure.
+    def _bucket(self, deg):
+        """Get the bucket of the given degree, creating it if needed.
         
-        If the bucket already exists, the vertex is just added at
-        the end of the bucket, which takes O(1) time. If the bucket 
-        does not exists, a new bucket is created and the vertex is
-        added to it, which takes O(|V|) time (since all the buckets 
-        need to be checked, and in the worst case there can be |V| 
-        buckets if every vertex has a different degree). The pointer
-        to the max bucket is also updated if needed, which takes O(1).
-        Therefore, the overall complexity of the method is O(|V|).
+        The new bucket is linked in its right place in the list of 
+        buckets. Since the buckets are also kept in the 'slots' array,
+        the neighbors of the new bucket are found in O(1) time when the
+        bucket of degree deg + 1 or deg - 1 exists, which is always the
+        case when a vertex is moved from one bucket to the next one.
+        Otherwise, the next higher bucket is found by a binary search
+        over the 'keys' array.
         
         Args:
-          vertex (Node): the node to be placed in the right bucket.
-        
-        Complexity: O(|V|)
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1) amortized, O(log d) in the worst case, where d
+          is the number of buckets.
         
         Returns:
-          boolean: True if and only if the node given is placed in
-            its right bucket. False otherwise.
+          Node: the bucket of the given degree.
         """
-        deg = len(vertex)
-        
-        # Checks if the length is not the sentinel value
-        if deg == SENTINEL:
-            return False
+        slots = self.slots
         
-        # If a bucket of the given size exists, only add the node to it
-        if deg in self.buckets:
-            # Create the copy of the vertex
-            copy_vertex = Node(vertex.nid)
+        if deg >= len(slots):
+            slots.extend([None] * (deg + 1 - len(slots)))
             
-            # Links the node in the GRAPH to its copy on DEGREE
-            vertex.bucket = copy_vertex
-            copy_vertex.data = vertex
+        if slots[deg] is not None:
+            return slots[deg]
             
-            # Appends the copy vertex to the bucket
-            self.buckets[deg].data.append(copy_vertex)
+        # Keeps the degree in the sorted keys, unless a discarded
+        # bucket left it there
+        keys = self.keys
+        position = bisect.bisect_left(keys, deg)
+        
+        if position == len(keys) or keys[position] != deg:
+            keys.insert(position, deg)
             
-            return True
-        # If the bucket of given size does not exists, is created
+        # Looks for the buckets that will be around the new bucket
+        if deg + 1 < len(slots) and slots[deg + 1] is not None:
+            higher = slots[deg + 1]
+            lower = higher.tail
+        elif deg > 0 and slots[deg - 1] is not None:
+            lower = slots[deg - 1]
+            higher = lower.head
         else:
-            # Create the new bucket
-            self.buckets.insert(deg)
-            self.buckets[deg].data = DoublyLinkedList()
+            higher = None
+            position += 1
             
-            # Create the copy of the vertex
-            copy_vertex = Node(vertex.nid)
+            while position < len(keys):
+                higher = slots[keys[position]]
+                
+                if higher is not None:
+                    break
+                    
+                # The bucket was discarded by a restore
+                del keys[position]
+                    
+            lower = self.buckets.first if higher is None else higher.tail
             
-            # Links the node in the GRAPH to its copy on DEGREE
-            vertex.bucket = copy_vertex
-            copy_vertex.data = vertex
+        # Creates the new bucket and links it in place
+        new_node = Node(deg)
+        new_node.data = DoublyLinkedList()
+        new_node.head = higher
+        new_node.tail = lower
+        
+        if higher is None:
+            self.buckets.first = new_node
+        else:
+            higher.tail = new_node
             
-            # Appends the copy vertex to the bucket
-            self.buckets[deg].data.append(copy_vertex)
+        if lower is None:
+            self.buckets.last = new_node
+        else:
+            lower.head = new_node
             
-            # Also checks if new bucket is bigger than max degree...
-            if deg > self.max_degree:
-                self.max_degree = deg
-                
-            # ...or smaller than min degree
-            if deg < self.min_degree:
-                self.min_degree = deg
-                
-            return True
+        self.buckets.elements[deg] = new_node
+        
+        # The new bucket must disappear if a snapshot is restored
+        if self.journal is None:
+            slots[deg] = new_node
+        else:
+            self.journal.inserted(self.buckets, new_node)
+            self.journal.store(slots, deg, new_node)
             
-    def decrease(self, vertex):
-        """Decrease in 1 the degree of a vertex.
+        return new_node
         
-        This method is called whenever an edge is deleted from a
-        GRAPH. The adjacency list of the given vertex is NOT modified
-        in order to maintain the linear complexity of the method. This
-        method only moves the vertex from its current bucket to the
-        bucket inmediately after the current bucket (if said bucket
-        does not exists, it is created in place). Since the operation
-        only involves removing the vertex from one bucket to another,
-        it takes O(1) time to complete.
+    def _move(self, vertex, deg, new_deg):
+        """Move a vertex from its current bucket to another one.
         
         Args:
-          vertex (Node): the node whose degree will be decreased by 1.
+          vertex (Node): the node to be moved.
+          deg (int): the degree of the current bucket of the vertex.
+          new_deg (int): the degree of the new bucket of the vertex.
           
         Complexity: O(1)
         """
-        deg = len(vertex)
-
-        copy_vertex = self.buckets[deg].data.remove(vertex.bucket.nid)
+        journal = self.journal
         
-        # Checks if the bucket len - 1 exists
-        if (deg - 1) in self.buckets:
-            # Adds the vertex to its new bucket
-            self.buckets[deg - 1].data.append(copy_vertex)
-        # If the bucket does not exists, it must be created
-        else:
-            # Creates the new bucket
-            new_node = Node(deg - 1)
-            
-            # Inserts the bucket in place
-            new_node.tail = self.buckets[deg].tail
-            new_node.head = self.buckets[deg]
-            
-            # Checks if the new bucket is not the last
-            if self.buckets[deg].tail is not None:
-                self.buckets[deg].tail.head = new_node
+        if self.sampler is not None:
+            if new_deg < self.sampler.size:
+                self.sampler.move(vertex, deg, new_deg)
             else:
-                self.buckets.last = new_node
+                self.sampler = None
                 
-            self.buckets[deg].tail = new_node
+        if journal is None:
+            copy_vertex = self.slots[deg].data.remove(vertex.bucket.nid)
+        else:
+            copy_vertex = journal.remove(
+              self.slots[deg].data, vertex.bucket.nid)
             
-            # Adds the new bucket to the dictionary of buckets
-            self.buckets.elements[deg - 1] = new_node
+        bucket = self._bucket(new_deg)
+        
+        if journal is None:
+            bucket.data.append(copy_vertex)
+        else:
+            journal.append(bucket.data, copy_vertex)
             
-            # Creates the new bucket's list
-            new_node.data = DoublyLinkedList()
+    def _next_max(self, deg):
+        """Look for the highest non-empty bucket below a degree.
+        
+        Args:
+          deg (int): the degree where the search starts (excluded).
+          
+        Complexity: O(deg)
+        
+        Returns:
+          int: the degree of the bucket found, or 0 (zero) if every
+            bucket is empty.
+        """
+        for current in range(deg - 1, -1, -1):
+            bucket = self.slots[current]
             
-            # Adds the vertex to its new bucket
-            new_node.data.append(copy_vertex)
+            if bucket is not None and bucket.data.first is not None:
+                return current
+                
+        return 0
+        
+    def _next_min(self, deg):
+        """Look for the lowest non-empty bucket above a degree.
+        
+        Args:
+          deg (int): the degree where the search starts (excluded).
+          
+        Complexity: O(max degree - deg)
+        
+        Returns:
+          int: the degree of the bucket found, or SENTINEL if every
+            bucket is empty.
+        """
+        for current in range(deg + 1, len(self.slots)):
+            bucket = self.slots[current]
             
-# ------------------------------------------------------------------- #
-#                            Utily methods                            #
-# ------------------------------------------------------------------- #
-
-def from_dimacs(filename):
-    """Load a graph stored in the DIMACS format.
-    
-    In the DIMACS format, every line of the input begins with a letter
-    that defines the content of that line. The legal lines are:
+            if bucket is not None and bucket.data.first is not None:
+                return current
+                
+        return SENTINEL
     
-      * c : Comment. The rest of the line should be ignored.
-      * p : Problem. Must be of form 'p edges m n' where m is the
-            number of nodes (to be numbered 1...m) and n is the
+    def add(self, vertex):
+        """Add a vertex to the right bucket in the data structure.
+        
+        The vertex is added at the end of its bucket, which is created
+        if it does not exist. The max degree and the min degree are
+        also updated if needed.
+        
+        Args:
+          vertex (Node): the node to be placed in the right bucket.
+        
+        Complexity: O(1) amortized.
+        
+        Returns:
+          boolean: True if and only if the node given is placed in
+            its right bucket. False otherwise.
+        """
+        deg = len(vertex)
+        
+        # Checks if the length is not the sentinel value
+        if deg == SENTINEL:
+            return False
+            
+        # The sampler may not have room for the new vertex
+        self.sampler = None
+        
+        bucket = self._bucket(deg)
+        
+        # Create the copy of the vertex
+        copy_vertex = Node(vertex.nid)
+        
+        # Links the node in the GRAPH to its copy on DEGREE
+        if self.journal is None:
+            vertex.bucket = copy_vertex
+        else:
+            self.journal.assign(vertex, "bucket", copy_vertex)
+            
+        copy_vertex.data = vertex
+        
+        # Appends the copy vertex to the bucket
+        bucket.data.append(copy_vertex)
+        
+        # Also checks if the vertex is bigger than max degree...
+        if deg > self.max_degree:
+            self.max_degree = deg
+            
+        # ...or smaller than min degree
+        if deg < self.min_degree:
+            self.min_degree = deg
+            
+        return True
+            
+    def decrease(self, vertex):
+        """Decrease in 1 the degree of a vertex.
+        
+        This method is called whenever an edge is deleted from a
+        GRAPH. The adjacency list of the given vertex is NOT modified
+        in order to maintain the linear complexity of the method. This
+        method only moves the vertex from its current bucket to the
+        bucket inmediately after the current bucket (if said bucket
+        does not exists, it is created in place). Since the operation
+        only involves removing the vertex from one bucket to another,
+        it takes O(1) time to complete.
+        
+        The vertex ends in the bucket of degree deg - 1, so the max
+        degree and the min degree are updated in O(1) time as well.
+        
+        Args:
+          vertex (Node): the node whose degree will be decreased by 1.
+          
+        Complexity: O(1)
+        """
+        deg = len(vertex)
+        
+        self._move(vertex, deg, deg - 1)
+        
+        if deg == self.max_degree and self.slots[deg].data.first is None:
+            self.max_degree = deg - 1
+            
+        if deg - 1 < self.min_degree:
+            self.min_degree = deg - 1
+            
+    def extend(self, vertices):
+        """Add several vertices to their buckets at once.
+        
+        When the DEGREE is empty, the vertices are placed with a 
+        counting sort: their degrees are computed in a single pass, 
+        each vertex is appended to the bucket of its degree, and then
+        the buckets are linked in decreasing order by walking the 
+        'slots' array once. The DEGREE is the same one that adding the
+        vertices one by one would build, including the order of the 
+        vertices inside every bucket. Otherwise, the vertices are just
+        added one by one.
+        
+        While a snapshot is active, only the links from the vertices to
+        their copies are recorded, since the buckets of an empty DEGREE
+        did not exist when the snapshot was taken.
+        
+        Args:
+          vertices (iterable): the nodes to be placed in their buckets.
+          
+        Complexity: O(|V| + max degree)
+        """
+        if not self.buckets.is_empty():
+            for vertex in vertices:
+                self.add(vertex)
+                
+            return
+            
+        journal = self.journal
+        groups = dict()
+        
+        # Creates the copies of the vertices and counts them by degree,
+        # keeping their order
+        for vertex in vertices:
+            deg = len(vertex)
+            
+            if deg == SENTINEL:
+                continue
+                
+            copy_vertex = Node(vertex.nid)
+            copy_vertex.data = vertex
+            
+            if journal is None:
+                vertex.bucket = copy_vertex
+            else:
+                journal.assign(vertex, "bucket", copy_vertex)
+                
+            group = groups.get(deg)
+            
+            if group is None:
+                groups[deg] = [copy_vertex]
+            else:
+                group.append(copy_vertex)
+                
+        if not groups:
+            return
+            
+        # Creates the buckets and links them from the highest degree
+        max_degree = max(groups)
+        slots = [None] * (max_degree + 1)
+        keys = list()
+        buckets = self.buckets
+        previous = None
+        
+        for deg in range(max_degree, -1, -1):
+            if deg not in groups:
+                continue
+                
+            bucket = Node(deg)
+            bucket.data = DoublyLinkedList()
+            bucket.data.extend(groups[deg])
+            bucket.head = previous
+            
+            if previous is None:
+                buckets.first = bucket
+            else:
+                previous.tail = bucket
+                
+            buckets.elements[deg] = bucket
+            slots[deg] = bucket
+            keys.append(deg)
+            previous = bucket
+            
+        buckets.last = previous
+        keys.reverse()
+        
+        self.keys = keys
+        self.max_degree = max_degree
+        self.min_degree = previous.nid
+        self.sampler = None
+        self.slots = slots
+        
+    def increase(self, vertex):
+        """Increase in 1 the degree of a vertex.
+        
+        This method must be called whenever an edge is added to a 
+        GRAPH whose DEGREE has been built, before the edge is actually
+        added. As in 'decrease', the vertex is only moved from its 
+        current bucket to the bucket inmediately before the current 
+        bucket (which is created in place if it does not exist).
+        
+        Args:
+          vertex (Node): the node whose degree will be increased by 1.
+          
+        Complexity: O(1) amortized.
+        """
+        deg = len(vertex)
+        
+        self._move(vertex, deg, deg + 1)
+        
+        if deg + 1 > self.max_degree:
+            self.max_degree = deg + 1
+            
+        if deg == self.min_degree and self.slots[deg].data.first is None:
+            self.min_degree = deg + 1
+            
+    def remove(self, vertex, deg=None):
+        """Remove a vertex from its bucket.
+        
+        The bucket itself is kept, even if it becomes empty. If the
+        bucket was the max degree (or min degree) bucket and becomes
+        empty, the next non-empty bucket is looked up. Since the max
+        degree never grows while vertices are being removed, the 
+        buckets are scanned only once in a sequence of removals.
+        
+        Args:
+          vertex (Node): the node to be removed from the DEGREE.
+          deg (int): the degree of the bucket that holds the vertex.
+            Defaults to the current degree of the vertex.
+            
+        Complexity: O(1) amortized.
+        """
+        if deg is None:
+            deg = len(vertex)
+            
+        if self.sampler is not None:
+            self.sampler.remove(vertex, deg)
+            
+        bucket = self.slots[deg]
+            
+        if self.journal is None:
+            bucket.data.remove(vertex.nid)
+        else:
+            self.journal.remove(bucket.data, vertex.nid)
+            
+        if bucket.data.first is None:
+            if deg == self.max_degree:
+                self.max_degree = self._next_max(deg)
+                
+            if deg == self.min_degree:
+                self.min_degree = self._next_min(deg)
+
+
+class Journal(object):
+    """Implements an undo journal for GRAPHS.
+    
+    The journal records every change made to the doubly linked lists
+    of a GRAPH (and of its DEGREE), as well as the changes made to some
+    attributes of its Nodes, so that they can be undone later in 
+    reverse order. This allows to 'restore' a GRAPH that has been
+    destroyed by an algorithm without having to make a deep copy of it
+    beforehand.
+    
+    Removed nodes keep the references to the nodes that were before
+    and after them on the list. Since the changes are undone in the
+    reverse order in which they were made, those two nodes are 
+    guaranteed to be adjacent again when the removal is undone, so the
+    node can be linked back in O(1) time and in its original place.
+    The order of the 'elements' dictionary of a list is not preserved,
+    so code that needs the order of a list must follow its links.
+    
+    Attributes:
+      entries (list): the changes recorded so far, oldest first.
+      ASSIGN (int): the tag for changes to a Node attribute.
+      INSERT (int): the tag for nodes added to a list.
+      REMOVE (int): the tag for nodes removed from a list.
+      STORE (int): the tag for changes to an item of a Python list.
+    """
+    ASSIGN = 0
+    INSERT = 1
+    REMOVE = 2
+    STORE = 3
+    
+    def __init__(self):
+        """Create a new, empty journal.
+        
+        Complexity: O(1)
+        """
+        self.entries = list()
+        
+    def __len__(self):
+        """Get the number of changes recorded in the journal.
+        
+        Complexity: O(1)
+        
+        Returns:
+          int: the number of entries in the journal.
+        """
+        return len(self.entries)
+        
+    def append(self, linked_list, node):
+        """Append a node to a list, recording the change.
+        
+        Args:
+          linked_list (DoublyLinkedList): the list to modify.
+          node (Node): the node to append.
+          
+        Complexity: O(1)
+        
+        Returns:
+          boolean: True if and only if the node was appended.
+        """
+        if linked_list.append(node):
+            self.entries.append((Journal.INSERT, linked_list, node))
+            
+            return True
+            
+        return False
+        
+    def assign(self, node, attribute, value):
+        """Change an attribute of a Node, recording its previous value.
+        
+        Args:
+          node (Node): the node to modify.
+          attribute (string): the name of the attribute.
+          value (object): the new value of the attribute.
+          
+        Complexity: O(1)
+        """
+        self.entries.append(
+          (Journal.ASSIGN, node, attribute, getattr(node, attribute)))
+        setattr(node, attribute, value)
+        
+    def inserted(self, linked_list, node):
+        """Record that a node has been inserted into a list.
+        
+        This method is used when the node was linked manually (for
+        example, when DEGREE creates a new bucket in place).
+        
+        Args:
+          linked_list (DoublyLinkedList): the list that was modified.
+          node (Node): the node that was inserted.
+          
+        Complexity: O(1)
+        """
+        self.entries.append((Journal.INSERT, linked_list, node))
+        
+    def remove(self, linked_list, nid):
+        """Remove a node from a list, recording its position.
+        
+        Args:
+          linked_list (DoublyLinkedList): the list to modify.
+          nid (int): the Node ID of the node to remove.
+          
+        Complexity: O(1)
+        
+        Returns:
+          Node: the removed node, or None if it was not in the list.
+        """
+        node = linked_list.elements.get(nid)
+        
+        if node is None:
+            return None
+            
+        head = node.head
+        tail = node.tail
+        
+        linked_list.remove(nid)
+        self.entries.append((Journal.REMOVE, linked_list, node, head, tail))
+        
+        return node
+        
+    def store(self, sequence, index, value):
+        """Change an item of a Python list, recording its previous 
+        value.
+        
+        Args:
+          sequence (list): the list to modify.
+          index (int): the index of the item.
+          value (object): the new value of the item.
+          
+        Complexity: O(1)
+        """
+        self.entries.append((Journal.STORE, sequence, index, sequence[index]))
+        sequence[index] = value
+        
+    def rollback(self, mark=0):
+        """Undo the changes recorded after the given mark.
+        
+        Args:
+          mark (int): the number of entries that will remain in the
+            journal. Defaults to 0 (zero), which undoes every change.
+            
+        Complexity: O(c), where c is the number of changes undone.
+        """
+        entries = self.entries
+        
+        while len(entries) > mark:
+            entry = entries.pop()
+            
+            if entry[0] == Journal.REMOVE:
+                linked_list, node, head, tail = entry[1:]
+                
+                node.head = head
+                node.tail = tail
+                
+                if head is None:
+                    linked_list.first = node
+                else:
+                    head.tail = node
+                    
+                if tail is None:
+                    linked_list.last = node
+                else:
+                    tail.head = node
+                    
+                linked_list.elements[node.nid] = node
+            elif entry[0] == Journal.INSERT:
+                entry[1].remove(entry[2].nid)
+            elif entry[0] == Journal.STORE:
+                entry[1][entry[2]] = entry[3]
+            else:
+                setattr(entry[1], entry[2], entry[3])
+
+
+class FenwickTree(object):
+    """Implements a Fenwick tree (also known as binary indexed tree).
+    
+    A Fenwick tree keeps a weight for each of the positions 0, 1, ...,
+    size - 1, in such a way that both changing a weight and looking for
+    the position where the sum of the weights reaches a given value
+    take O(log size) time.
+    
+    Attributes:
+      size (int): the number of positions in the tree.
+      total (float): the sum of all the weights in the tree.
+      tree (list): the partial sums of the weights. The weight of the
+        position p is included in the index p + 1 of the list.
+    """
+    
+    def __init__(self, size):
+        """Create a new Fenwick tree with all its weights set to 0.
+        
+        Args:
+          size (int): the number of positions in the tree.
+          
+        Complexity: O(size)
+        """
+        self.size = size
+        self.total = 0
+        self.tree = [0] * (size + 1)
+        
+    def add(self, position, delta):
+        """Add the given value to the weight of a position.
+        
+        Args:
+          position (int): the position to modify.
+          delta (float): the value to add to the weight.
+          
+        Complexity: O(log size)
+        """
+        self.total += delta
+        index = position + 1
+        
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & (-index)
+            
+    def find(self, value):
+        """Get the first position where the sum of the weights becomes
+        bigger than the given value.
+        
+        Args:
+          value (float): a value between 0 and the total weight.
+            
+        Complexity: O(log size)
+        
+        Returns:
+          int: the smallest position p such that the sum of the 
+            weights of the positions 0, 1, ..., p is bigger than
+            value, or 'size' if there is no such position.
+        """
+        index = 0
+        step = 1
+        
+        while step * 2 <= self.size:
+            step *= 2
+            
+        while step > 0:
+            if (index + step <= self.size 
+                  and self.tree[index + step] <= value):
+                index += step
+                value -= self.tree[index]
+                
+            step //= 2
+            
+        return index
+
+
+class Sampler(object):
+    """Implements a fast sampler for the random vertex proposals.
+    
+    Most proposals choose a vertex by walking the buckets of a DEGREE
+    and 'throwing a dice' on every bucket, which takes O(|buckets|)
+    time. A Sampler keeps the weight of every bucket in a FenwickTree
+    and the vertices of every bucket in a list. DEGREE updates it every
+    time a vertex changes its bucket, so a vertex can be choosed in 
+    O(log |V|) time with the same distribution as the proposal.
+    
+    Two families of proposals are supported:
+    
+      * The proposals that throw a single dice and accumulate the 
+        probabilities of the buckets (Proposals 7, 8, 11, 12, 15, 16,
+        19 and 20), and the vertex-oriented Proposals 26 and 28. The 
+        probability of a bucket is its weight (its degree, or its 
+        degree plus 1, times its size) over the total weight, raised to
+        the exponent of the proposal. With an exponent of 1 the 
+        probabilities add up to 1, so a single random integer is 
+        enough to choose a bucket; with any other exponent, the dice
+        is taken modulo the sum of the probabilities, since the 
+        proposal starts over from the first bucket when the dice is 
+        not reached.
+        
+      * The proposals that visit the buckets in a cycle, choosing a
+        non-empty bucket with probability p (Proposals 29 - 32). Since
+        the dices are independent, the bucket choosed is the one where
+        the sum of the 'hazards' -log(1 - p) of the buckets visited so
+        far reaches an exponential random value, which is taken modulo
+        the sum of all the hazards to account for the cycles.
+        
+    The remaining proposals are not supported, and still take 
+    O(|buckets|) or O(|V|) time per vertex:
+    
+      * Proposals 1 - 6, 9, 10, 13, 14, 17 and 18 throw a new dice on 
+        every bucket, and the probability of every bucket is divided 
+        by the number of edges of the GRAPH, so removing a single edge
+        changes the weight of every bucket in the tree.
+        
+      * Proposals 21 - 24 and 33 - 36 depend on the order of the 
+        vertices inside the GRAPH (and Proposals 21 - 24, on its 
+        maximum degree), and Proposals 25 and 27 on a shuffle of all 
+        the vertices, so their distributions are not a function of the
+        buckets.
+        
+    When the state of the GRAPH does not allow to reproduce the 
+    distribution of a proposal (for example, when the weights of the
+    buckets do not add up to the normalization used by the proposal),
+    'sample' returns None and the proposal itself must be used.
+    
+    Attributes:
+      DESCENDING (set): the proposals that visit the buckets from 
+        higher degree to smaller degree.
+      FIRST (set): the proposals that choose the first vertex of a
+        bucket instead of a random one.
+      HAZARD (set): the proposals that visit the buckets in a cycle.
+      PLUS_ONE (set): the proposals that weight the buckets with their
+        degree plus 1.
+      PROPOSALS (set): all the proposals supported.
+      WEIGHTED (set): the proposals that throw a single dice.
+      degrees (DEGREE): the DEGREE whose buckets are sampled.
+      exp (float): the exponent used by the proposal.
+      mass (int): the sum of the weights of the buckets before raising
+        them to the exponent. Only kept for the WEIGHTED proposals.
+      members (list): the vertices of every bucket, indexed by degree.
+      positions (dict): the index of every vertex in the list of its
+        bucket, indexed by Node ID.
+      proposal (int): the proposal reproduced by the Sampler.
+      size (int): the number of degrees that can be sampled.
+      tree (FenwickTree): the weights of the buckets.
+    """
+    DESCENDING = {11, 12, 19, 20, 29, 30}
+    FIRST = {7, 11, 15, 19, 29, 31}
+    HAZARD = {29, 30, 31, 32}
+    PLUS_ONE = {15, 16, 19, 20, 28}
+    WEIGHTED = {7, 8, 11, 12, 15, 16, 19, 20, 26, 28}
+    PROPOSALS = HAZARD | WEIGHTED
+    
+    def __init__(self, degrees, proposal, exp=1):
+        """Create a new Sampler for the buckets of a DEGREE.
+        
+        Args:
+          degrees (DEGREE): the DEGREE whose buckets will be sampled.
+          proposal (int): the proposal to reproduce.
+          exp (float): the exponent used by the proposal. Defaults to
+            1.
+          
+        Complexity: O(|V|)
+        """
+        self.degrees = degrees
+        self.exp = exp
+        self.mass = 0
+        self.positions = dict()
+        self.proposal = proposal
+        
+        if degrees.buckets.first is not None:
+            self.size = degrees.buckets.first.nid + 1
+        else:
+            self.size = 1
+            
+        self.members = [list() for _ in range(self.size)]
+        self.tree = FenwickTree(self.size)
+        
+        for bucket in degrees.buckets:
+            members = self.members[bucket.nid]
+            
+            for copy_vertex in bucket.data:
+                self.positions[copy_vertex.nid] = len(members)
+                members.append(copy_vertex.data)
+                
+            self.mass += self._factor(bucket.nid) * len(members)
+            self.tree.add(self._position(bucket.nid), 
+                          self._weight(bucket.nid, len(members)))
+            
+    def _hazard(self, deg):
+        """Get the hazard of a non-empty bucket.
+        
+        Zero-degree buckets are always choosed when reached, so their
+        hazard is infinite. They are kept out of the tree (with a 
+        hazard of 0) and 'sample' checks them apart.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1)
+        
+        Returns:
+          float: the hazard of the bucket.
+        """
+        if deg == 0:
+            return 0
+            
+        return -math.log1p(-(1.0 / (deg + 1)) ** self.exp)
+        
+    def _factor(self, deg):
+        """Get the weight that every vertex adds to its bucket before
+        raising it to the exponent.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1)
+        
+        Returns:
+          int: the degree (or the degree plus 1) of the bucket, or 0 if
+            the proposal does not throw a single dice.
+        """
+        if self.proposal not in Sampler.WEIGHTED:
+            return 0
+        elif self.proposal in Sampler.PLUS_ONE:
+            return deg + 1
+        else:
+            return deg
+            
+    def _pick(self, deg):
+        """Choose a vertex from the bucket of the given degree.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1)
+        
+        Returns:
+          Node: the vertex choosed, or None if the bucket is empty.
+        """
+        if not self.members[deg]:
+            return None
+        elif self.proposal in Sampler.FIRST:
+            return self.degrees.slots[deg].data.first.data
+        else:
+            return random.choice(self.members[deg])
+            
+    def _position(self, deg):
+        """Get the position of a bucket in the tree.
+        
+        The buckets are placed in the tree in the same order in which
+        the proposal visits them. Since the position of a bucket is its
+        degree or its reflection, the same method maps a position back
+        to its degree.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1)
+        
+        Returns:
+          int: the position of the bucket in the tree.
+        """
+        if self.proposal in Sampler.DESCENDING:
+            return self.size - 1 - deg
+            
+        return deg
+        
+    def _weight(self, deg, count):
+        """Get the weight of a bucket.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          count (int): the number of vertices in the bucket.
+          
+        Complexity: O(1)
+        
+        Returns:
+          float: the weight of the bucket.
+        """
+        if self.exp <= 0 or count == 0:
+            # Non-positive exponents are not sampled, see 'sample'
+            return 0
+        elif self.proposal in Sampler.HAZARD:
+            return self._hazard(deg)
+        elif self.exp == 1:
+            return self._factor(deg) * count
+        else:
+            return (self._factor(deg) * count) ** self.exp
+            
+    def add(self, vertex, deg):
+        """Add a vertex to the bucket of the given degree.
+        
+        Args:
+          vertex (Node): the vertex, as stored in the GRAPH.
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(log |V|)
+        """
+        count = len(self.members[deg])
+        
+        self.positions[vertex.nid] = count
+        self.members[deg].append(vertex)
+        self.mass += self._factor(deg)
+        
+        delta = self._weight(deg, count + 1) - self._weight(deg, count)
+        
+        if delta != 0:
+            self.tree.add(self._position(deg), delta)
+        
+    def move(self, vertex, old_deg, new_deg):
+        """Move a vertex from one bucket to another.
+        
+        Args:
+          vertex (Node): the vertex, as stored in the GRAPH.
+          old_deg (int): the degree of the current bucket of the 
+            vertex.
+          new_deg (int): the degree of the new bucket of the vertex.
+          
+        Complexity: O(log |V|)
+        """
+        self.remove(vertex, old_deg)
+        self.add(vertex, new_deg)
+        
+    def remove(self, vertex, deg):
+        """Remove a vertex from the bucket of the given degree.
+        
+        The last vertex of the bucket takes the place of the removed
+        vertex, so the removal takes constant time.
+        
+        Args:
+          vertex (Node): the vertex, as stored in the GRAPH.
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(log |V|)
+        """
+        members = self.members[deg]
+        count = len(members)
+        
+        index = self.positions.pop(vertex.nid)
+        last = members.pop()
+        
+        if last is not vertex:
+            members[index] = last
+            self.positions[last.nid] = index
+            
+        self.mass -= self._factor(deg)
+        
+        delta = self._weight(deg, count - 1) - self._weight(deg, count)
+        
+        if delta != 0:
+            self.tree.add(self._position(deg), delta)
+        
+    def sample(self, graph):
+        """Choose a vertex with the distribution of the proposal.
+        
+        Args:
+          graph (GRAPH): the GRAPH that owns the DEGREE.
+          
+        Complexity: O(log |V|)
+        
+        Returns:
+          Node: the vertex choosed, or None if the distribution of the
+            proposal can not be reproduced.
+        """
+        total = self.tree.total
+        
+        # A non-positive exponent makes every bucket be choosed when
+        # reached, which is better handled by the proposal itself
+        if self.exp <= 0:
+            return None
+            
+        if self.proposal in Sampler.WEIGHTED:
+            if self.proposal in Sampler.PLUS_ONE:
+                expected = graph.m + 2 * graph.n
+            else:
+                expected = 2 * graph.n
+                
+            if self.mass == 0 or self.mass != expected:
+                return None
+                
+            if self.exp == 1:
+                value = random.randrange(total)
+            else:
+                # The weights in the tree are not divided by 'expected'
+                value = random.uniform(0, 1) * expected ** self.exp
+                
+                if total <= 0:
+                    return None
+                elif value >= total:
+                    value = math.fmod(value, total)
+                    
+            position = self.tree.find(value)
+            
+            # Rounding errors may lead outside of the tree, or to a
+            # bucket the proposal never chooses
+            if position >= self.size:
+                return None
+                
+            deg = self._position(position)
+            
+            if self._factor(deg) == 0:
+                return None
+                
+            return self._pick(deg)
+            
+        ascending = self.proposal not in Sampler.DESCENDING
+        
+        if ascending and self.members[0]:
+            return self._pick(0)
+            
+        value = random.expovariate(1.0)
+        
+        if value >= total:
+            if self.members[0]:
+                return self._pick(0)
+            elif total <= 0:
+                return None
+                
+            value = math.fmod(value, total)
+            
+        position = self.tree.find(value)
+        
+        # Rounding errors may lead outside of the tree
+        if position >= self.size:
+            return None
+            
+        return self._pick(self._position(position))
+
+
+class CompactGraph(object):
+    """Implements a compact version of the GRAPH with fixed structure.
+
+    The GRAPH data structure keeps a Node for every vertex and two
+    Nodes for every edge, which is required by the destructive
+    algorithms described by Widgerson, but it is wasteful when the
+    graph only needs to be queried. CompactGraph stores the same graph
+    in the Compressed Sparse Row (CSR) format: the vertices are given
+    consecutive positions 0, 1, ..., m - 1, and the neighbors of the
+    vertex at position p are stored in the slice
+
+        neighbors[offsets[p]:offsets[p + 1]]
+
+    of a single flat array. All the arrays are built with the 'array'
+    module, so every vertex and every edge only takes a few bytes.
+
+    The vertices keep the order they had in the original GRAPH, and
+    every adjacency list keeps the order of the original adjacency
+    list, so converting a GRAPH to a CompactGraph and back again
+    produces the same GRAPH.
+
+    Attributes:
+      colors (array): the colors of the vertices, indexed by position.
+        Uncolored vertices have the SENTINEL value.
+      index (dict): the dictionary that maps every vertex ID to its
+        position inside the arrays.
+      m (int): the number of vertices inside the CompactGraph.
+      n (int): the number of edges inside the CompactGraph.
+      neighbors (array): the adjacency lists of all vertices, one after
+        the other, stored as vertex positions.
+      offsets (array): the position inside 'neighbors' where the
+        adjacency list of every vertex begins. It has m + 1 elements,
+        the last one being the length of 'neighbors'.
+      source (string): the binary file that 'neighbors', 'offsets' and
+        'vertices' are mapped from, or None if they are held in memory.
+      vertices (array): the vertex IDs, indexed by position.
+    """
+
+    def __init__(self, graph=None):
+        """Create a new CompactGraph.
+
+        If a GRAPH is given, its vertices, edges and colors are copied
+        into the new CompactGraph. Neighbors that are no longer inside
+        the GRAPH (for example, after calling 'delete_vertex') are
+        ignored.
+
+        Args:
+          graph (GRAPH): the GRAPH to copy. If not given, an empty
+            CompactGraph is created. Defaults to None.
+
+        Complexity: O(|V| + |E|)
+        """
+        self.colors = array('q')
+        self.index = dict()
+        self.m = 0
+        self.n = 0
+        self.neighbors = array('l')
+        self.offsets = array('l', [0])
+        self.source = None
+        self.vertices = array('q')
+
+        if graph is None:
+            return
+
+        # First pass: give every vertex its position
+        for vertex in graph.vertices:
+            self.index[vertex.nid] = self.m
+            self.vertices.append(vertex.nid)
+            self.colors.append(vertex.color)
+            self.m += 1
+
+        # Second pass: flatten the adjacency lists
+        for vertex in graph.vertices:
+            for neighbor in vertex.data:
+                position = self.index.get(neighbor.nid)
+
+                if position is not None:
+                    self.neighbors.append(position)
+
+            self.offsets.append(len(self.neighbors))
+
+        # Since every edge is stored twice, the number of edges is
+        # half the size of the neighbors array.
+        self.n = len(self.neighbors) // 2
+
+    def __contains__(self, nid):
+        """Determine if the vertex ID given is in the CompactGraph.
+
+        Args:
+          nid (int): the vertex ID to look for.
+
+        Complexity: O(1)
+
+        Returns:
+          boolean: True if and only if a vertex with the given ID is
+            inside the CompactGraph. False otherwise.
+        """
+        return nid in self.index
+
+    def __getstate__(self):
+        """Return the state of the CompactGraph to be pickled.
+
+        A CompactGraph mapped from a binary file only sends the name of
+        the file and its colors, so the processes that receive it map
+        the same file instead of copying the arrays.
+
+        Complexity: O(|V| + |E|), or O(|V|) if it is mapped.
+
+        Returns:
+          dict: the attributes of the CompactGraph.
+        """
+        state = self.__dict__.copy()
+
+        if self.source is not None:
+            for name in ("buffer", "index", "neighbors", "offsets",
+                         "vertices"):
+                state.pop(name, None)
+
+        return state
+
+    def __iter__(self):
+        """Iterate over the vertex IDs of the CompactGraph.
+
+        Complexity: O(1)
+
+        Returns:
+          iterator: an iterator over the vertex IDs, in the same order
+            they had in the original GRAPH.
+        """
+        return iter(self.vertices)
+
+    def __len__(self):
+        """Determine the number of vertices in the CompactGraph.
+
+        Complexity: O(1)
+
+        Returns:
+          int: the number of vertices.
+        """
+        return self.m
+
+    def __setstate__(self, state):
+        """Restore a pickled CompactGraph.
+
+        Args:
+          state (dict): the attributes returned by '__getstate__'.
+
+        Complexity: O(|V|)
+        """
+        self.__dict__.update(state)
+
+        if self.source is not None:
+            _map_binary(self, self.source)
+
+    def check_coloring(self):
+        """Check that the CompactGraph has a valid coloring.
+
+        A coloring is valid if and only if no adjacent vertices share
+        the same color. Since the colors and the adjacency lists are
+        stored in flat arrays, this check is a single pass over the
+        'neighbors' array.
+
+        Complexity: O(|V| + |E|)
+
+        Raises:
+          RuntimeError: If two adjacent vertices share the same color.
+        """
+        colors = self.colors
+        neighbors = self.neighbors
+        offsets = self.offsets
+
+        for p in range(self.m):
+            color = colors[p]
+
+            for q in neighbors[offsets[p]:offsets[p + 1]]:
+                if color == colors[q]:
+                    raise RuntimeError(
+                      "INVALID COLORING: vertex {0} and vertex {1} share the color {2}".format(
+                        self.vertices[p],
+                        self.vertices[q],
+                        color
+                      )
+                    )
+
+        print("Coloring is valid. No problems found.")
+
+    def degree(self, nid):
+        """Get the degree of a vertex.
+
+        Args:
+          nid (int): the vertex ID.
+
+        Complexity: O(1)
+
+        Returns:
+          int: the number of neighbors of the vertex.
+        """
+        p = self.index[nid]
+
+        return self.offsets[p + 1] - self.offsets[p]
+
+    def get_color(self, nid):
+        """Get the color assigned to a vertex.
+
+        Args:
+          nid (int): the vertex ID.
+
+        Complexity: O(1)
+
+        Returns:
+          int: the color of the vertex, or SENTINEL if it has not been
+            colored.
+        """
+        return self.colors[self.index[nid]]
+
+    def get_colors_used(self):
+        """Get the amount of different colors used in the graph.
+
+        Complexity: O(|V|)
+
+        Returns:
+          int: the number of different colors used to color the graph.
+        """
+        return len(set(self.colors))
+
+    def get_max_degree(self):
+        """Get the max degree found in the CompactGraph.
+
+        Complexity: O(|V|)
+
+        Returns:
+          int: the maximum degree, or 0 if the graph is empty.
+        """
+        offsets = self.offsets
+
+        return max(
+          (offsets[p + 1] - offsets[p] for p in range(self.m)), default=0)
+
+    def get_min_degree(self):
+        """Get the min degree found in the CompactGraph.
+
+        Complexity: O(|V|)
+
+        Returns:
+          int: the minimum degree, or SENTINEL if the graph is empty.
+        """
+        offsets = self.offsets
+
+        return min(
+          (offsets[p + 1] - offsets[p] for p in range(self.m)),
+          default=SENTINEL)
+
+    def is_valid(self, nid, color):
+        """Check if the vertex can be assigned with the given color.
+
+        Args:
+          nid (int): the vertex ID of the vertex to check.
+          color (int): the color to check.
+
+        Complexity: O(deg(vertex))
+
+        Returns:
+          boolean: True if and only if no neighbor of the vertex has
+            the given color. False otherwise.
+        """
+        p = self.index[nid]
+        colors = self.colors
+
+        for q in self.neighbors[self.offsets[p]:self.offsets[p + 1]]:
+            if colors[q] == color:
+                return False
+
+        return True
+
+    def neighbors_of(self, nid):
+        """Get the neighbors of a vertex.
+
+        The neighbors are produced in the order they had in the
+        adjacency list of the original GRAPH.
+
+        Args:
+          nid (int): the vertex ID.
+
+        Complexity: O(deg(vertex))
+
+        Returns:
+          list of int: the vertex IDs of the neighbors of the vertex.
+        """
+        p = self.index[nid]
+        vertices = self.vertices
+
+        return [vertices[q] for q in
+                self.neighbors[self.offsets[p]:self.offsets[p + 1]]]
+
+    def set_color(self, nid, color):
+        """Assign a color to a vertex.
+
+        Args:
+          nid (int): the vertex ID.
+          color (int): the color to assign.
+
+        Complexity: O(1)
+        """
+        self.colors[self.index[nid]] = color
+
+    def to_graph(self):
+        """Convert the CompactGraph back into a GRAPH.
+
+        The vertices are added in their original order, and every
+        adjacency list keeps its order, so the resulting GRAPH can be
+        used by all of the algorithms that expect a GRAPH. The DEGREE
+        data structure is not built; it will be created as needed.
+
+        Complexity: O(|V| + |E|)
+
+        Returns:
+          GRAPH: a new GRAPH with the same vertices, edges and colors.
+        """
+        g = GRAPH()
+        vertices = self.vertices
+        neighbors = self.neighbors
+        offsets = self.offsets
+
+        for p in range(self.m):
+            g.add_vertex(vertices[p])
+            g.vertices[vertices[p]].color = self.colors[p]
+
+        for p in range(self.m):
+            for q in neighbors[offsets[p]:offsets[p + 1]]:
+                g.add_edge(vertices[p], vertices[q])
+
+        return g
+
+
+class ResidualGraph(object):
+    """Implements the residual graph of the Greedy Independent Set
+    algorithm.
+    
+    The Greedy Independent Set algorithm (algorithm D) builds every 
+    color class by choosing a vertex, deleting it along with its 
+    neighborhood, and repeating until the graph is empty; then the 
+    vertices of the class are deleted for good, and the rest of the 
+    vertices are restored for the next class. Doing this on a GRAPH 
+    means deleting every edge (and recording it in the journal) only to
+    restore it afterwards.
+    
+    A ResidualGraph keeps the adjacency lists fixed, as lists of vertex
+    positions, and only marks which vertices are still 'alive' in the
+    current class. The degrees are kept in buckets indexed by degree, 
+    as in the 'slots' of the DEGREE, but the buckets are updated lazily:
+    when the degree of a vertex decreases, a new entry is appended to 
+    its new bucket, and the outdated entries are discarded when they 
+    are found. Every entry carries a stamp, so only the most recent 
+    entry of every vertex is valid.
+    
+    Since the new entries are appended at the end of the buckets, the
+    valid entries of every bucket are in the same order as the vertices
+    in the buckets of the DEGREE, and the vertices are choosed exactly
+    as if the GRAPH was destroyed and restored.
+    
+    Attributes:
+      HAZARD (set): the proposals of the GRAPH 'get_random_vertex' 
+        method that visit the buckets in a cycle, which can be 
+        reproduced by 'get_random_vertex'.
+      PROPOSALS (set): all the proposals that can be reproduced by 
+        'get_random_vertex'.
+      alive (list): True for the vertices still in the current class,
+        indexed by position.
+      colored (list): True for the vertices already colored, indexed by
+        position.
+      degree (list): the degree of every alive vertex, indexed by 
+        position.
+      min_degree (int): a lower bound of the minimum degree of the 
+        alive vertices.
+      neighbors (list): the positions of the neighbors of every vertex,
+        in the order of the adjacency lists of the GRAPH.
+      remaining (int): the number of alive vertices.
+      slots (list): the buckets indexed by degree. Every bucket is a 
+        deque of (position, stamp) entries.
+      stamp (int): the stamp of the last entry appended.
+      stamps (list): the stamp of the valid entry of every vertex.
+      uncolored (int): the number of vertices not colored yet.
+      vertices (list): the vertices of the GRAPH, indexed by position.
+    """
+    HAZARD = {29, 30, 31, 32}
+    PROPOSALS = HAZARD | {0}
+    
+    def __init__(self, graph):
+        """Create the residual graph of a GRAPH.
+        
+        The vertices keep the order they have inside the GRAPH. No 
+        vertex is alive until 'start' is called.
+        
+        Args:
+          graph (GRAPH): the graph to be colored.
+          
+        Complexity: O(|V| + |E|)
+        """
+        self.vertices = [vertex for vertex in graph.vertices]
+        index = {vertex.nid: p for p, vertex in enumerate(self.vertices)}
+        
+        self.neighbors = [
+          [index[neighbor.nid] for neighbor in vertex.data 
+           if neighbor.nid in index] 
+          for vertex in self.vertices]
+        self.alive = [False] * len(self.vertices)
+        self.colored = [False] * len(self.vertices)
+        self.degree = [0] * len(self.vertices)
+        self.min_degree = 0
+        self.remaining = 0
+        self.slots = list()
+        self.stamp = 0
+        self.stamps = [0] * len(self.vertices)
+        self.uncolored = len(self.vertices)
+        
+    def _append(self, p):
+        """Append a new entry of a vertex to the bucket of its degree.
+        
+        Args:
+          p (int): the position of the vertex.
+          
+        Complexity: O(1)
+        """
+        self.stamp += 1
+        self.stamps[p] = self.stamp
+        self.slots[self.degree[p]].append((p, self.stamp))
+        
+    def _first(self, deg):
+        """Get the first vertex of a bucket.
+        
+        The outdated entries found at the beginning of the bucket are
+        discarded.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1) amortized.
+        
+        Returns:
+          int: the position of the first vertex of the bucket, or None
+            if the bucket is empty.
+        """
+        bucket = self.slots[deg]
+        
+        while bucket:
+            p, stamp = bucket[0]
+            
+            if self.alive[p] and self.stamps[p] == stamp:
+                return p
+                
+            bucket.popleft()
+            
+        return None
+        
+    def _members(self, deg):
+        """Get all the vertices of a bucket, in order.
+        
+        The outdated entries of the bucket are discarded.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(size of the bucket)
+        
+        Returns:
+          list: the positions of the vertices of the bucket.
+        """
+        alive = self.alive
+        stamps = self.stamps
+        bucket = collections.deque(
+          entry for entry in self.slots[deg] 
+          if alive[entry[0]] and stamps[entry[0]] == entry[1])
+        
+        self.slots[deg] = bucket
+        
+        return [p for p, stamp in bucket]
+        
+    def get_min_degree_vertex(self):
+        """Get the first vertex of minimum degree.
+        
+        Complexity: O(1) amortized.
+        
+        Returns:
+          int: the position of the vertex, or None if no vertex is 
+            alive.
+        """
+        if self.remaining == 0:
+            return None
+            
+        while True:
+            p = self._first(self.min_degree)
+            
+            if p is not None:
+                return p
+                
+            self.min_degree += 1
+            
+    def get_random_vertex(self, proposal=0, exp=1):
+        """Get a random vertex, as the GRAPH 'get_random_vertex' method.
+        
+        Only the proposals in PROPOSALS are reproduced: Proposal 0 
+        chooses any alive vertex with the same probability, and the
+        Proposals 29 - 32 visit the buckets in a cycle, choosing a
+        non-empty bucket of degree deg with probability 1 / (deg + 1)
+        (raised to 'exp' in Proposal 30).
+        
+        Args:
+          proposal (int): the proposal used to choose the vertex. 
+            Defaults to zero.
+          exp (float): the exponent used by Proposal 30. Defaults to 1.
+          
+        Complexity: O(|V|)
+        
+        Returns:
+          int: the position of the vertex choosed.
+          
+        Raises:
+          ValueError: if the proposal can not be reproduced.
+        """
+        if proposal not in ResidualGraph.PROPOSALS:
+            raise ValueError(
+              "Proposal {0} can not be reproduced".format(proposal))
+              
+        if proposal == 0:
+            candidates = [p for p in range(len(self.vertices)) 
+                          if self.alive[p]]
+                          
+            return random.choice(candidates)
+            
+        # The non-empty buckets, in the order they are visited
+        degrees = [deg for deg in range(len(self.slots)) 
+                   if self._first(deg) is not None]
+        
+        if proposal in (29, 30):
+            degrees.reverse()
+            
+        rate = exp if proposal == 30 else 1
+        
+        while True:
+            for deg in degrees:
+                if random.uniform(0, 1) < (1.0 / (deg + 1)) ** rate:
+                    if proposal in (29, 31):
+                        return self._first(deg)
+                        
+                    return random.choice(self._members(deg))
+                    
+    def is_empty(self):
+        """Determine if no vertex is alive in the current class.
+        
+        Complexity: O(1)
+        
+        Returns:
+          boolean: True if and only if every vertex has been removed.
+        """
+        return self.remaining == 0
+        
+    def remove(self, p):
+        """Color a vertex and remove it, along with its neighborhood.
+        
+        The vertices are removed in the same order as the edges are 
+        deleted from a GRAPH by the Greedy Independent Set algorithm, 
+        so the vertices whose degree decreases end in the same order
+        inside their buckets.
+        
+        Args:
+          p (int): the position of the vertex to color.
+          
+        Complexity: O(sum of the degrees of the neighborhood)
+        """
+        alive = self.alive
+        degree = self.degree
+        neighbors = self.neighbors
+        
+        for u in neighbors[p]:
+            if not alive[u]:
+                continue
+                
+            for w in neighbors[u]:
+                if alive[w] and w != p:
+                    degree[w] -= 1
+                    self._append(w)
+                    
+                    if degree[w] < self.min_degree:
+                        self.min_degree = degree[w]
+                        
+            alive[u] = False
+            self.remaining -= 1
+            
+        alive[p] = False
+        self.colored[p] = True
+        self.remaining -= 1
+        self.uncolored -= 1
+        
+    def start(self):
+        """Start a new color class.
+        
+        Every uncolored vertex becomes alive again, and the buckets are
+        built with the vertices in their original order.
+        
+        Complexity: O(|V| + |E|)
+        """
+        colored = self.colored
+        
+        for p in range(len(self.vertices)):
+            if not colored[p]:
+                self.neighbors[p] = [
+                  q for q in self.neighbors[p] if not colored[q]]
+                  
+        self.alive = [not value for value in colored]
+        self.degree = [len(adjacency) for adjacency in self.neighbors]
+        self.slots = [collections.deque() 
+                      for _ in range(max(self.degree, default=0) + 1)]
+        self.min_degree = len(self.slots)
+        self.remaining = self.uncolored
+        
+        for p in range(len(self.vertices)):
+            if not colored[p]:
+                self._append(p)
+                self.min_degree = min(self.min_degree, self.degree[p])
+
+
+class InducedGraph(object):
+    """Implements a view of an induced subgraph of a GRAPH.
+    
+    Algorithm B recurses on the subgraph induced by the neighborhood of
+    a vertex. The GRAPH 'subgraph' method builds it by moving those
+    vertices into a new GRAPH and deleting the edges that leave them,
+    one by one, while the DEGREE of both GRAPHS is updated and every
+    change is recorded in the journal, only to restore the GRAPH when
+    algorithm B ends.
+    
+    An InducedGraph never modifies the GRAPH. The adjacency lists are
+    kept fixed, as lists of vertex positions, and every vertex points
+    to the view that currently holds it (its 'owner'), so the vertices
+    moved to a subgraph, or deleted, are just skipped by their former
+    view. All the views of a GRAPH share those lists, since a vertex 
+    belongs to a single view at a time, and the degrees are counted 
+    relative to the owner of every vertex. The degrees are kept in 
+    buckets updated lazily, as in the ResidualGraph: when the degree of
+    a vertex decreases, the vertex is appended to its new bucket, and 
+    the entries that no longer match the owner or the degree of their
+    vertex are discarded when they are found.
+    
+    The vertices, their neighbors and the buckets keep the order they
+    would have inside the GRAPHS built by the 'subgraph' method, so 
+    algorithm B chooses exactly the same vertices on the views. Only 
+    the colors are assigned to the vertices of the GRAPH, through its
+    'set_color' method.
+    
+    Attributes:
+      PROPOSALS (set): the proposals of the GRAPH 'get_random_vertex' 
+        method that can be reproduced by 'get_random_vertex'.
+      degree (list): the degree of every vertex inside the view that
+        holds it, indexed by position. Shared by all the views.
+      graph (GRAPH): the GRAPH whose vertices are viewed.
+      index (dict): the position of every vertex, indexed by Node ID.
+        Shared by all the views.
+      m (int): the number of vertices in the view.
+      max_degree (int): an upper bound of the maximum degree of the
+        view.
+      members (list): the positions of the vertices of the view, in 
+        order. The vertices that left the view are removed from it as
+        they are found.
+      neighbors (list): the positions of the neighbors of every vertex,
+        in the order of the adjacency lists of the GRAPH. Shared by all
+        the views.
+      owner (list): the view that holds every vertex, or None if the 
+        vertex has been deleted, indexed by position. Shared by all the
+        views.
+      slots (list): the buckets indexed by degree. Every bucket is a
+        deque of positions. None until the degrees are first needed.
+      vertices (list): the vertices of the GRAPH, indexed by position.
+        Shared by all the views.
+    """
+    PROPOSALS = {0}
+    
+    def __init__(self, graph, parent=None):
+        """Create a view of a GRAPH, or an empty subgraph of a view.
+        
+        The view of a GRAPH holds all of its vertices, in the order 
+        they have inside the GRAPH. If the DEGREE of the GRAPH has been
+        built, the buckets keep its order. The subgraphs are filled by
+        the 'subgraph' method.
+        
+        Args:
+          graph (GRAPH): the graph to view.
+          parent (InducedGraph): the view whose lists are shared by the
+            new subgraph. Defaults to None.
+            
+        Complexity: O(|V| + |E|) for the view of a GRAPH, O(1) for a
+          subgraph.
+        """
+        self.graph = graph
+        self.max_degree = 0
+        self.slots = None
+        
+        if parent is not None:
+            self.degree = parent.degree
+            self.index = parent.index
+            self.m = 0
+            self.members = list()
+            self.neighbors = parent.neighbors
+            self.owner = parent.owner
+            self.vertices = parent.vertices
+            
+            return
+            
+        self.vertices = [vertex for vertex in graph.vertices]
+        index = {vertex.nid: p for p, vertex in enumerate(self.vertices)}
+        
+        self.index = index
+        self.neighbors = [
+          [index[nid] for nid in vertex.data.nids() if nid in index]
+          for vertex in self.vertices]
+        self.degree = [len(adjacency) for adjacency in self.neighbors]
+        self.m = len(self.vertices)
+        self.members = list(range(self.m))
+        self.owner = [self] * self.m
+        
+        if graph.degrees is not None:
+            self._build([
+              index[copy_vertex.nid] for bucket in graph.degrees.buckets
+              for copy_vertex in bucket.data.nodes() 
+              if copy_vertex.nid in index])
+              
+    def __str__(self):
+        """Create a readable representation of the view.
+        
+        Complexity: O(|V| + |E|)
+        
+        Returns:
+          string: a representation of the view, with the Node IDs of 
+            its vertices and of their neighbors.
+        """
+        nodes = self.nodes()
+        adjacencies = []
+        
+        for vertex in nodes:
+            adjacencies.append("Vertex: {0}\n{1}".format(
+              vertex.nid, 
+              [neighbor.nid for neighbor in self.neighborhood(vertex)]))
+              
+        return "Vertices:\n{0}\nAdjacencies lists:\n{1}\n".format(
+          [vertex.nid for vertex in nodes],
+          "\n".join(adjacencies)
+        )
+        
+    def _build(self, order):
+        """Build the buckets of the view.
+        
+        Args:
+          order (list): the positions of the vertices of the view, in 
+            the order they will have inside their buckets.
+            
+        Complexity: O(|V|)
+        """
+        degree = self.degree
+        
+        self.max_degree = max((degree[p] for p in order), default=0)
+        self.slots = [collections.deque() 
+                      for _ in range(self.max_degree + 1)]
+        
+        for p in order:
+            self.slots[degree[p]].append(p)
+            
+    def _decrease(self, p):
+        """Decrease in 1 the degree of a vertex of the view.
+        
+        Args:
+          p (int): the position of the vertex.
+          
+        Complexity: O(1)
+        """
+        self.degree[p] -= 1
+        
+        if self.slots is not None:
+            self.slots[self.degree[p]].append(p)
+            
+    def _first(self, deg):
+        """Get the first vertex of a bucket.
+        
+        The outdated entries found at the beginning of the bucket are
+        discarded.
+        
+        Args:
+          deg (int): the degree of the bucket.
+          
+        Complexity: O(1) amortized.
+        
+        Returns:
+          int: the position of the first vertex of the bucket, or None
+            if the bucket is empty.
+        """
+        bucket = self.slots[deg]
+        
+        while bucket:
+            p = bucket[0]
+            
+            if self.owner[p] is self and self.degree[p] == deg:
+                return p
+                
+            bucket.popleft()
+            
+        return None
+        
+    def count_edges(self):
+        """Count the edges between the vertices of the view.
+        
+        Complexity: O(|V|)
+        
+        Returns:
+          int: the number of edges of the view.
+        """
+        degree = self.degree
+        
+        return sum(degree[p] for p in self.positions()) // 2
+        
+    def delete_vertex(self, vid):
+        """Delete a vertex from the view.
+        
+        Unlike the GRAPH 'delete_vertex' method, the degrees of the 
+        neighbors of the vertex are updated. Algorithm B only deletes 
+        vertices whose neighbors have been moved to a subgraph, so the
+        result is the same.
+        
+        Args:
+          vid (int): the vertex ID of the vertex to be removed.
+          
+        Complexity: O(deg(vertex))
+        
+        Returns:
+          Node: the vertex deleted from the view, or None if it does not
+            belong to the view.
+        """
+        p = self.index.get(vid)
+        owner = self.owner
+        
+        if p is None or owner[p] is not self:
+            return None
+            
+        owner[p] = None
+        self.m -= 1
+        
+        for q in self.neighbors[p]:
+            if owner[q] is self:
+                self._decrease(q)
+                
+        return self.vertices[p]
+        
+    def get_degree(self, vertex):
+        """Get the degree of a vertex inside the view.
+        
+        Args:
+          vertex (Node): a vertex of the view.
+          
+        Complexity: O(1)
+        
+        Returns:
+          int: the number of neighbors of the vertex inside the view.
+        """
+        return self.degree[self.index[vertex.nid]]
+        
+    def get_max_degree(self):
+        """Get the max degree currently found in the view.
+        
+        The buckets are built the first time, and the empty buckets 
+        above the max degree are skipped. Since the degrees never grow,
+        every bucket is skipped only once.
+        
+        Complexity: O(1) amortized.
+        
+        Returns:
+          int: the maximum degree found in the view.
+        """
+        if self.slots is None:
+            self._build(self.positions())
+            
+        while self.max_degree > 0 and self._first(self.max_degree) is None:
+            self.max_degree -= 1
+            
+        return self.max_degree
+        
+    def get_max_degree_vertex(self):
+        """Get the first vertex of maximum degree in the view.
+        
+        Complexity: O(1) amortized.
+        
+        Returns:
+          Node: a vertex with maximum degree inside the view, or None if
+            the view is empty.
+        """
+        p = self._first(self.get_max_degree())
+        
+        return None if p is None else self.vertices[p]
+        
+    def get_random_vertex(self, proposal=0, exp=1):
+        """Get a random vertex, as the GRAPH 'get_random_vertex' method.
+        
+        Only the proposals in PROPOSALS are reproduced: Proposal 0
+        chooses any vertex of the view with the same probability.
+        
+        Args:
+          proposal (int): the proposal used to choose the vertex.
+            Defaults to zero.
+          exp (float): the exponent used by the proposal. Defaults to 1.
+          
+        Complexity: O(|V|)
+        
+        Returns:
+          Node: the vertex choosed.
+          
+        Raises:
+          ValueError: if the proposal can not be reproduced.
+        """
+        if proposal not in InducedGraph.PROPOSALS:
+            raise ValueError(
+              "Proposal {0} can not be reproduced".format(proposal))
+              
+        return random.choice(self.nodes())
+        
+    def neighborhood(self, vertex):
+        """Get the neighbors of a vertex inside the view.
+        
+        Args:
+          vertex (Node): a vertex of the view.
+          
+        Complexity: O(deg(vertex)) in the GRAPH.
+        
+        Returns:
+          list: the neighbors of the vertex inside the view, in the 
+            order of its adjacency list.
+        """
+        owner = self.owner
+        vertices = self.vertices
+        
+        return [vertices[q] for q in self.neighbors[self.index[vertex.nid]]
+                if owner[q] is self]
+                
+    def nodes(self):
+        """Get the vertices of the view, in order.
+        
+        Complexity: O(|V|)
+        
+        Returns:
+          list: the vertices of the view.
+        """
+        vertices = self.vertices
+        
+        return [vertices[p] for p in self.positions()]
+        
+    def positions(self):
+        """Get the positions of the vertices of the view, in order.
+        
+        The vertices that left the view are removed from the 'members'
+        list.
+        
+        Complexity: O(|V|)
+        
+        Returns:
+          list: the positions of the vertices of the view.
+        """
+        owner = self.owner
+        
+        if len(self.members) != self.m:
+            self.members = [p for p in self.members if owner[p] is self]
+            
+        return self.members
+        
+    def set_color(self, vertex, color):
+        """Assign a color to a vertex of the view.
+        
+        The color is assigned through the GRAPH 'set_color' method, so
+        it can be undone when a snapshot of the GRAPH is restored.
+        
+        Args:
+          vertex (Node): the vertex to color.
+          color (int): the color to assign.
+          
+        Complexity: O(1)
+        """
+        self.graph.set_color(vertex, color)
+        
+    def subgraph(self, vertex):
+        """Creates the subgraph induced by the neighborhood of the given
+        vertex.
+        
+        The neighbors of the vertex are moved to the new view, in the 
+        order of its adjacency list, and the degrees of the vertices
+        left in this view are decreased once for every edge that goes
+        to the subgraph, in the same order in which the GRAPH 
+        'subgraph' method deletes those edges.
+        
+        Args:
+          vertex (Node): the vertex whose neighborhood will induce the
+            new subgraph.
+            
+        Complexity: O(sum of the degrees of the neighborhood)
+        
+        Returns:
+          InducedGraph: a new view with only the vertices on the 
+            neighborhood of the vertex given.
+        """
+        degree = self.degree
+        neighbors = self.neighbors
+        owner = self.owner
+        subgraph = InducedGraph(self.graph, self)
+        
+        members = [q for q in neighbors[self.index[vertex.nid]] 
+                   if owner[q] is self]
+        
+        for q in members:
+            owner[q] = subgraph
+            
+        subgraph.members = members
+        subgraph.m = len(members)
+        self.m -= len(members)
+        
+        for q in members:
+            inside = 0
+            
+            for w in neighbors[q]:
+                if owner[w] is subgraph:
+                    inside += 1
+                elif owner[w] is self:
+                    self._decrease(w)
+                    
+            degree[q] = inside
+            
+        return subgraph
+
+
+# ------------------------------------------------------------------- #
+#                            Utily methods                            #
+# ------------------------------------------------------------------- #
+
+def _compact_from_edges(m, edges):
+    """Build a CompactGraph with the vertices 1, 2, ..., m and the 
+    given edges.
+    
+    The neighbors of every vertex are stored in the order in which the
+    edges are given.
+    
+    Args:
+      m (int): the number of vertices.
+      edges (list of tuple): the edges of the graph, without repeats.
+      
+    Complexity: O(|V| + |E|)
+    
+    Returns:
+      CompactGraph: the new graph.
+    """
+    compact = CompactGraph()
+    compact.m = m
+    compact.n = len(edges)
+    compact.vertices = array('q', range(1, m + 1))
+    compact.colors = array('q', [SENTINEL]) * m
+    compact.index = {nid: nid - 1 for nid in range(1, m + 1)}
+    
+    # Counts the degree of every vertex to compute the offsets
+    degrees = [0] * (m + 1)
+    
+    for ea, eb in edges:
+        degrees[ea] += 1
+        degrees[eb] += 1
+        
+    offsets = array('l', [0]) * (m + 1)
+    
+    for position in range(m):
+        offsets[position + 1] = offsets[position] + degrees[position + 1]
+        
+    neighbors = array('l', [0]) * offsets[m]
+    cursor = array('l', offsets[:m])
+    
+    for ea, eb in edges:
+        neighbors[cursor[ea - 1]] = eb - 1
+        cursor[ea - 1] += 1
+        neighbors[cursor[eb - 1]] = ea - 1
+        cursor[eb - 1] += 1
+        
+    compact.offsets = offsets
+    compact.neighbors = neighbors
+    
+    return compact
+
+
+def _map_binary(compact, filename):
+    """Map the arrays of a binary file into a CompactGraph.
+
+    The file is mapped read-only, so the 'neighbors', 'offsets' and 
+    'vertices' arrays of the CompactGraph are views of the pages of the
+    file, which are shared by all the processes that map it. 
+    
+    Args:
+      compact (CompactGraph): the CompactGraph to fill.
+      filename (string): the name of a file written by 'to_binary'.
+      
+    Complexity: O(|V|)
+    
+    Returns:
+      tuple: the header of the file.
+      
+    Raises:
+      ValueError: if the file is not a binary file written by 
+        'to_binary'.
+    """
+    with open(filename, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+    header = BINARY_HEADER.unpack_from(buffer) \
+             if len(buffer) >= BINARY_HEADER.size else None
+    
+    if header is None or header[0] != BINARY_MAGIC:
+        buffer.close()
+        raise ValueError("{0} is not a binary graph file".format(filename))
+        
+    m, n, flags = header[1:4]
+    words = memoryview(buffer).cast('q')
+    start = BINARY_HEADER.size // 8
+    
+    compact.buffer = buffer
+    compact.m = m
+    compact.n = n
+    compact.vertices = words[start:start + m]
+    start += m
+    compact.offsets = words[start:start + m + 1]
+    start += m + 1
+    compact.neighbors = words[start:start + 2 * n]
+    start += 2 * n
+    
+    # The colors are copied, since they are changed by the algorithms
+    if "colors" not in compact.__dict__ or len(compact.colors) != m:
+        if flags & 1:
+            compact.colors = array('q', words[start:start + m])
+        else:
+            compact.colors = array('q', [SENTINEL]) * m
+            
+    compact.index = {nid: p for p, nid in enumerate(compact.vertices)}
+    compact.source = filename
+    
+    return header
+
+
+def _stamp(filename, digest=True):
+    """Identify the current contents of a file.
+    
+    Args:
+      filename (string): the name of the file.
+      digest (boolean): if False, the SHA-1 hash of the file is not
+        computed. Defaults to True.
+        
+    Complexity: O(size of the file)
+    
+    Returns:
+      tuple: the size, the modification time (in nanoseconds) and the
+        SHA-1 hash of the file (or None).
+    """
+    status = os.stat(filename)
+    sha = None
+    
+    if digest:
+        with open(filename, "rb") as f:
+            sha = hashlib.sha1(f.read()).digest()
+            
+    return status.st_size, status.st_mtime_ns, sha
+
+
+def from_binary(filename, source=None):
+    """Load a graph stored by 'to_binary'.
+    
+    The file is mapped in memory instead of read, so loading it only
+    takes the time needed to rebuild the index of the vertices, and 
+    all the processes that load the same file share a single copy of
+    the adjacency lists. The CompactGraph keeps this property when it
+    is sent to other processes (for example, as an argument of a 
+    process pool).
+    
+    Args:
+      filename (string): the name of the binary file.
+      source (string): the file the graph was read from. If given, 
+        the size, modification time and hash stored in the binary file
+        are checked against it. Defaults to None.
+        
+    Complexity: O(|V|)
+    
+    Returns:
+      CompactGraph: the graph stored in the file, or None if 'source'
+        was changed after the binary file was written.
+        
+    Raises:
+      ValueError: if the file is not a binary file written by 
+        'to_binary'.
+    """
+    compact = CompactGraph()
+    header = _map_binary(compact, filename)
+    
+    if source is not None:
+        size, mtime, sha = _stamp(source, digest=False)
+        
+        # Only hash the source if its modification time changed
+        if size != header[4] or (mtime != header[5] and 
+                                 _stamp(source)[2] != header[6]):
+            return None
+            
+    return compact
+    
+    
+def from_dimacs(filename, compact=False):
+    """Load a graph stored in the DIMACS format.
+    
+    In the DIMACS format, every line of the input begins with a letter
+    that defines the content of that line. The legal lines are:
+    
+      * c : Comment. The rest of the line should be ignored.
+      * p : Problem. Must be of form 'p edges m n' where m is the
+            number of nodes (to be numbered 1...m) and n is the
             number of edges.
       * e : Edge. Must be of form 'e n1 n2 d' where n1 and n2 are
             the endpoints of the edge. The optional d value is used
@@ -3111,46 +5510,92 @@ def from_dimacs(filename):
     Since the DIMACS format only specifies edges, this method takes
     O(|E|) to complete.
     
+    The file is mapped in memory and the 'p' and 'e' lines are found
+    with regular expressions in a single pass, so any amount of spaces
+    or tabs between the fields is accepted. Repeated edges (many files
+    list every edge in both directions) and loops are skipped, and the
+    adjacency lists are built in bulk instead of calling 'add_edge'
+    for every edge. The order of the vertices and of the adjacency 
+    lists is the same as if the edges were added one by one.
+    
     Args:
       filename (string): the full path to the text file containing the
         specification of the graph.
+      compact (boolean): if True, a CompactGraph is returned instead of
+        a GRAPH. Defaults to False.
         
     Complexity: O(|E|).
         
+    Returns:
+      GRAPH: the graph stored in the file, or a CompactGraph if
+        'compact' is True.
+        
     Raises:
       SyntaxError: if the DIMACS syntax is incorrect or does not
       correspond to a valid graph syntax.
     """
-    g = GRAPH()
-    
-    with open(filename, "r") as f:
-        for line in f:
-            # Comments are ignored
-            if line.startswith("c"):
-                continue
+    with open(filename, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped
+            data = b""
             
-            # There should be 1 and only 1 p line.
-            if line.startswith("p"):
-                specs = line.split(" ")
-                m = int(specs[2])
-                n = int(specs[3])
-                
-                for i in range(1, m + 1):
-                    g.add_vertex(i)
-                
-                continue
+        try:
+            problem = DIMACS_PROBLEM.search(data)
             
-            # Most lines of the graph are edges
-            if line.startswith("e"):
-                # Currently, the algorithm only support 
-                ends = line.split(" ")
-                ea = int(ends[1])
-                eb = int(ends[2])
-                
-                g.add_edge(ea, eb)
-                
-                continue
+            if problem is None:
+                raise SyntaxError(
+                  "No problem line found in {0}".format(filename))
+                  
+            m = int(problem.group(1))
+            ends = array('q', [int(end) for edge in DIMACS_EDGE.findall(data)
+                                         for end in edge])
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
                 
+    # Keeps the first occurrence of every edge between two vertices
+    seen = set()
+    edges = list()
+    
+    for index in range(0, len(ends), 2):
+        ea = ends[index]
+        eb = ends[index + 1]
+        
+        if ea == eb or not (0 < ea <= m and 0 < eb <= m):
+            continue
+            
+        key = (ea, eb) if ea < eb else (eb, ea)
+        
+        if key not in seen:
+            seen.add(key)
+            edges.append((ea, eb))
+            
+    if compact:
+        return _compact_from_edges(m, edges)
+        
+    g = GRAPH()
+    g.vertices.extend(Node(i, data=DoublyLinkedList()) for i in range(1, m + 1))
+    g.m = m
+    g.n = len(edges)
+    
+    # Creates the mirror nodes of every edge
+    adjacency = [None] + [list() for _ in range(m)]
+    
+    for ea, eb in edges:
+        neighbor_a = Node(ea)
+        neighbor_b = Node(eb)
+        
+        neighbor_a.data = neighbor_b
+        neighbor_b.data = neighbor_a
+        
+        adjacency[ea].append(neighbor_b)
+        adjacency[eb].append(neighbor_a)
+        
+    for vertex in g.vertices:
+        vertex.data.extend(adjacency[vertex.nid])
+        
     return g
     
 def from_json(filename):
@@ -3206,6 +5651,104 @@ def from_json(filename):
     
     return g
     
+def load_graph(filename, compact=False, cache=True):
+    """Load a graph stored in the DIMACS or the JSON format.
+    
+    The first time a file is loaded, a binary copy of it is written 
+    next to it (with the BINARY_SUFFIX added to its name) by 
+    'to_binary', and mapped in memory with 'from_binary'. The next 
+    times, the binary copy is mapped without parsing the file again,
+    unless the file changed since then. A CompactGraph mapped this way
+    is sent to worker processes by the name of its file, so all the 
+    workers share the same adjacency arrays.
+    
+    Files ending in '.json' are read by 'from_json', and any other file
+    by 'from_dimacs'.
+    
+    Args:
+      filename (string): the name of the file that contains the graph.
+      compact (boolean): if True, a CompactGraph is returned instead of
+        a GRAPH. Defaults to False.
+      cache (boolean): if False, the binary copy is neither read nor 
+        written. Defaults to True.
+        
+    Complexity: O(|V| + |E|), or O(|V|) if 'compact' is True and the 
+      binary copy is current.
+    
+    Returns:
+      GRAPH: the graph stored in the file, or a CompactGraph if
+        'compact' is True.
+    """
+    binary = filename + BINARY_SUFFIX
+    graph = None
+    
+    if cache and os.path.exists(binary):
+        try:
+            graph = from_binary(binary, filename)
+        except (OSError, ValueError, struct.error):
+            graph = None
+            
+    if graph is None:
+        if filename.endswith(".json"):
+            graph = CompactGraph(from_json(filename))
+        else:
+            graph = from_dimacs(filename, compact=True)
+            
+        if cache:
+            try:
+                to_binary(graph, binary, filename)
+                graph = from_binary(binary)
+            except (OSError, ValueError, struct.error):
+                pass
+                
+    return graph if compact else graph.to_graph()
+    
+    
+def to_binary(graph, filename, source=None):
+    """Save a graph to a file in a binary format.
+    
+    The file starts with the BINARY_HEADER, followed by the 'vertices',
+    'offsets' and 'neighbors' arrays of the CompactGraph of the graph,
+    and by its 'colors' array if any vertex is colored. All the values
+    are stored as 8-byte integers in the byte order of the machine, so
+    'from_binary' can map the arrays without converting them.
+    
+    Args:
+      graph (GRAPH): the GRAPH (or CompactGraph) to be saved.
+      filename (string): the name of the file in which the graph will
+        be saved.
+      source (string): the file the graph was read from. Its size, 
+        modification time and hash are stored in the header, so that
+        'from_binary' can tell whether it changed. Defaults to None.
+        
+    Complexity: O(|V| + |E|)
+    """
+    compact = graph if isinstance(graph, CompactGraph) \
+              else CompactGraph(graph)
+    colored = any(color != SENTINEL for color in compact.colors)
+    size, mtime, sha = _stamp(source) if source is not None \
+                       else (0, 0, None)
+    
+    header = BINARY_HEADER.pack(BINARY_MAGIC, compact.m, compact.n, 
+                                1 if colored else 0, size, mtime, 
+                                sha or bytes(20))
+    
+    # Writes to a temporary file first, so other processes never map
+    # a file that is only partially written.
+    partial = "{0}.{1}".format(filename, os.getpid())
+    
+    with open(partial, "wb") as f:
+        f.write(header)
+        f.write(array('q', compact.vertices).tobytes())
+        f.write(array('q', compact.offsets).tobytes())
+        f.write(array('q', compact.neighbors).tobytes())
+        
+        if colored:
+            f.write(array('q', compact.colors).tobytes())
+            
+    os.replace(partial, filename)
+    
+    
 def to_dimacs(graph, filename):
     """Save a graph to a file in the DIMACS format.
     
@@ -3314,7 +5857,7 @@ def to_json(graph, filename):
         jsonv = dict()
         jsonv["vid"] = vertex.nid
         jsonv["label"] = str(vertex.color)
-        jsonv["neighbors"] = list(vertex.data.elements.keys())
+        jsonv["neighbors"] = [neighbor.nid for neighbor in vertex.data]
         
         json_vertices.append(jsonv)
         
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+
+"""Count and time the operations made by the coloring algorithms.
+
+This module implements an opt-in instrumentation layer for the GRAPH,
+DEGREE and InducedGraph data structures and for the recursive 
+algorithms B and SDR-B. While a Profiler is active, the methods listed in the
+attributes below are replaced by wrappers that count their calls and
+accumulate the time spent inside them; when the Profiler stops, the
+original methods are put back. Hence, the instrumentation has no cost
+at all while it is disabled.
+
+The operations are counted both in total and by recursion level of
+the B algorithms: level 0 holds the operations made outside of B (for
+example, by C before calling B), level 1 the operations made by the
+outermost call to B, and so on.
+
+    with instrumentation.Profiler() as profiler:
+        algorithms.c(graph)
+
+    print(profiler)
+    profiler.save("c.json")
+
+The times are inclusive, so the time of 'subgraph' also counts in the
+time of the 'add_edge' calls made by it. Only the current process is
+instrumented; the workers of a process pool are not.
+
+Attributes:
+  ACTIVE (Profiler): the Profiler currently active, or None.
+  ALGORITHM_METHODS (list): the names of the recursive algorithms of
+    the 'algorithms' module whose recursion level is tracked.
+  DEGREE_METHODS (list): the names of the DEGREE methods counted.
+  GRAPH_METHODS (list): the names of the GRAPH methods counted. The
+    '__deepcopy__' method counts the deep copies of the GRAPH.
+  INDUCED_METHODS (list): the names of the InducedGraph methods 
+    counted. They are counted along with the GRAPH methods of the same
+    name, since B calls them instead of the GRAPH methods.
+  SCAN_METHODS (list): the names of the DEGREE methods that scan the
+    buckets. The number of buckets visited by them is also counted.
+"""
+
+import json
+import time
+
+import algorithms
+import datastructures
+
+ACTIVE = None
+ALGORITHM_METHODS = ["b", "sdr_b"]
+DEGREE_METHODS = [
+  "_next_max", "_next_min", "add", "decrease", "extend", "increase",
+  "remove"
+]
+GRAPH_METHODS = [
+  "__deepcopy__", "add_edge", "delete_edge", "delete_vertex",
+  "get_max_degree", "get_max_degree_vertex", "get_min_degree",
+  "get_min_degree_vertex", "get_random_vertex", "restore", "snapshot",
+  "subgraph"
+]
+INDUCED_METHODS = [
+  "delete_vertex", "get_max_degree", "get_max_degree_vertex",
+  "get_random_vertex", "subgraph"
+]
+SCAN_METHODS = ["_next_max", "_next_min"]
+
+class Profiler(object):
+    """Implement a session of instrumentation.
+
+    A Profiler counts the operations made between the calls to its
+    'start' and 'stop' methods (or inside a 'with' block). Only one
+    Profiler can be active at a time.
+
+    Attributes:
+      depth (int): the current recursion level of the B algorithms.
+      levels (dict): the statistics of every recursion level, indexed
+        by level. The statistics are a dictionary indexed by operation
+        name, with the number of 'calls', the 'time' (in seconds) and,
+        for the operations in SCAN_METHODS, the buckets 'scanned'.
+      originals (list): the replaced methods, as tuples of the owner,
+        the name and the original method.
+      started (float): the moment the Profiler was started, or None if
+        it is not active.
+      time (float): the time (in seconds) that the Profiler was active.
+      total (dict): the statistics of all levels together.
+    """
+
+    def __init__(self):
+        """Create a new, inactive, Profiler.
+
+        Complexity: O(1)
+        """
+        self.depth = 0
+        self.levels = dict()
+        self.originals = list()
+        self.time = 0.0
+        self.started = None
+        self.total = dict()
+
+    def __enter__(self):
+        """Start the Profiler when entering a 'with' block.
+
+        Returns:
+          Profiler: this Profiler.
+        """
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the Profiler when leaving a 'with' block.
+
+        Returns:
+          boolean: False, so exceptions are not suppressed.
+        """
+        self.stop()
+
+        return False
+
+    def __str__(self):
+        """Return a table with the statistics of every operation.
+
+        Returns:
+          string: the table, with a section for the totals and a
+            section for every recursion level.
+        """
+        lines = ["Profiled time: {0:.4f}s".format(self.time)]
+        sections = [("Total", self.total)] + [
+          ("Level {0}".format(level), self.levels[level])
+          for level in sorted(self.levels)
+        ]
+
+        for title, stats in sections:
+            lines.append(title)
+
+            for name in sorted(stats):
+                entry = stats[name]
+                lines.append("  {0:<24}{1:>10}{2:>12.4f}s{3}".format(
+                  name, entry["calls"], entry["time"],
+                  "" if "scanned" not in entry
+                  else "{0:>10} scanned".format(entry["scanned"])))
+
+        return "\n".join(lines)
+
+    def _count(self, name):
+        """Create a wrapper that counts and times every call.
+
+        Args:
+          name (string): the name of the operation.
+
+        Returns:
+          function: the function that creates the wrapper.
+        """
+        def wrapper(original):
+            def counted(*args, **kwargs):
+                start = time.perf_counter()
+
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self._record(name, time.perf_counter() - start)
+
+            return counted
+
+        return wrapper
+
+    def _level(self, name):
+        """Create a wrapper that tracks the recursion level of one of
+        the B algorithms.
+
+        Args:
+          name (string): the name of the algorithm.
+
+        Returns:
+          function: the function that creates the wrapper.
+        """
+        def wrapper(original):
+            def counted(*args, **kwargs):
+                self.depth += 1
+                start = time.perf_counter()
+
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self._record(name, time.perf_counter() - start)
+                    self.depth -= 1
+
+            return counted
+
+        return wrapper
+
+    def _record(self, name, elapsed, scanned=None):
+        """Add a call to the statistics of an operation.
+
+        Args:
+          name (string): the name of the operation.
+          elapsed (float): the time spent by the call, in seconds.
+          scanned (int): the buckets visited by the call, if the
+            operation scans them. Defaults to None.
+
+        Complexity: O(1)
+        """
+        level = self.levels.get(self.depth)
+
+        if level is None:
+            level = self.levels[self.depth] = dict()
+
+        for stats in (self.total, level):
+            entry = stats.get(name)
+
+            if entry is None:
+                entry = stats[name] = {"calls": 0, "time": 0.0}
+
+                if scanned is not None:
+                    entry["scanned"] = 0
+
+            entry["calls"] += 1
+            entry["time"] += elapsed
+
+            if scanned is not None:
+                entry["scanned"] += scanned
+
+    def _replace(self, owner, name, wrapper):
+        """Replace a method of a class or a function of a module.
+
+        Args:
+          owner (object): the class or module.
+          name (string): the name of the method or function.
+          wrapper (function): a function that receives the original
+            and returns its replacement.
+
+        Complexity: O(1)
+        """
+        original = getattr(owner, name)
+        self.originals.append((owner, name, original))
+        setattr(owner, name, wrapper(original))
+
+    def _scan(self, name):
+        """Create a wrapper that also counts the buckets visited by a
+        DEGREE scan.
+
+        The buckets visited are computed from the degree where the scan
+        starts and the degree it returns.
+
+        Args:
+          name (string): the name of the scan, in SCAN_METHODS.
+
+        Returns:
+          function: the function that creates the wrapper.
+        """
+        def wrapper(original):
+            def counted(degrees, deg):
+                start = time.perf_counter()
+                found = original(degrees, deg)
+                elapsed = time.perf_counter() - start
+
+                if name == "_next_max":
+                    scanned = deg - found if found else deg
+                elif found == datastructures.SENTINEL:
+                    scanned = len(degrees.slots) - deg - 1
+                else:
+                    scanned = found - deg
+
+                self._record(name, elapsed, scanned)
+
+                return found
+
+            return counted
+
+        return wrapper
+
+    def reset(self):
+        """Discard the statistics gathered so far.
+
+        Complexity: O(1)
+        """
+        self.levels = dict()
+        self.time = 0.0
+        self.total = dict()
+
+    def save(self, filename):
+        """Save the statistics to a JSON file.
+
+        Args:
+          filename (string): the name of the JSON file.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def start(self):
+        """Start counting the operations.
+
+        The methods are replaced by their instrumented versions.
+
+        Complexity: O(1)
+
+        Raises:
+          RuntimeError: if another Profiler is already active.
+        """
+        global ACTIVE
+
+        if ACTIVE is not None:
+            raise RuntimeError("Another Profiler is already active")
+
+        ACTIVE = self
+
+        for name in GRAPH_METHODS:
+            self._replace(datastructures.GRAPH, name, self._count(name))
+
+        for name in DEGREE_METHODS:
+            wrapper = self._scan(name) if name in SCAN_METHODS \
+                      else self._count(name)
+            self._replace(datastructures.DEGREE, name, wrapper)
+
+        for name in INDUCED_METHODS:
+            self._replace(
+              datastructures.InducedGraph, name, self._count(name))
+
+        for name in ALGORITHM_METHODS:
+            self._replace(algorithms, name, self._level(name))
+
+        self.started = time.perf_counter()
+
+    def stop(self):
+        """Stop counting the operations.
+
+        The original methods are put back, so the instrumentation no
+        longer has any cost.
+
+        Complexity: O(1)
+        """
+        global ACTIVE
+
+        if self.started is not None:
+            self.time += time.perf_counter() - self.started
+            self.started = None
+
+        while self.originals:
+            owner, name, original = self.originals.pop()
+            setattr(owner, name, original)
+
+        if ACTIVE is self:
+            ACTIVE = None
+
+    def summary(self):
+        """Return the statistics gathered so far.
+
+        Complexity: O(1)
+
+        Returns:
+          dict: the 'time' that the Profiler was active, the statistics
+            of all levels together ('total'), and the statistics of
+            every level ('levels', indexed by level).
+        """
+        return {
+          "time": self.time,
+          "total": self.total,
+          "levels": {
+            str(level): stats for level, stats in self.levels.items()
+          },
+        }
+
+
+def profile(function, *args, **kwargs):
+    """Execute a function while counting its operations.
+
+    Args:
+      function (function): the function to execute, usually one of the
+        coloring algorithms.
+      args (list): the positional arguments of the function.
+      kwargs (dict): the keyword arguments of the function.
+
+    Returns:
+      tuple: the result of the function and the Profiler with its
+        statistics.
+    """
+    with Profiler() as profiler:
+        result = function(*args, **kwargs)
+
+    return result, profiler
@@ -35,14 +35,23 @@ Attributes:
   VELOCITY_MAX (float): The maximum speed at which a particle can move.
     This parameter is used as a 'speed limit' that particles cannot
     exceed.
+  WORKER_GRAPH (GRAPH): the graph colored by a worker process of the
+    PSO's pool.
+  WORKER_LOCK (Lock): the lock held by 'evaluate' while it uses the
+    pseudo-random number generator, which is shared by all threads.
 """
 
+import collections
+import concurrent.futures
 import copy
+import json
 import math
+import os
 import random
 import sys
 import threading
 import time
+import zlib
 
 import algorithms
 import datastructures
@@ -56,6 +65,196 @@ ITERATIONS = 10 # 50
 PARTICLE_SIZE = 2
 POPULATION_SIZE = 25 # 5
 VELOCITY_MAX = 0.50 # 1.0
+WORKER_GRAPH = None
+WORKER_LOCK = threading.Lock()
+
+class FitnessCache(object):
+    """Implement a cache for the fitness of the particles.
+    
+    Evaluating the fitness of a particle means coloring the whole 
+    graph, and particles tend to converge to nearly identical values.
+    The cache groups the values of the particles in small regions, by
+    rounding every value to a multiple of 'quantum', and keeps the 
+    results of the evaluations made in every region. Once a region has
+    accumulated 'samples' results, new particles falling in it are not
+    evaluated again: they receive the best result of the region.
+    
+    The regions are kept in least-recently-used order, and the oldest
+    one is discarded when the cache is full. The cache can be saved to
+    a JSON file and loaded in later runs with the same graph.
+    
+    Attributes:
+      entries (OrderedDict): the results of every region, indexed by
+        the rounded values of the particles.
+      filename (str): the name of the file where the cache is saved, or
+        None if the cache is not saved.
+      hits (int): the number of evaluations avoided by the cache.
+      misses (int): the number of evaluations that had to be made.
+      quantum (float): the size of the regions in every dimension.
+      samples (int): the number of results needed in a region before
+        reusing them.
+      signature (str): a value that identifies the graph whose 
+        colorings are cached.
+      size (int): the maximum number of regions kept in the cache.
+    """
+    
+    def __init__(self, graph, size=1024, quantum=0.01, samples=1, 
+                 filename=None):
+        """Create a new, empty cache.
+        
+        If a filename is given and the file exists, the results saved
+        in it are loaded, unless they belong to a different graph or
+        were saved with a different quantum.
+        
+        Args:
+          graph (GRAPH): the graph that the swarm will attempt to 
+            color.
+          size (int): the maximum number of regions. Defaults to 1024.
+          quantum (float): the size of the regions. Defaults to 0.01.
+          samples (int): the number of results needed in a region 
+            before reusing them. Defaults to 1.
+          filename (str, optional): the name of the file where the 
+            cache is saved. Defaults to None.
+        """
+        self.entries = collections.OrderedDict()
+        self.filename = filename
+        self.hits = 0
+        self.misses = 0
+        self.quantum = quantum
+        self.samples = samples
+        self.signature = FitnessCache.sign(graph)
+        self.size = size
+        
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+            
+    def get(self, values):
+        """Get the cached result for the values of a particle.
+        
+        Args:
+          values (list of float): the values of the particle.
+          
+        Returns:
+          tuple: the best result of the region of the values (see the 
+            module method 'evaluate'), or None if the region has not
+            accumulated enough results yet.
+        """
+        key = self.key(values)
+        results = self.entries.get(key)
+        
+        if results is None or len(results) < self.samples:
+            self.misses += 1
+            return None
+            
+        self.hits += 1
+        self.entries.move_to_end(key)
+        
+        return min(results, key=lambda result: result[0])
+        
+    def hit_rate(self):
+        """Get the fraction of the evaluations avoided by the cache.
+        
+        Returns:
+          float: the number of hits over the number of lookups, or 0 if
+            no lookup has been made.
+        """
+        lookups = self.hits + self.misses
+        
+        if lookups == 0:
+            return 0.0
+            
+        return self.hits / lookups
+        
+    def key(self, values):
+        """Get the region of the values of a particle.
+        
+        Args:
+          values (list of float): the values of the particle.
+          
+        Returns:
+          tuple of int: the values rounded to multiples of 'quantum'.
+        """
+        return tuple(int(round(value / self.quantum)) for value in values)
+        
+    def load(self, filename):
+        """Load the results saved in a JSON file.
+        
+        Args:
+          filename (str): the name of the file.
+        """
+        with open(filename) as f:
+            data = json.load(f)
+            
+        if (data["signature"] != self.signature 
+              or data["quantum"] != self.quantum):
+            return
+            
+        for key, results in data["entries"]:
+            self.entries[tuple(key)] = [
+              (colors, None if coloring is None else 
+               {int(vid): clr for vid, clr in coloring.items()})
+              for colors, coloring in results]
+              
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            
+    def put(self, values, result):
+        """Add the result of an evaluation to the cache.
+        
+        Args:
+          values (list of float): the values of the evaluated particle.
+          result (tuple): the result of the evaluation (see the module
+            method 'evaluate').
+        """
+        key = self.key(values)
+        results = self.entries.setdefault(key, list())
+        
+        if len(results) < self.samples:
+            results.append(result)
+            
+        self.entries.move_to_end(key)
+        
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            
+    def save(self, filename=None):
+        """Save the cache to a JSON file.
+        
+        Args:
+          filename (str, optional): the name of the file. If not given,
+            'filename' is used. Defaults to None.
+        """
+        if filename is None:
+            filename = self.filename
+            
+        data = {
+          "signature": self.signature,
+          "quantum": self.quantum,
+          "entries": [[list(key), results] 
+                      for key, results in self.entries.items()],
+        }
+        
+        with open(filename, 'w') as f:
+            json.dump(data, f)
+            
+    @staticmethod
+    def sign(graph):
+        """Compute a value that identifies a graph.
+        
+        Args:
+          graph (GRAPH): the graph to identify.
+          
+        Returns:
+          str: the number of vertices and edges of the graph, and a
+            checksum of its edges.
+        """
+        edges = sorted(
+          (vertex.nid, neighbor.nid) for vertex in graph.vertices
+          for neighbor in vertex.data if vertex.nid < neighbor.nid)
+        checksum = zlib.crc32(repr(edges).encode())
+        
+        return "{0}:{1}:{2}".format(graph.m, graph.n, checksum)
+
 
 class Particle(object):
     """Implement a Particle.
@@ -76,9 +275,9 @@ class Particle(object):
       particle_id (int): the unique identifier of the particle.
       personal_best (list of float): the list used to store the best
         values achieved by the particle.
+      seed (int): the seed for the pseudo-random number generator used
+        in the next evaluation of the fitness.
       size (int): the number of values stored in every particle.
-      sync (boolean): a flag used to synchronize particles in parallel
-        execution.
       values (list of float): the list used to store the current values
         of the particle.
       velocities (list of float): the list of the velocities used to
@@ -122,7 +321,7 @@ class Particle(object):
         self.size = size
         self.graph = None
         self.best_coloring = None
-        self.sync = False
+        self.seed = None
                 
         # Initializes the fitness as an arbitrary bad value. 
         self.best_fitness = -(2**63)
@@ -175,8 +374,6 @@ class Particle(object):
         Args:
           globalBest (lisf of float): the current values of the leader.      
         """
-        self.sync = False
-        
         for index in range(self.size):
             # The formula is composed of 3 terms
             term1 = INERTIA_WEIGHT * self.velocities[index]
@@ -205,21 +402,27 @@ class Particle(object):
         In a numerical particle. the fitness is usually the evaluation
         of some function, which depends of the problem to solve. You
         can change the content of this method to fit your needs.
-        """
-        fitness = 0.0
-        # TO-DO: Write your fitness evaluation code here:
         
-        if self.graph is not None:
-            try:
-                fitness = 1.0 / algorithms.sdr_widgerson(
-                  self.graph, self.values[0], self.values[1]
-                )
-            except RuntimeError:
-                fitness = 1 / (2 ** 63)
-        else:
+        The evaluation itself is made by the module method 'evaluate',
+        so it can also be made by a worker process, whose result is 
+        then given to 'set_fitness'.
+        """
+        if self.graph is None:
             raise RuntimeError("Particle graph has not been set!")
             
-        # END TO-DO
+        self.set_fitness(*evaluate(self.graph, self.values, self.seed))
+    
+    def set_fitness(self, colors, coloring):
+        """Set the fitness for this particle from the result of an
+        evaluation.
+        
+        Args:
+          colors (int): the number of colors used to color the graph.
+          coloring (dict): the color of every vertex, indexed by
+            Node ID, or None if the graph couldn't be colored.
+        """
+        fitness = 1.0 / colors
+        
         self.current_fitness = fitness
         
         # Check if we've got a better result
@@ -229,7 +432,8 @@ class Particle(object):
             self.personal_best = self.values[:]
             self.best_coloring = copy.deepcopy(self.graph)
             
-        self.sync = True
+            if coloring is not None:
+                algorithms.color(self.best_coloring, coloring)
     
     def move(self):
         """Move the particle.
@@ -261,14 +465,37 @@ class PSO(object):
     between them which eventually leads to the emergence of 
     'intelligent' behaviour.
     
+    The fitness of the particles is evaluated by a pool of workers,
+    which is created once for every run of the algorithm. By default
+    the workers are processes, each one receiving the graph only once,
+    so the evaluations are actually made in parallel. If processes 
+    are not available, the particles are evaluated serially. Threads
+    can be used, but since they share the pseudo-random number 
+    generator, their evaluations are made one at a time.
+    
+    If a FitnessCache is given, particles whose values fall in a region
+    already evaluated are not evaluated again.
+    
     Attributes:
+      backend (str): the kind of workers used to evaluate the fitness:
+        'process', 'thread' or 'serial' (no workers at all).
+      cache (FitnessCache): the cache of the fitness, or None if the
+        fitness is always evaluated.
+      compact (CompactGraph): the graph sent to the worker processes.
+        If None, it is built from 'graph' when the pool is created.
+      graph (GRAPH): the graph that the swarm will attempt to color.
       iteration (int): the current iteration of the algorithm.
       leader (int): the index used to identify the current leader.
+      pool (Executor): the pool of workers used in the current run, or
+        None if no run is in progress.
       population (list of Particle): the population of particles used
         by the algorithm.
+      workers (int): the number of workers in the pool. If None, the 
+        number of processors in the machine is used.
     """
     
-    def __init__(self, graph):
+    def __init__(self, graph, workers=None, backend="process", cache=None,
+                 compact=None):
         """Initialize the structure of the algorithm.
         
         The population is stored in a list called 'population', which
@@ -278,10 +505,31 @@ class PSO(object):
         Args:
           graph (GRAPH): the GRAPH datastructure that the swarm will
             attempt to color.
+          workers (int): the number of workers used to evaluate the
+            fitness. Defaults to None.
+          backend (str): the kind of workers used to evaluate the
+            fitness: 'process', 'thread' or 'serial'. Defaults to
+            'process'.
+          cache (FitnessCache, optional): the cache of the fitness. 
+            Defaults to None.
+          compact (CompactGraph, optional): the graph sent to the 
+            worker processes, such as the one returned by 
+            'datastructures.load_graph' with compact=True, which the 
+            workers map instead of receiving a copy of its arrays. It
+            must have the same structure as 'graph'. Defaults to None.
         """
+        if backend not in ("process", "thread", "serial"):
+            raise ValueError("Unknown backend: {0}".format(backend))
+            
         self.population = list()
         self.leader = -1
         self.iteration = 0
+        self.graph = graph
+        self.backend = backend
+        self.cache = cache
+        self.compact = compact
+        self.workers = workers
+        self.pool = None
         
         for index in range(POPULATION_SIZE):
             p = Particle(index, PARTICLE_SIZE)
@@ -290,25 +538,6 @@ class PSO(object):
         
         self.find_leader()
     
-    def concurrent_run(self, particle):
-        """Allows particles to work in parallel.
-        
-        This method allows particles to find their leader, calculate
-        their velocities, move themselves, and evaluate the objective
-        function in parallel.
-        
-        Args:
-          particle (Particle): the particle that will execute its
-          evaluation method.
-        """        
-        # Store the leader values.
-        leader_vals = self.population[self.leader].values[:]
-        
-        # Calculate velocity and move the particle
-        particle.calculate_velocity(leader_vals)
-        particle.move()
-        particle.evaluate_fitness()
-    
     def create_log_entry(self, i):
         """Create a log entry record.
         
@@ -318,6 +547,9 @@ class PSO(object):
         
         iteration, best, worst, mean, std
         
+        If the PSO has a cache, the fraction of evaluations avoided so
+        far is added at the end of the line (hit_rate).
+        
         Args:
           i (int): The current iteration. It will figure as the first
             first element in every row.
@@ -333,8 +565,52 @@ class PSO(object):
         mean = rython.mean(fitness_vector)
         std = rython.std(fitness_vector)
         
+        if self.cache is not None:
+            return "{0},{1},{2},{3},{4},{5}\n".format(
+              i, 1.0/best, 1.0/worst, 1.0/mean, std, self.cache.hit_rate())
+        
         return "{0},{1},{2},{3},{4}\n".format(i, 1.0/best, 1.0/worst, 1.0/mean, std)
     
+    def evaluate_population(self):
+        """Evaluate the fitness of all particles in the swarm.
+        
+        The evaluations are sent to the pool of workers, and this 
+        method waits until all of them are completed. Particles found
+        in the cache are not evaluated.
+        """
+        pending = list()
+        
+        for particle in self.population:
+            result = None
+            
+            if self.cache is not None:
+                result = self.cache.get(particle.values)
+                
+            if result is not None:
+                particle.set_fitness(*result)
+                continue
+                
+            if self.pool is None:
+                future = None
+                result = evaluate(particle.graph, particle.values, particle.seed)
+            elif self.backend == "thread":
+                future = self.pool.submit(
+                  evaluate, particle.graph, particle.values[:], particle.seed)
+            else:
+                future = self.pool.submit(
+                  _evaluate_task, particle.values[:], particle.seed)
+                  
+            pending.append((particle, particle.values[:], future, result))
+            
+        for particle, values, future, result in pending:
+            if future is not None:
+                result = future.result()
+                
+            if self.cache is not None:
+                self.cache.put(values, result)
+                
+            particle.set_fitness(*result)
+    
     def find_leader(self):
         """Iterate over all the swarm to find the leader.
         
@@ -366,27 +642,6 @@ class PSO(object):
             
         return vector
     
-    def is_synchronized(self):
-        """Determine if the algorithm is synchronized.
-        
-        In order to choose the leader, all particles must be 
-        synchronized. This method checks the flags for all the 
-        particles and act as as a redezvous barrier.
-        
-        Returns:
-          bool: True if and only if all particles are synchronized.
-            False otherwise.
-        """
-        sync_state = True
-        
-        for particle in self.population:
-            sync_state = (sync_state and particle.sync)
-            
-            if not sync_state:
-                break;
-            
-        return sync_state
-    
     def print_leader(self):
         """Print the information for the best particle found so far.
         
@@ -427,35 +682,45 @@ class PSO(object):
         if csv_file is not None:
             # This list will store each iteration's result.
             output = list()
-            output.append("iteration,best,worst,mean,std\n")
+            if self.cache is not None:
+                output.append("iteration,best,worst,mean,std,hit_rate\n")
+            else:
+                output.append("iteration,best,worst,mean,std\n")
             output.append(self.create_log_entry(0))
         
-        for iteration in range(ITERATIONS):
-            self.iteration += 1
-            printer("Iteration [{0} / {1}] completed.".format(
-                iteration, ITERATIONS))
-            
-            for particle in self.population:                
-                # Launch a new thread to move particles in parallel
-                t = threading.Thread(
-                    target=self.concurrent_run, args=(particle,))
-                t.start()
+        self.start_pool()
+        
+        try:
+            for iteration in range(ITERATIONS):
+                self.iteration += 1
+                printer("Iteration [{0} / {1}] completed.".format(
+                    iteration, ITERATIONS))
                 
-            # Waits until all particles are synchronized
-            while not self.is_synchronized():
-                pass
+                # Store the leader values.
+                leader_vals = self.population[self.leader].values[:]
                 
-            # Find new leader
-            self.find_leader()
-            
-            # Register the results of this iteration
-            if csv_file is not None:
-                output.append(self.create_log_entry(iteration + 1))
-            
-            # Check if we've attained the desired minimum
-            best = 1.0/self.population[self.leader].current_fitness
-            if best <= DESIRED_MINIMUM:
-                break
+                # Calculate velocities and move the particles
+                for particle in self.population:
+                    particle.calculate_velocity(leader_vals)
+                    particle.move()
+                    particle.seed = random.getrandbits(32)
+                    
+                # Evaluates the particles in parallel
+                self.evaluate_population()
+                    
+                # Find new leader
+                self.find_leader()
+                
+                # Register the results of this iteration
+                if csv_file is not None:
+                    output.append(self.create_log_entry(iteration + 1))
+                
+                # Check if we've attained the desired minimum
+                best = 1.0/self.population[self.leader].current_fitness
+                if best <= DESIRED_MINIMUM:
+                    break
+        finally:
+            self.stop_pool()
         
         printer("Iteration [{0} / {1}] completed.".format(
             ITERATIONS, ITERATIONS))
@@ -474,19 +739,121 @@ class PSO(object):
                 f.write("\nAlgorithm stoped after {0} iterations.".format(
                     self.iteration))
                 f.write("\nThis experiment's seed is {0}".format(seed))
+                
+                if self.cache is not None:
+                    f.write("\nFitness cache: {0} hits, {1} misses.".format(
+                        self.cache.hits, self.cache.misses))
+                        
                 f.write("\nAlgorithm completed after {0} seconds.".format(
                     str(time.time() - start)))
         
         if json_file is not None:
             datastructures.to_json(leader.best_coloring, json_file)
+            
+        # Saves the cache for later runs
+        if self.cache is not None and self.cache.filename is not None:
+            self.cache.save()
         
         print("Done.\n")
+        
+    def start_pool(self):
+        """Create the pool of workers used to evaluate the fitness.
+        
+        If the pool of processes can not be created in this platform,
+        the particles are evaluated serially, without a pool.
+        """
+        if self.backend == "process":
+            if self.compact is None:
+                self.compact = datastructures.CompactGraph(self.graph)
+                
+            try:
+                self.pool = concurrent.futures.ProcessPoolExecutor(
+                  max_workers=self.workers, initializer=_init_worker,
+                  initargs=(self.compact,))
+            except (ImportError, NotImplementedError, OSError):
+                self.backend = "serial"
+                
+        if self.backend == "thread":
+            self.pool = concurrent.futures.ThreadPoolExecutor(
+              max_workers=self.workers)
+              
+    def stop_pool(self):
+        """Shut down the pool of workers, if any."""
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
 
 
 # --------------------------------------------------------------------
 #                             Module methods
 # --------------------------------------------------------------------
 
+def _evaluate_task(values, seed):
+    """Evaluate the values of a particle in a worker process.
+    
+    Args:
+      values (list of float): the values of the particle.
+      seed (int): the seed for the pseudo-random number generator.
+      
+    Returns:
+      tuple: the result of 'evaluate'.
+    """
+    return evaluate(WORKER_GRAPH, values, seed)
+
+def _init_worker(compact):
+    """Prepare a worker process of the PSO's pool.
+    
+    Args:
+      compact (CompactGraph): the graph that the swarm will attempt to
+        color.
+    """
+    global WORKER_GRAPH
+    
+    # The graph is copied the same way the PSO copies it for every
+    # particle, so the workers color exactly the same GRAPH
+    WORKER_GRAPH = copy.deepcopy(compact.to_graph())
+
+def evaluate(graph, values, seed=None):
+    """Color a graph with the values of a particle.
+    
+    A copy of the graph is colored with the SDR-Widgerson algorithm,
+    using the values of the particle as its exponents. Since the 
+    colors left in the graph by previous evaluations are not used, 
+    the result only depends on the values and the seed. The state of
+    the pseudo-random number generator is restored afterwards, so the
+    evaluation does not alter the movements of the swarm. The 
+    generator is shared by all threads, so WORKER_LOCK is held from 
+    the moment it is seeded until it is restored.
+    
+    Args:
+      graph (GRAPH): the graph to color.
+      values (list of float): the values of the particle.
+      seed (int, optional): the seed for the pseudo-random number
+        generator. If not given, the generator is not seeded. Defaults
+        to None.
+        
+    Returns:
+      tuple: the number of colors used and the color of every vertex,
+        indexed by Node ID. If the graph couldn't be colored, the 
+        number of colors is 2 ** 63 and the coloring is None.
+    """
+    graph = copy.deepcopy(graph)
+    
+    with WORKER_LOCK:
+        state = random.getstate()
+        
+        if seed is not None:
+            random.seed(seed)
+            
+        try:
+            colors = algorithms.sdr_widgerson(graph, values[0], values[1])
+        except RuntimeError:
+            return (2 ** 63, None)
+        finally:
+            random.setstate(state)
+            
+    return (colors, {vertex.nid: vertex.color for vertex in graph.vertices})
+
 def printer(msg):
     """Prints a message to the standard output.
     
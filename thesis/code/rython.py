@@ -6,10 +6,28 @@ This module provides some functions presented in R to be used in
 Python. This module is far from being a fully implemented R port
 and is likely to be unstable. Use it at your own risk.
 
+If NumPy is installed, the statistical methods (mean, variance, std,
+summary, normalize, z_normalize and table) work over NumPy arrays when
+they are given long vectors of numbers, or NumPy arrays of any length
+(the mean of a list is always calculated with a plain Python loop, 
+since converting the list takes as long). Otherwise, they use plain
+Python loops. Both ways give the same results for vectors of floats,
+and for vectors of integers below 2 ** 53.
+
 Attributes:
+  NUMPY_THRESHOLD (int): the minimum length of a list for it to be 
+    converted to a NumPy array. Shorter lists are faster to process
+    with plain Python loops.
   RYTHON_VERSION (float): the current version of the module.
   
 History:
+  * 0.4
+    - Added the NumPy versions of the mean, variance, std, summary,
+       normalize, z_normalize and table methods, used when NumPy is
+       installed.
+    - Added the 'start' and 'end' arguments of the 'median' method,
+       so the 'quartile' and 'IQR' methods no longer copy the vector.
+    - Added the 'to_array' helper method.
   * 0.3
     - Now DataFrame objects have implemented the size property.
     - Added the 'printer' method used as a console progress bar.
@@ -28,13 +46,19 @@ import re
 import string
 import sys
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 try:
     from nltk.corpus import stopwords
 except ImportError:
     print("Error while importing stopwords!")
     print("Try executing python(3) rython.py --help for more information.")
 
-RYTHON_VERSION = 0.3
+NUMPY_THRESHOLD = 1024
+RYTHON_VERSION = 0.4
 
 #----------------------------------------------------------------------
 #							Data Structures
@@ -706,8 +730,7 @@ def IQR(vector):
     Returns:
       (float): the IRQ of the vector.
     """
-    svector = vector[:]
-    quarts = quartile(svector)
+    quarts = quartile(vector)
     if isinstance(vector[0], float):
         return math.fabs(quarts[2] - quarts[0])
     else:
@@ -726,6 +749,12 @@ def mean(vector):
         print("Vector is empty. It has no mean")
         return
 
+    # Converting a list to an array takes as long as the loop below, so
+    # only arrays are added with NumPy. The cumulative sum adds the 
+    # numbers in the same order as the loop, so the result is the same.
+    if numpy is not None and isinstance(vector, numpy.ndarray):
+        return float(numpy.cumsum(vector, dtype=float)[-1]) / len(vector)
+
     summa = 0;
 
     for number in vector:
@@ -733,7 +762,7 @@ def mean(vector):
 
     return summa / len(vector)
 
-def median(vector):
+def median(vector, start=0, end=None):
     """Calculate the median of a vector.
 
     The median is the value that divides the vector in two
@@ -746,22 +775,32 @@ def median(vector):
 
     Args:
       vector (list): a list of numbers.
+      start (int): the first position of the part of the vector whose
+        median is calculated. Defaults to 0.
+      end (int): the position after the last one of the part of the
+        vector whose median is calculated. If None, the part ends with
+        the vector. Defaults to None.
 
     Returns:
       (number): the median of the vector. Depending on the
       contents of the vector, it can be either a float or an int.
     """
-    if len(vector) == 0:
+    if end is None:
+        end = len(vector)
+
+    length = end - start
+
+    if length <= 0:
         print("Vector is empty. It has no median")
-    elif (len(vector) % 2) == 0:
-        if isinstance(vector[0], float):
-            return ((vector[len(vector) // 2]
-                + vector[(len(vector) // 2) + 1]) / 2)
+    elif (length % 2) == 0:
+        if isinstance(vector[start], float):
+            return ((vector[start + length // 2]
+                + vector[start + (length // 2) + 1]) / 2)
         else:
-            return round((vector[len(vector) // 2]
-                + vector[(len(vector) // 2) + 1]) / 2)
+            return round((vector[start + length // 2]
+                + vector[start + (length // 2) + 1]) / 2)
     else:
-        return vector[int(math.ceil(len(vector) / 2))]
+        return vector[start + int(math.ceil(length / 2))]
 
 def normalize(vector):
     """Normalize a vector.
@@ -774,8 +813,24 @@ def normalize(vector):
 
     Returns:
       (list): a list containing the normalized values of the
-      given vector.
+      given vector, or a NumPy array if the vector is one.
     """
+    array = to_array(vector)
+
+    if array is not None:
+        minimum = array.min()
+        maximum = array.max()
+
+        if maximum == minimum:
+            raise ZeroDivisionError("division by zero")
+
+        normalized_array = (array - minimum) / (maximum - minimum)
+
+        if isinstance(vector, numpy.ndarray):
+            return normalized_array
+
+        return normalized_array.tolist()
+
     minimum = min(vector)
     maximum = max(vector)
     normalized_vector = list()
@@ -835,13 +890,13 @@ def quartile(vector):
         print("Vector is lenght {0}. It has no quartiles".format(len(vector)))
         return None
     elif (len(vector) % 2) == 0:
-        quartiles.append(median(vector[0:(len(vector)//2)]))
+        quartiles.append(median(vector, 0, len(vector)//2))
         quartiles.append(median(vector))
-        quartiles.append(median(vector[(len(vector)//2) + 1:]))
+        quartiles.append(median(vector, (len(vector)//2) + 1))
     else:
-        quartiles.append(median(vector[0:int(math.ceil(len(vector)/2))]))
+        quartiles.append(median(vector, 0, int(math.ceil(len(vector)/2))))
         quartiles.append(median(vector))
-        quartiles.append(median(vector[int(math.ceil(len(vector)/2)):]))
+        quartiles.append(median(vector, int(math.ceil(len(vector)/2))))
 
     return quartiles
 
@@ -939,12 +994,19 @@ def summary(vector):
     Args:
       vector (list): a list of numbers.
     """
-    svector = vector[:]
-    svector.sort()
+    array = to_array(vector)
+
+    if array is not None:
+        svector = numpy.sort(array)
+        minimum = svector[0]
+        maximum = svector[-1]
+    else:
+        svector = vector[:]
+        svector.sort()
+        minimum = min(svector)
+        maximum = max(svector)
 
-    minimum = min(svector)
     mmean = mean(svector)
-    maximum = max(svector)
     quarts = quartile(svector)
     print("Min\t1st Q.\tMedian\tMean\t3rd Q.\tMax")
     print("{m}\t{q}\t{d}\t{p}\t{t}\t{x}".format(
@@ -962,6 +1024,18 @@ def table(vector, show=True):
       (dictionary) a dictionary, with every unique element as a key,
       and the number of times said element appears as the value.
     """
+    array = to_array(vector)
+
+    if array is not None:
+        values, counts = numpy.unique(array, return_counts=True)
+        tab = dict(zip(values.tolist(), counts.tolist()))
+
+        if show:
+            for key in tab:
+                print("{0} :\t {1}".format(key, tab[key]))
+
+        return tab
+
     svector = vector[:]
     svector.sort()
     head = set(svector)
@@ -997,6 +1071,15 @@ def variance(vector):
         print("Vector is empty. It has no variance")
         return None
 
+    array = to_array(vector)
+
+    if array is not None:
+        m = mean(array)
+        deviations = array - m
+        deviations *= deviations
+
+        return float(numpy.cumsum(deviations)[-1]) / len(array)
+
     m = mean(vector)
     sum = 0
 
@@ -1031,8 +1114,24 @@ def z_normalize(vector):
 
     Returns:
       (list): a list containing the normalized values of the
-      given vector.
+      given vector, or a NumPy array if the vector is one.
     """
+    array = to_array(vector)
+
+    if array is not None:
+        minimum = array.min()
+        maximum = array.max()
+
+        if maximum == 0:
+            raise ZeroDivisionError("division by zero")
+
+        normalized_array = (array - minimum) / maximum
+
+        if isinstance(vector, numpy.ndarray):
+            return normalized_array
+
+        return normalized_array.tolist()
+
     minimum = min(vector)
     maximum = max(vector)
     normalized_vector = list()
@@ -1116,6 +1215,37 @@ def round(x):
     else:
         return int(math.floor(x))	
 
+def to_array(vector):
+    """Convert a vector of numbers to a NumPy array.
+
+    The vector is only converted if NumPy is installed, and if it has
+    at least NUMPY_THRESHOLD elements. NumPy arrays are used as they 
+    are, without copying them.
+
+    Args:
+      vector (list): a list of numbers, or a NumPy array.
+
+    Returns:
+      (ndarray): the NumPy array, or None if the vector should be
+      processed with plain Python loops (because NumPy is not 
+      installed, the vector is short, or it is not a one-dimensional
+      vector of integers or floats).
+    """
+    if numpy is None:
+        return None
+
+    if isinstance(vector, numpy.ndarray):
+        array = vector
+    elif len(vector) < NUMPY_THRESHOLD:
+        return None
+    else:
+        array = numpy.asarray(vector)
+
+    if array.ndim != 1 or array.dtype.kind not in "iuf":
+        return None
+
+    return array
+
 def z_score_norm(value, mean, std):
     """Normalize a value with the z-score technique.
 
@@ -0,0 +1,98 @@
+"""Test the coloring algorithms of the 'algorithms' module.
+
+The tests can be executed with 'python3 -m pytest' or with
+'python3 -m unittest' from this directory.
+"""
+
+import os
+import unittest
+
+import algorithms
+import datastructures
+
+BENCHMARKS_DIR = os.path.join(
+  os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks")
+
+
+def _star(leaves):
+    """Build a star: a center (vertex 0) adjacent to every leaf.
+
+    Args:
+      leaves (int): the number of leaves.
+
+    Returns:
+      GRAPH: the star, with vertices 0, 1, ..., leaves.
+    """
+    graph = datastructures.GRAPH()
+
+    for vid in range(leaves + 1):
+        graph.add_vertex(vid)
+
+    for vid in range(1, leaves + 1):
+        graph.add_edge(0, vid)
+
+    return graph
+
+
+class FirstFitTest(unittest.TestCase):
+    """Test the 'first_fit' algorithm on graphs that already have a
+    coloring."""
+
+    def test_precolored_star(self):
+        """The colors left on the leaves do not count."""
+        graph = _star(5)
+
+        for vid in range(1, 6):
+            graph.set_color(graph.vertices[vid], vid - 1)
+
+        colors = algorithms.first_fit(graph, order="smallest_last")
+
+        self.assertEqual(colors, 2)
+        graph.check_coloring()
+
+    def test_precolored_bound(self):
+        """Smallest-last order uses at most degeneracy + 1 colors, and
+        the same colors as on a clean graph."""
+        for name in ("myciel6", "queen6_6", "DSJC125.1", "anna"):
+            filename = os.path.join(BENCHMARKS_DIR, name + ".col")
+            clean = datastructures.from_dimacs(filename)
+            graph = datastructures.from_dimacs(filename)
+
+            expected = algorithms.first_fit(clean, order="smallest_last")
+            algorithms.dsatur(graph)
+            colors = algorithms.first_fit(graph, order="smallest_last")
+
+            self.assertLessEqual(colors, graph.smallest_last()[1] + 1)
+            self.assertEqual(colors, expected)
+            graph.check_coloring()
+
+
+
+class CachedDTest(unittest.TestCase):
+    """Test the cache of the results of algorithm D."""
+
+    def setUp(self):
+        self.size = algorithms.GREEDY_CACHE_SIZE
+        algorithms.GREEDY_CACHE.clear()
+        algorithms.GREEDY_CACHE_SIZE = 2
+
+    def tearDown(self):
+        algorithms.GREEDY_CACHE.clear()
+        algorithms.GREEDY_CACHE_SIZE = self.size
+
+    def test_evicts_least_recently_used(self):
+        """A full cache only discards the least recently used graph."""
+        graphs = [_star(leaves) for leaves in (2, 3, 4)]
+
+        algorithms.cached_d(graphs[0], dict())
+        algorithms.cached_d(graphs[1], dict())
+        algorithms.cached_d(graphs[0], dict())
+        algorithms.cached_d(graphs[2], dict())
+
+        self.assertEqual(
+          list(algorithms.GREEDY_CACHE),
+          [graphs[0].fingerprint(), graphs[2].fingerprint()])
+
+
+if __name__ == "__main__":
+    unittest.main()